@@ -0,0 +1,269 @@
+"""Scanner benchmark on synthetic Laravel trees.
+
+Builds a directory tree under a temporary folder, then times a cold scan,
+warm (indexed) rescans, startup validation, vendor sizing and vendor
+removal, and writes the results as JSON:
+
+    python bench.py --depth 4 --fanout 6 --projects 200 --output before.json
+    python bench.py --depth 4 --fanout 6 --projects 200 --compare before.json
+
+Trees are generated from a seed, so two runs with the same options walk
+identical trees.
+"""
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import platform
+import argparse
+import tempfile
+import subprocess
+import statistics
+
+from diskusage import DiskUsageEngine
+from purge import VendorPurger
+from scan_index import ScanIndex
+from scanner import ScanStats, scan_for_laravel_projects
+import validation
+
+
+COMPOSER_JSON = {"require": {"php": "^8.1", "laravel/framework": "^10.0"}}
+DECOY_COMPOSER_JSON = {"require": {"php": "^8.1", "symfony/console": "^6.0"}}
+
+
+class TreeSpec:
+    """Shape of a synthetic tree"""
+
+    def __init__(self, depth=4, fanout=6, projects=100, vendor_files=200, node_files=100,
+                 file_size=2048, decoys=50, seed=1):
+        self.depth = depth
+        self.fanout = fanout
+        self.projects = projects
+        self.vendor_files = vendor_files
+        self.node_files = node_files
+        self.file_size = file_size
+        self.decoys = decoys
+        self.seed = seed
+
+    def as_dict(self):
+        return dict(vars(self))
+
+
+def _write_files(directory, count, size, rng, per_dir=20):
+    """Create count files of size bytes spread over package-like subdirectories"""
+    payload = b'x' * size
+    for i in range(count):
+        package = os.path.join(directory, f"vendor{i // per_dir % 10}", f"package{i // per_dir}")
+        os.makedirs(package, exist_ok=True)
+        with open(os.path.join(package, f"File{i}.php"), 'wb') as f:
+            f.write(payload[:rng.randint(size // 2, size)])
+
+
+def build_tree(root, spec):
+    """Generate the tree; returns the sorted list of project paths it contains"""
+    rng = random.Random(spec.seed)
+    levels = [[root]]
+    for depth in range(spec.depth):
+        level = []
+        for parent in levels[-1]:
+            for i in range(spec.fanout):
+                path = os.path.join(parent, f"dir{depth}_{i}")
+                os.makedirs(path, exist_ok=True)
+                level.append(path)
+        levels.append(level)
+
+    # Projects sit on the deepest level so that none is nested in another
+    leaves = levels[-1]
+    projects = sorted(rng.sample(leaves, min(spec.projects, len(leaves))))
+    for path in projects:
+        with open(os.path.join(path, 'artisan'), 'w') as f:
+            f.write("#!/usr/bin/env php\n")
+        with open(os.path.join(path, 'composer.json'), 'w') as f:
+            json.dump(COMPOSER_JSON, f, indent=4)
+        with open(os.path.join(path, 'composer.lock'), 'w') as f:
+            json.dump({"packages": [{"name": "laravel/framework", "version": "v10.48.4"}],
+                       "platform": {"php": "^8.1"}}, f, indent=4)
+        _write_files(os.path.join(path, 'vendor'), spec.vendor_files, spec.file_size, rng)
+        _write_files(os.path.join(path, 'node_modules'), spec.node_files, spec.file_size, rng)
+
+    # Decoys: an artisan file without Laravel, or a directory named artisan
+    inner = [path for level in levels[1:-1] for path in level] or leaves
+    for i, path in enumerate(rng.sample(inner, min(spec.decoys, len(inner)))):
+        if i % 2:
+            os.makedirs(os.path.join(path, 'artisan'), exist_ok=True)
+            continue
+        with open(os.path.join(path, 'artisan'), 'w') as f:
+            f.write("#!/usr/bin/env php\n")
+        with open(os.path.join(path, 'composer.json'), 'w') as f:
+            json.dump(DECOY_COMPOSER_JSON, f, indent=4)
+    return projects
+
+
+def drop_caches():
+    """Ask the kernel to drop the page/dentry caches (Linux, root only); returns success"""
+    try:
+        os.sync()
+        with open('/proc/sys/vm/drop_caches', 'w') as f:
+            f.write('3\n')
+        return True
+    except OSError:
+        return False
+
+
+def timed(function, repeat=1, before=None):
+    """Run function `repeat` times; returns (timings in seconds, last result)"""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        if before is not None:
+            before()
+        started = time.perf_counter()
+        result = function()
+        timings.append(time.perf_counter() - started)
+    return timings, result
+
+
+def summarize(timings):
+    return {
+        'min': round(min(timings), 6),
+        'median': round(statistics.median(timings), 6),
+        'max': round(max(timings), 6),
+        'runs': len(timings),
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        return None
+
+
+def run_benchmarks(root, spec, repeat=3, jobs=None, cold_caches=False):
+    """Build the tree under root and time every stage; returns the results dict"""
+    results = {'tree': spec.as_dict(), 'stages': {}}
+    stages = results['stages']
+
+    started = time.perf_counter()
+    expected = build_tree(root, spec)
+    results['build_seconds'] = round(time.perf_counter() - started, 3)
+    results['projects_expected'] = len(expected)
+
+    # Cold: no index, and the OS caches dropped when possible
+    dropped = cold_caches and drop_caches()
+    results['caches_dropped'] = dropped
+    before = drop_caches if dropped else None
+    stats = ScanStats()
+
+    def cold_scan():
+        return scan_for_laravel_projects(root, jobs=jobs, stats=stats)
+    timings, found = timed(cold_scan, repeat, before)
+    stages['cold_scan'] = summarize(timings)
+    stages['cold_scan']['dirs_visited'] = stats.dirs_visited // repeat
+    results['projects_found'] = len(found)
+    results['projects_match'] = found == expected
+
+    # Warm: the same tree again, reusing the directory index. Directories
+    # modified within seconds of a scan are never trusted from the index,
+    # so the tree has to settle before the index is filled.
+    index = ScanIndex()
+    time.sleep(2.1)
+    scan_for_laravel_projects(root, jobs=jobs, index=index)
+
+    def warm_scan():
+        return scan_for_laravel_projects(root, jobs=jobs, index=index)
+    timings, _ = timed(warm_scan, repeat)
+    stages['warm_scan'] = summarize(timings)
+
+    def validate():
+        outcome = []
+        validation.Validator().run(expected, lambda *result: outcome.append(result))
+        return outcome
+    timings, _ = timed(validate, repeat)
+    stages['validation'] = summarize(timings)
+
+    engine = DiskUsageEngine()
+
+    def size_vendors():
+        return engine.measure_projects(expected, ('vendor', 'node_modules'))
+    timings, sizes = timed(size_vendors, repeat)
+    stages['vendor_sizing'] = summarize(timings)
+    stages['vendor_sizing']['bytes'] = sum(u['vendor'].disk for u in sizes.values())
+
+    # Deletion destroys the vendor directories, so it runs once and last
+    timings, removed = timed(lambda: VendorPurger().purge(expected))
+    stages['vendor_removal'] = summarize(timings)
+    stages['vendor_removal']['files'] = sum(files for files, _, _ in removed.values())
+    return results
+
+
+def compare(current, baseline):
+    """Print the change of each stage's median against a previous results file"""
+    print(f"{'stage':<16}{'baseline':>12}{'current':>12}{'change':>10}")
+    for stage, values in current['stages'].items():
+        old = baseline.get('stages', {}).get(stage)
+        if old is None:
+            continue
+        change = (values['median'] - old['median']) / old['median'] * 100 if old['median'] else 0.0
+        print(f"{stage:<16}{old['median']:>11.4f}s{values['median']:>11.4f}s{change:>+9.1f}%")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the scanner on a synthetic tree.")
+    parser.add_argument('--depth', type=int, default=4)
+    parser.add_argument('--fanout', type=int, default=6)
+    parser.add_argument('--projects', type=int, default=100)
+    parser.add_argument('--vendor-files', type=int, default=200)
+    parser.add_argument('--node-files', type=int, default=100)
+    parser.add_argument('--file-size', type=int, default=2048)
+    parser.add_argument('--decoys', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--jobs', type=int, default=None)
+    parser.add_argument('--cold-caches', action='store_true',
+                        help="drop the OS caches before each cold scan (Linux, needs root)")
+    parser.add_argument('--dir', help="build the tree here instead of a temporary folder")
+    parser.add_argument('--keep', action='store_true', help="do not delete the tree afterwards")
+    parser.add_argument('--output', help="write the results to this JSON file")
+    parser.add_argument('--compare', metavar='FILE', help="compare with a previous results file")
+    args = parser.parse_args(argv)
+
+    spec = TreeSpec(args.depth, args.fanout, args.projects, args.vendor_files,
+                    args.node_files, args.file_size, args.decoys, args.seed)
+    base = args.dir or tempfile.mkdtemp(prefix='laravel-scanner-bench-')
+    root = os.path.join(base, 'tree')
+    if os.path.exists(root):
+        print(f"{root} already exists", file=sys.stderr)
+        return 2
+    try:
+        results = run_benchmarks(root, spec, args.repeat, args.jobs, args.cold_caches)
+    finally:
+        if not args.keep:
+            shutil.rmtree(root if args.dir else base, ignore_errors=True)
+
+    results.update({
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    })
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            compare(results, json.load(f))
+    return 0 if results['projects_match'] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
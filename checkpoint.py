@@ -0,0 +1,134 @@
+import os
+import json
+import time
+
+
+# How often a running scan writes its checkpoint
+CHECKPOINT_SECONDS = 10.0
+
+# How long a stopped scan's caller waits for the final checkpoint; a worker
+# stuck on a hung mount can hold it up, and the periodic one is still there
+CHECKPOINT_WAIT_SECONDS = 5.0
+
+
+def scan_options(prune, follow_symlinks=False, one_file_system=False):
+    """The options a checkpoint is only valid for, as JSON-able values"""
+    return {
+        'prune': [pattern.source for pattern in prune.patterns],
+        'max_depth': prune.max_depth,
+        'follow_symlinks': bool(follow_symlinks),
+        'one_file_system': bool(one_file_system),
+    }
+
+
+class ScanCheckpoint:
+    """Pending directories and found projects of a running scan.
+
+    The walker hands a snapshot to save() every CHECKPOINT_SECONDS from a
+    background thread. The file is written under a temporary name, synced
+    and renamed over the previous checkpoint, so a crash leaves the old
+    checkpoint or the new one, never a torn file. A finished scan removes
+    it; a stopped or interrupted one leaves it behind to be resumed by a
+    scan of the same roots with the same options.
+    """
+
+    VERSION = 1
+
+    def __init__(self, path=None):
+        self.path = path
+        self.roots = []
+        self.options = {}
+        # Directories still to visit: (path, depth, root, st_dev) walker items
+        self.frontier = []
+        self.projects = []
+        # st_dev of each root when the checkpoint was written
+        self.root_devices = {}
+        self.dirs_visited = 0
+        self.saved = None
+
+    @classmethod
+    def load(cls, path):
+        """Load the checkpoint at path, empty if it is missing or invalid"""
+        checkpoint = cls(path)
+        if not os.path.exists(path):
+            return checkpoint
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == cls.VERSION:
+                checkpoint.roots = data['roots']
+                checkpoint.options = data['options']
+                checkpoint.frontier = [tuple(item) for item in data['frontier']]
+                checkpoint.projects = data['projects']
+                checkpoint.root_devices = data['root_devices']
+                checkpoint.dirs_visited = data['dirs_visited']
+                checkpoint.saved = data['saved']
+        except Exception as e:
+            print(f"Error loading scan checkpoint: {e}")
+            return cls(path)
+        return checkpoint
+
+    def resumable(self, roots, prune, follow_symlinks=False, one_file_system=False):
+        """Whether this checkpoint holds an unfinished scan of these roots with these options"""
+        return (bool(self.frontier) and self.roots == list(roots)
+                and self.options == scan_options(prune, follow_symlinks, one_file_system))
+
+    def describe(self):
+        """e.g. "12 projects found in 48,210 folders, 310 folders left (saved 2024-05-01 14:02)" """
+        saved = time.strftime('%Y-%m-%d %H:%M', time.localtime(self.saved)) if self.saved else "?"
+        return (f"{len(self.projects)} projects found in {self.dirs_visited:,} folders, "
+                f"{len(self.frontier):,} folders left (saved {saved})")
+
+    def begin(self, roots, options):
+        """Start checkpointing a new scan"""
+        self.roots = list(roots)
+        self.options = options
+        self.frontier = []
+        self.projects = []
+        self.root_devices = {}
+        self.dirs_visited = 0
+        self.saved = None
+
+    def save(self, frontier, projects, root_devices, dirs_visited):
+        """Write a snapshot of the scan atomically"""
+        self.frontier = frontier
+        self.projects = projects
+        self.root_devices = root_devices
+        self.dirs_visited = dirs_visited
+        self.saved = time.time()
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.tmp"
+        try:
+            # dumps encodes in one C call; dump would encode chunk by chunk while
+            # holding the GIL the walker threads need
+            text = json.dumps({
+                'version': self.VERSION,
+                'roots': self.roots,
+                'options': self.options,
+                'frontier': frontier,
+                'projects': projects,
+                'root_devices': root_devices,
+                'dirs_visited': dirs_visited,
+                'saved': self.saved,
+            }, separators=(',', ':'))
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(text)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"Error saving scan checkpoint: {e}")
+
+    def clear(self):
+        """Forget the checkpoint once its scan has finished"""
+        self.frontier = []
+        self.projects = []
+        if not self.path:
+            return
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Error removing scan checkpoint: {e}")
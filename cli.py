@@ -0,0 +1,214 @@
+"""Headless command-line scanner.
+
+Streams one JSON record per line (NDJSON) for every Laravel project found,
+followed by a summary record. Nothing here imports tkinter, so it runs on
+servers and CI runners without a display.
+
+    python cli.py ~/code /srv/www --jobs 16 --exclude "tmp,backups" --max-depth 6
+"""
+import os
+import sys
+import json
+import time
+import argparse
+
+from checkpoint import ScanCheckpoint
+from diskusage import DiskUsageEngine
+from instrumentation import Metrics, Profiler
+from metadata import MetadataExtractor
+from prune import PruneRules, parse_patterns
+from scan_index import ScanIndex
+from scan_plan import ScanPlan
+from scanner import ScanStats, ScanToken, iter_laravel_projects
+from throttle import add_throttle_arguments, throttle_from_args
+
+
+# Exit codes
+EXIT_OK = 0
+EXIT_NO_PROJECTS = 1
+EXIT_USAGE = 2
+EXIT_ERROR = 3
+EXIT_INTERRUPTED = 130
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='laravel-scanner',
+        description="Find Laravel projects and print them as JSON lines.",
+        epilog="Folders given twice, through a symlink, or inside another given folder are "
+               "walked once. Exit status: 0 projects found, 1 no projects found, "
+               "2 usage error, 3 a root could not be scanned, 130 interrupted.")
+    parser.add_argument('roots', nargs='+', metavar='ROOT', help="folder to scan")
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help="walker threads (default: CPU count + 4, at most 32)")
+    parser.add_argument('-e', '--exclude', action='append', default=[], metavar='PATTERNS',
+                        help="comma-separated gitignore-style patterns to skip; repeatable")
+    parser.add_argument('--no-default-excludes', action='store_true',
+                        help="also walk node_modules and .git directories")
+    parser.add_argument('-d', '--max-depth', type=int, default=None,
+                        help="do not descend more than this many levels below a root")
+    parser.add_argument('-L', '--follow-symlinks', action='store_true',
+                        help="also walk symlinked folders (loops are detected); "
+                             "disables --since-index")
+    parser.add_argument('-x', '--one-file-system', action='store_true',
+                        help="do not enter folders on another filesystem than their root")
+    parser.add_argument('--since-index', metavar='FILE',
+                        help="incremental scan: reuse unchanged directories from this index "
+                             "file and update it afterwards")
+    parser.add_argument('--checkpoint', metavar='FILE',
+                        help="save the scan's progress to this file every few seconds and "
+                             "resume from it if an earlier scan of the same roots was interrupted")
+    parser.add_argument('--no-sizes', action='store_true',
+                        help="do not measure vendor directories")
+    parser.add_argument('--format', choices=('ndjson', 'json'), default='ndjson',
+                        help="ndjson streams records as they are found (default); "
+                             "json prints one document at the end")
+    parser.add_argument('--metrics', metavar='FILE',
+                        help="write scan diagnostics (counters, timing histograms, per-root "
+                             "durations) to this JSON file")
+    parser.add_argument('--profile', choices=Profiler.MODES, default=None,
+                        help="profile the walker threads: sample (low overhead) or cprofile "
+                             "(exact, slow); written with --metrics, or as a diagnostics record")
+    add_throttle_arguments(parser)
+    return parser
+
+
+def project_record(path, engine, extractor, started):
+    """JSON-ready description of one project"""
+    found = time.monotonic()
+    _, metadata, _ = extractor.extract(path)
+    record = {
+        'type': 'project',
+        'path': path,
+        'laravel_version': metadata.laravel_version if metadata else None,
+        'php_constraint': metadata.php_constraint if metadata else None,
+        'package_count': metadata.package_count if metadata else None,
+        'has_vendor': os.path.isdir(os.path.join(path, 'vendor')),
+        'found_ms': round((found - started) * 1000, 1),
+    }
+    if engine is not None:
+        usage = engine.measure_project(path)['vendor']
+        record['vendor_disk'] = usage.disk
+        record['vendor_apparent'] = usage.apparent
+        record['vendor_files'] = usage.files
+    record['inspect_ms'] = round((time.monotonic() - found) * 1000, 1)
+    return record
+
+
+def run(args, out=sys.stdout):
+    """Scan every root and write the records; returns the exit code"""
+    patterns = [p for text in args.exclude for p in parse_patterns(text)]
+    prune = PruneRules(patterns, use_defaults=not args.no_default_excludes,
+                       max_depth=args.max_depth)
+    # One I/O budget for the walk and the vendor sizing
+    throttle = throttle_from_args(args)
+    engine = None if args.no_sizes else DiskUsageEngine(throttle=throttle)
+    extractor = MetadataExtractor()
+    index = ScanIndex.load(args.since_index) if args.since_index else None
+    checkpoint = ScanCheckpoint.load(args.checkpoint) if args.checkpoint else None
+
+    def emit(record):
+        if args.format == 'ndjson':
+            out.write(json.dumps(record) + '\n')
+            out.flush()
+        else:
+            records.append(record)
+
+    records = []
+    started = time.monotonic()
+    found = 0
+    interrupted = False
+    projects = None
+    plan = ScanPlan(args.roots, prune)
+    for root, reason in plan.dropped:
+        if root in plan.missing:
+            print(f"Cannot scan {root}: {reason}", file=sys.stderr)
+        emit({'type': 'skipped_root', 'path': root, 'reason': reason})
+
+    instrumented = args.metrics or args.profile
+    stats = ScanStats(Metrics() if instrumented else None,
+                      Profiler(args.profile) if args.profile else None)
+    try:
+        if plan.roots:
+            resumed = checkpoint is not None and checkpoint.resumable(
+                plan.roots, prune, args.follow_symlinks, args.one_file_system)
+            projects = iter_laravel_projects(plan, args.jobs, prune, stats, index, ScanToken(),
+                                             follow_symlinks=args.follow_symlinks,
+                                             one_file_system=args.one_file_system,
+                                             throttle=throttle, checkpoint=checkpoint)
+            for path in projects:
+                emit(project_record(path, engine, extractor, started))
+                found += 1
+            emit({
+                'type': 'scan',
+                'roots': plan.roots,
+                'resumed': resumed,
+                'projects': stats.projects_found,
+                'dirs_visited': stats.dirs_visited,
+                'dirs_cached': stats.dirs_cached,
+                'dirs_skipped': stats.dirs_skipped,
+                'dirs_duplicate': stats.dirs_duplicate,
+                'dirs_other_fs': stats.dirs_other_fs,
+                'probes_fast': stats.probes_fast,
+                'probes_full': stats.probes_full,
+                'probe_fast_ms': round(stats.probe_fast_ns / 1e6, 2),
+                'probe_full_ms': round(stats.probe_full_ns / 1e6, 2),
+                'elapsed_ms': round(stats.elapsed() * 1000, 1),
+                'devices': stats.devices() if stats.devices else [],
+            })
+            if args.metrics:
+                try:
+                    stats.export_json(args.metrics)
+                except Exception as e:
+                    print(f"Error writing metrics: {e}", file=sys.stderr)
+            elif instrumented:
+                emit({'type': 'diagnostics', **stats.as_dict()})
+    except KeyboardInterrupt:
+        # Closing the generator cancels the walk and lets it save its checkpoint
+        interrupted = True
+        if projects is not None:
+            projects.close()
+        return EXIT_INTERRUPTED
+    finally:
+        if index is not None and not interrupted:
+            try:
+                index.save()
+            except Exception as e:
+                print(f"Error saving scan index: {e}", file=sys.stderr)
+
+    summary = {
+        'type': 'summary',
+        'projects': found,
+        'roots': len(plan.roots),
+        'failed_roots': len(plan.missing),
+        'elapsed_ms': round((time.monotonic() - started) * 1000, 1),
+    }
+    if throttle is not None:
+        summary['throttle'] = throttle.as_dict()
+    emit(summary)
+    if args.format == 'json':
+        json.dump(records, out, indent=2)
+        out.write('\n')
+
+    if plan.missing:
+        return EXIT_ERROR
+    return EXIT_OK if found else EXIT_NO_PROJECTS
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.jobs is not None and args.jobs < 1:
+        print("--jobs must be at least 1", file=sys.stderr)
+        return EXIT_USAGE
+    if args.max_ops is not None and args.max_ops < 1:
+        print("--max-ops must be at least 1", file=sys.stderr)
+        return EXIT_USAGE
+    try:
+        return run(args)
+    except BrokenPipeError:
+        # Output piped into head & co.
+        return EXIT_OK
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,778 @@
+"""Background scanner service with a local Unix-socket API.
+
+The daemon owns the project store, the scan index and the folder watcher.
+It validates the stored projects once when it starts, keeps them current
+while it runs, and serves any number of thin clients (the GUI, or the
+commands below) over a Unix socket in the app data folder:
+
+    python daemon.py start                  # run in the background
+    python daemon.py status
+    python daemon.py query                  # every known project, as JSON
+    python daemon.py scan ~/code /srv/www   # scan in the daemon, printing progress
+    python daemon.py cancel
+    python daemon.py remove-vendor ~/code/old-shop
+    python daemon.py stop
+
+The protocol is one JSON object per line in each direction. A request is
+{"id": 1, "op": "query", ...params}; its response is {"id": 1, "ok": true,
+"result": ...} or {"id": 1, "ok": false, "error": "..."}. After a
+"subscribe" request the connection also receives events, which have an
+"event" key instead of an "id":
+
+    {"event": "rows", "rows": [row, ...]}     projects added or changed
+    {"event": "removed", "paths": [...]}      projects gone
+    {"event": "status", "text": "..."}        human-readable progress
+    {"event": "scan", "state": "running"|"paused"|"finished", "text": "..."}
+    {"event": "purge", "state": "finished", "text": "..."}
+
+A row is a dict with the keys of ROW_FIELDS. "scan" and "remove_vendor"
+accept the I/O limits max_ops (operations per second), max_bytes (bytes
+per second, e.g. "20M") and idle (idle I/O priority) for that job. A
+"scan" with "resume": true continues the checkpoint of an unfinished scan
+of the same roots and options, if there is one.
+"""
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import threading
+import subprocess
+import socketserver
+
+from checkpoint import ScanCheckpoint
+from diskusage import EMPTY_USAGE
+from metadata import MetadataExtractor
+from prune import PruneRules, parse_patterns
+from purge import VendorPurger
+from scan_index import ScanIndex
+from scan_plan import ScanPlan
+from scanner import ScanStats, ScanToken, iter_laravel_projects
+from store import ProjectStore
+from throttle import Throttle, add_throttle_arguments
+from utils import format_size, get_data_file_path
+import validation
+import watcher
+
+
+ROW_FIELDS = ('path', 'has_vendor', 'unreachable', 'last_modified', 'vendor_disk',
+              'vendor_files', 'extra_disk', 'laravel_version', 'php_constraint', 'package_count')
+
+# Rows found by a scan are sent in batches at most this often
+PUBLISH_SECONDS = 0.1
+# How often subscribers get the progress of a running scan
+PROGRESS_SECONDS = 0.5
+
+# Seconds a client waits for a response
+CLIENT_TIMEOUT = 10.0
+
+# Returned by handle() for a request that already sent its own response
+ANSWERED = object()
+
+
+class DaemonError(Exception):
+    """The daemon is not running, or answered a request with an error"""
+
+
+def socket_path():
+    return get_data_file_path("doscanner.sock")
+
+
+def is_supported():
+    return hasattr(socket, 'AF_UNIX')
+
+
+def new_row(path, has_vendor=False, unreachable=False):
+    row = dict.fromkeys(ROW_FIELDS)
+    row.update(path=path, has_vendor=bool(has_vendor), unreachable=unreachable)
+    return row
+
+
+class _Connection:
+    """One client connection; writes from several threads are serialised"""
+
+    def __init__(self, wfile):
+        self.wfile = wfile
+        self.lock = threading.Lock()
+
+    def send(self, message):
+        data = (json.dumps(message) + '\n').encode('utf-8')
+        with self.lock:
+            self.wfile.write(data)
+            self.wfile.flush()
+
+
+class ScanDaemon:
+    """Project state shared by every client, and the work that changes it.
+
+    All state lives in self.rows ({path: row}) behind self.lock, together
+    with the subscribers and the running scan and vendor removal; every
+    change is persisted to the store and published to the subscribers.
+    """
+
+    def __init__(self, store=None):
+        self.store = store or ProjectStore(get_data_file_path("doprojects.db"))
+        self.lock = threading.Lock()
+        self.rows = {}
+        self.subscribers = set()
+        self.status = "Starting"
+        self.scan_token = None
+        self.scan_stats = None
+        self.scan_thread = None
+        self.purging = False
+        self.watcher = None
+        self.prune = PruneRules()
+        self.started = time.time()
+        self.server = None
+
+    # State
+
+    def publish(self, event):
+        """Send an event to every subscriber, dropping those that went away"""
+        with self.lock:
+            connections = list(self.subscribers)
+        for connection in connections:
+            try:
+                connection.send(event)
+            except (OSError, ValueError):
+                # ValueError: the handler already closed the connection's file
+                self.unsubscribe(connection)
+
+    def subscribe(self, connection, request_id=None):
+        """Answer a subscribe request and start sending events to the connection.
+
+        The answer is sent under the lock that publish() takes to list the
+        subscribers, so no event can reach the client before it.
+        """
+        with self.lock:
+            connection.send({'id': request_id, 'ok': True, 'result': True})
+            self.subscribers.add(connection)
+
+    def unsubscribe(self, connection):
+        with self.lock:
+            self.subscribers.discard(connection)
+
+    def set_status(self, text):
+        self.status = text
+        self.publish({'event': 'status', 'text': text})
+
+    def update_rows(self, changes):
+        """Apply {path: {field: value}} to the rows and publish the changed rows"""
+        changed = []
+        with self.lock:
+            for path, values in changes.items():
+                row = self.rows.get(path)
+                if row is None:
+                    row = self.rows[path] = new_row(path)
+                row.update(values)
+                changed.append(dict(row))
+        if changed:
+            self.publish({'event': 'rows', 'rows': changed})
+
+    def remove_rows(self, paths):
+        with self.lock:
+            paths = [path for path in paths if self.rows.pop(path, None) is not None]
+        if paths:
+            self.publish({'event': 'removed', 'paths': paths})
+
+    def load(self):
+        """Fill the rows from the store, then validate them in the background"""
+        vendor = self.store.vendor_flags()
+        sizes = self.store.project_sizes()
+        metadata = self.store.cached_metadata()
+        modified = self.store.last_modified()
+        with self.lock:
+            for path, has_vendor in vendor.items():
+                row = self.rows[path] = new_row(path, has_vendor)
+                row['last_modified'] = modified.get(path)
+                if path in sizes:
+                    row['vendor_disk'], row['vendor_files'], row['extra_disk'] = sizes[path]
+                if path in metadata:
+                    row['laravel_version'], row['php_constraint'], row['package_count'] = \
+                        metadata[path][1]
+        self.set_status(f"Checking {len(vendor)} projects...")
+        threading.Thread(target=self.validate, daemon=True).start()
+
+    def validate(self):
+        """Check every stored project once, like the GUI does at startup"""
+        with self.lock:
+            projects = sorted(self.rows)
+        deleted = []
+        unreachable = []
+        changes = {}
+        vendor_flags = {}
+        modified_times = {}
+
+        def on_result(path, status, has_vendor, modified):
+            if status == validation.DELETED:
+                deleted.append(path)
+            elif status == validation.UNREACHABLE:
+                unreachable.append(path)
+                changes[path] = {'unreachable': True}
+            else:
+                vendor_flags[path] = has_vendor
+                modified_times[path] = modified
+                changes[path] = {'has_vendor': has_vendor, 'unreachable': False,
+                                 'last_modified': modified}
+
+        try:
+            validation.Validator().run(projects, on_result)
+            if deleted:
+                self.store.remove_projects(deleted)
+            self.store.set_vendor_flags(vendor_flags)
+            self.store.set_last_modified(modified_times)
+        except Exception as e:
+            print(f"Error validating projects: {e}")
+        self.remove_rows(deleted)
+        self.update_rows(changes)
+        status = f"{len(projects) - len(deleted)} projects"
+        if deleted:
+            status += f", {len(deleted)} deleted removed"
+        if unreachable:
+            status += f", {len(unreachable)} unreachable"
+        self.set_status(status)
+        self.load_metadata(list(vendor_flags))
+        self.start_watcher()
+
+    def load_metadata(self, projects):
+        if not projects:
+            return
+        try:
+            results = MetadataExtractor(self.store).extract_many(projects)
+        except Exception as e:
+            print(f"Error reading project metadata: {e}")
+            return
+        self.update_rows({
+            path: dict(zip(('laravel_version', 'php_constraint', 'package_count'),
+                           metadata or (None, None, None)))
+            for path, metadata in results.items()
+        })
+
+    # Watching
+
+    def start_watcher(self):
+        self.stop_watcher()
+        with self.lock:
+            projects = [path for path, row in self.rows.items() if not row['unreachable']]
+        try:
+            roots = self.store.roots()
+        except Exception as e:
+            print(f"Error reading scanned roots: {e}")
+            roots = []
+        project_watcher = watcher.ProjectWatcher(
+            lambda changes: self.on_watch_changes(changes, roots), prune=self.prune)
+        self.watcher = project_watcher
+        project_watcher.start(roots, projects)
+
+    def stop_watcher(self):
+        if self.watcher is not None:
+            self.watcher.stop()
+            self.watcher = None
+
+    def on_watch_changes(self, changes, roots):
+        updates = {}
+        removed = []
+        metadata_paths = []
+        try:
+            for kind, path, has_vendor in changes:
+                if kind == watcher.ADDED:
+                    root = next((r for r in roots if path.startswith(os.path.join(r, ''))), None)
+                    self.store.upsert_projects([path], root=root, vendor_flags={path: has_vendor})
+                    updates[path] = {'has_vendor': has_vendor, 'unreachable': False}
+                    metadata_paths.append(path)
+                elif kind == watcher.REMOVED:
+                    self.store.remove_projects([path])
+                    removed.append(path)
+                elif kind == watcher.VENDOR:
+                    self.store.set_vendor_flags({path: has_vendor})
+                    if not has_vendor:
+                        self.store.save_usage(path, [('vendor', None, EMPTY_USAGE)])
+                    updates[path] = {'has_vendor': has_vendor,
+                                     'vendor_disk': None if has_vendor else 0,
+                                     'vendor_files': None if has_vendor else 0}
+                elif kind == watcher.METADATA:
+                    metadata_paths.append(path)
+        except Exception as e:
+            print(f"Error applying folder changes: {e}")
+        self.remove_rows(removed)
+        self.update_rows(updates)
+        self.load_metadata(metadata_paths)
+
+    # Scanning
+
+    def scan(self, roots, exclude=(), use_default_excludes=True, max_depth=None,
+             follow_symlinks=False, one_file_system=False, throttle=None, resume=False):
+        """Start a scan in the background; returns the roots that will be walked"""
+        with self.lock:
+            if self.scan_token is not None:
+                raise DaemonError("a scan is already running")
+        prune = PruneRules(exclude, use_defaults=use_default_excludes, max_depth=max_depth)
+        plan = ScanPlan(roots, prune)
+        if not plan.roots:
+            raise DaemonError("no valid folder to scan")
+        checkpoint_path = get_data_file_path("doscan_checkpoint")
+        checkpoint = ScanCheckpoint.load(checkpoint_path) if resume else ScanCheckpoint(checkpoint_path)
+        with self.lock:
+            # Checked again: another client may have started one while the plan was built
+            if self.scan_token is not None:
+                raise DaemonError("a scan is already running")
+            self.prune = prune
+            self.scan_token = ScanToken()
+            self.scan_stats = ScanStats()
+            self.scan_thread = threading.Thread(
+                target=self._scan, args=(plan, prune, self.scan_stats, self.scan_token,
+                                         follow_symlinks, one_file_system, throttle, checkpoint),
+                daemon=True)
+            self.scan_thread.start()
+        return plan.roots
+
+    def running_scan(self):
+        """Token of the running scan, or None"""
+        with self.lock:
+            return self.scan_token
+
+    def _report_progress(self, stats, token):
+        while self.running_scan() is token:
+            self.publish({'event': 'scan', 'state': 'paused' if token.paused else 'running',
+                          'text': stats.progress_summary()})
+            time.sleep(PROGRESS_SECONDS)
+
+    def _scan(self, plan, prune, stats, token, follow_symlinks, one_file_system, throttle,
+              checkpoint):
+        threading.Thread(target=self._report_progress, args=(stats, token), daemon=True).start()
+        index = ScanIndex.load(get_data_file_path("doscan_index"))
+        projects = []
+        vendor_flags = {}
+        modified_times = {}
+        found = {}
+        last_publish = time.monotonic()
+        try:
+            for path in iter_laravel_projects(plan, prune=prune, stats=stats, index=index,
+                                              token=token, follow_symlinks=follow_symlinks,
+                                              one_file_system=one_file_system,
+                                              throttle=throttle, checkpoint=checkpoint):
+                projects.append(path)
+                vendor_flags[path] = os.path.isdir(os.path.join(path, 'vendor'))
+                modified_times[path] = validation.last_modified(path)
+                found[path] = {'has_vendor': vendor_flags[path], 'unreachable': False,
+                               'last_modified': modified_times[path]}
+                if time.monotonic() - last_publish >= PUBLISH_SECONDS:
+                    last_publish = time.monotonic()
+                    self.update_rows(found)
+                    found = {}
+            self.update_rows(found)
+            index.save()
+
+            by_root = {}
+            for path in projects:
+                by_root.setdefault(plan.root_of(path), []).append(path)
+            for root, root_projects in by_root.items():
+                self.store.upsert_projects(root_projects, root=root, vendor_flags=vendor_flags)
+            self.store.set_last_modified(modified_times)
+            status = (f"Found {len(projects)} projects - Total: {self.store.count()} "
+                      f"({stats.prune_summary()}, {stats.index_summary()})")
+            if token.cancelled:
+                status = f"Scan stopped - {status}"
+            if throttle is not None and throttle.waits:
+                status += f" - {throttle.summary()}"
+        except Exception as e:
+            status = f"Scan failed: {e}"
+        with self.lock:
+            self.scan_token = None
+        self.status = status
+        self.publish({'event': 'scan', 'state': 'finished', 'text': status})
+        self.load_metadata(projects)
+        self.start_watcher()
+
+    def stop_scan(self):
+        """Cancel a running scan and wait until it has saved its checkpoint and projects"""
+        with self.lock:
+            token, thread = self.scan_token, self.scan_thread
+        if token is not None:
+            token.cancel()
+        if thread is not None:
+            thread.join()
+
+    # Vendor removal
+
+    def remove_vendor(self, paths, throttle=None):
+        with self.lock:
+            if self.purging:
+                raise DaemonError("vendor directories are already being removed")
+            paths = [p for p in paths if p in self.rows and self.rows[p]['has_vendor']
+                     and not self.rows[p]['unreachable']]
+            if not paths:
+                raise DaemonError("none of the projects has a vendor directory")
+            self.purging = True
+        threading.Thread(target=self._remove_vendor, args=(paths, throttle), daemon=True).start()
+        return paths
+
+    def resume_vendor_removal(self):
+        """Finish deleting vendor directories left half-deleted by an earlier session"""
+        with self.lock:
+            if self.purging:
+                return
+            self.purging = True
+        results = {}
+        try:
+            results = VendorPurger(self.store).resume_leftovers()
+        except Exception as e:
+            print(f"Error resuming vendor removal: {e}")
+        with self.lock:
+            self.purging = False
+        if results:
+            freed = sum(freed for _, freed, _ in results.values())
+            status = (f"Finished removing {len(results)} interrupted vendor deletion(s), "
+                      f"{format_size(freed)} freed")
+            self.status = status
+            self.publish({'event': 'purge', 'state': 'finished', 'text': status})
+
+    def _remove_vendor(self, paths, throttle):
+        def on_tombstoned(path, error):
+            if error is None:
+                self.update_rows({path: {'has_vendor': False, 'vendor_disk': 0, 'vendor_files': 0}})
+
+        results = {}
+        try:
+            results = VendorPurger(self.store, throttle=throttle).purge(paths, on_tombstoned)
+            vendor_states = {p: os.path.isdir(os.path.join(p, 'vendor')) for p in paths}
+            self.store.set_vendor_flags(vendor_states)
+            for path, has_vendor in vendor_states.items():
+                if not has_vendor:
+                    self.store.save_usage(path, [('vendor', None, EMPTY_USAGE)])
+        except Exception as e:
+            print(f"Error removing vendor directories: {e}")
+        freed = sum(freed for _, freed, _ in results.values())
+        failed = [path for path, (_, _, error) in results.items() if error]
+        status = f"Removed {len(results) - len(failed)} vendor directories, {format_size(freed)} freed"
+        if failed:
+            status += f" ({len(failed)} failed)"
+        if throttle is not None and throttle.waits:
+            status += f" - {throttle.summary()}"
+        with self.lock:
+            self.purging = False
+        self.status = status
+        self.publish({'event': 'purge', 'state': 'finished', 'text': status})
+
+    # Requests
+
+    def throttle(self, request):
+        """Throttle for the I/O limits of a request, or None"""
+        try:
+            return Throttle.from_options(request.get('max_ops'), request.get('max_bytes'),
+                                         request.get('idle', False))
+        except (TypeError, ValueError):
+            raise DaemonError("invalid I/O limit")
+
+    def handle(self, request, connection):
+        """Result of one request; raises DaemonError for a bad request"""
+        op = request.get('op')
+        if op == 'ping':
+            return 'pong'
+        if op == 'query':
+            with self.lock:
+                return [dict(row) for row in self.rows.values()]
+        if op == 'status':
+            with self.lock:
+                status = {
+                    'pid': os.getpid(),
+                    'started': self.started,
+                    'status': self.status,
+                    'projects': len(self.rows),
+                    'scanning': self.scan_token is not None,
+                    'purging': self.purging,
+                    'subscribers': len(self.subscribers),
+                }
+                stats = self.scan_stats
+            status['scan'] = stats.as_dict() if stats is not None else None
+            return status
+        if op == 'subscribe':
+            self.subscribe(connection, request.get('id'))
+            return ANSWERED
+        if op == 'scan':
+            return self.scan(request.get('roots') or [], request.get('exclude') or (),
+                             request.get('use_default_excludes', True), request.get('max_depth'),
+                             request.get('follow_symlinks', False),
+                             request.get('one_file_system', False), self.throttle(request),
+                             request.get('resume', False))
+        if op in ('cancel', 'pause', 'resume'):
+            token = self.running_scan()
+            if token is None:
+                return False
+            getattr(token, op)()
+            return True
+        if op == 'remove_vendor':
+            return self.remove_vendor(request.get('paths') or [], self.throttle(request))
+        if op == 'shutdown':
+            threading.Thread(target=self.shutdown, daemon=True).start()
+            return True
+        raise DaemonError(f"unknown op: {op}")
+
+    def serve(self, path=None):
+        """Listen on the Unix socket until shutdown(); returns False if a daemon already runs"""
+        path = path or socket_path()
+        if os.path.exists(path):
+            try:
+                DaemonClient(path).request('ping')
+                return False
+            except DaemonError:
+                # Left over by a daemon that did not exit cleanly
+                os.unlink(path)
+
+        daemon = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                connection = _Connection(self.wfile)
+                try:
+                    for line in self.rfile:
+                        request = None
+                        try:
+                            request = json.loads(line)
+                            result = daemon.handle(request, connection)
+                            if result is ANSWERED:
+                                continue
+                            response = {'id': request.get('id'), 'ok': True, 'result': result}
+                        except (DaemonError, ValueError, TypeError) as e:
+                            response = {'id': None, 'ok': False, 'error': str(e)}
+                            if isinstance(request, dict):
+                                response['id'] = request.get('id')
+                        connection.send(response)
+                except OSError:
+                    pass
+                finally:
+                    daemon.unsubscribe(connection)
+
+        class Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+            daemon_threads = True
+
+        old_umask = os.umask(0o077)
+        try:
+            self.server = Server(path, Handler)
+        finally:
+            os.umask(old_umask)
+        self.load()
+        # The daemon owns vendor removal, including deletions cut short earlier
+        threading.Thread(target=self.resume_vendor_removal, daemon=True).start()
+        try:
+            self.server.serve_forever()
+        finally:
+            self.server.server_close()
+            self.stop_scan()
+            self.stop_watcher()
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+        return True
+
+    def shutdown(self):
+        self.stop_scan()
+        if self.server is not None:
+            self.server.shutdown()
+
+
+class DaemonClient:
+    """Client of a running daemon; every request uses its own short connection"""
+
+    def __init__(self, path=None, timeout=CLIENT_TIMEOUT):
+        self.path = path or socket_path()
+        self.timeout = timeout
+        self._ids = 0
+
+    @classmethod
+    def connect(cls, path=None):
+        """A client of the running daemon, or None if there is none"""
+        if not is_supported():
+            return None
+        client = cls(path)
+        if not os.path.exists(client.path):
+            return None
+        try:
+            client.request('ping')
+        except DaemonError:
+            return None
+        return client
+
+    def _open(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.path)
+        except OSError as e:
+            sock.close()
+            raise DaemonError(f"daemon not reachable: {e}")
+        return sock
+
+    def request(self, op, **params):
+        """Send one request and return its result"""
+        self._ids += 1
+        message = {'id': self._ids, 'op': op, **params}
+        sock = self._open()
+        try:
+            sock.sendall((json.dumps(message) + '\n').encode('utf-8'))
+            with sock.makefile('rb') as reader:
+                line = reader.readline()
+        except OSError as e:
+            raise DaemonError(f"daemon not reachable: {e}")
+        finally:
+            sock.close()
+        if not line:
+            raise DaemonError("daemon closed the connection")
+        response = json.loads(line)
+        if not response.get('ok'):
+            raise DaemonError(response.get('error') or "request failed")
+        return response.get('result')
+
+    def subscribe(self, on_event, on_disconnect=None):
+        """Call on_event(event) from a reader thread for every event; returns a close function"""
+        sock = self._open()
+        reader = sock.makefile('rb')
+        try:
+            sock.sendall((json.dumps({'id': 0, 'op': 'subscribe'}) + '\n').encode('utf-8'))
+            # Wait for the answer; events are only published after it, and any
+            # that still come first are not dropped
+            while True:
+                line = reader.readline()
+                if not line:
+                    raise DaemonError("daemon closed the connection")
+                message = json.loads(line)
+                if 'event' in message:
+                    on_event(message)
+                elif message.get('id') == 0:
+                    break
+        except (OSError, ValueError) as e:
+            reader.close()
+            sock.close()
+            raise DaemonError(f"daemon not reachable: {e}")
+        sock.settimeout(None)
+        closed = threading.Event()
+
+        def read():
+            try:
+                for line in reader:
+                    message = json.loads(line)
+                    if 'event' in message:
+                        on_event(message)
+            except (OSError, ValueError):
+                pass
+            finally:
+                reader.close()
+                sock.close()
+                if on_disconnect is not None and not closed.is_set():
+                    on_disconnect()
+
+        def close():
+            closed.set()
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+        threading.Thread(target=read, daemon=True).start()
+        return close
+
+
+def start_background(path=None):
+    """Start a daemon process detached from this one; returns its client once it answers"""
+    client = DaemonClient.connect(path)
+    if client is not None:
+        return client
+    command = [sys.executable, os.path.abspath(__file__), 'serve']
+    if path:
+        command += ['--socket', path]
+    subprocess.Popen(command, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                     stderr=subprocess.DEVNULL, start_new_session=True)
+    deadline = time.monotonic() + CLIENT_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(0.1)
+        client = DaemonClient.connect(path)
+        if client is not None:
+            return client
+    raise DaemonError("the daemon did not start")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Background Laravel project scanner.")
+    parser.add_argument('--socket', help="socket path (default: doscanner.sock in the app data folder)")
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('serve', help="run the daemon in the foreground")
+    commands.add_parser('start', help="run the daemon in the background")
+    commands.add_parser('stop', help="stop the running daemon")
+    commands.add_parser('status', help="show what the daemon is doing")
+    commands.add_parser('query', help="print every known project as JSON")
+    scan = commands.add_parser('scan', help="scan folders in the daemon")
+    scan.add_argument('roots', nargs='+', metavar='ROOT')
+    scan.add_argument('-e', '--exclude', action='append', default=[], metavar='PATTERNS',
+                      help="comma-separated gitignore-style patterns to skip; repeatable")
+    scan.add_argument('--no-default-excludes', action='store_true',
+                      help="also walk node_modules and .git directories")
+    scan.add_argument('-d', '--max-depth', type=int, default=None)
+    scan.add_argument('-L', '--follow-symlinks', action='store_true')
+    scan.add_argument('-x', '--one-file-system', action='store_true')
+    scan.add_argument('--resume', action='store_true',
+                      help="continue an unfinished scan of the same folders")
+    scan.add_argument('--detach', action='store_true', help="return without waiting for the scan")
+    add_throttle_arguments(scan)
+    commands.add_parser('cancel', help="stop the running scan")
+    remove = commands.add_parser('remove-vendor', help="remove the vendor folder of projects")
+    remove.add_argument('projects', nargs='+', metavar='PROJECT')
+    add_throttle_arguments(remove)
+    args = parser.parse_args(argv)
+
+    if not is_supported():
+        print("Unix sockets are not available on this system", file=sys.stderr)
+        return 2
+    if args.command == 'serve':
+        if not ScanDaemon().serve(args.socket):
+            print("A daemon is already running", file=sys.stderr)
+            return 1
+        return 0
+
+    try:
+        if args.command == 'start':
+            print(start_background(args.socket).request('status')['pid'])
+            return 0
+        client = DaemonClient(args.socket)
+        if args.command == 'stop':
+            client.request('shutdown')
+        elif args.command == 'status':
+            print(json.dumps(client.request('status'), indent=2))
+        elif args.command == 'query':
+            print(json.dumps(client.request('query'), indent=2))
+        elif args.command == 'cancel':
+            print("cancelled" if client.request('cancel') else "no scan running")
+        elif args.command == 'remove-vendor':
+            paths = [os.path.abspath(p) for p in args.projects]
+            removing = client.request('remove_vendor', paths=paths, max_ops=args.max_ops,
+                                      max_bytes=args.max_bytes, idle=args.idle)
+            print(f"Removing {len(removing)} vendor folder(s)")
+        elif args.command == 'scan':
+            finished = threading.Event()
+
+            def on_event(event):
+                if event['event'] == 'scan':
+                    print(event['text'], file=sys.stderr)
+                    if event['state'] == 'finished':
+                        finished.set()
+
+            close = None if args.detach else client.subscribe(on_event, finished.set)
+            client.request('scan', roots=[os.path.abspath(r) for r in args.roots],
+                           exclude=[p for text in args.exclude for p in parse_patterns(text)],
+                           use_default_excludes=not args.no_default_excludes,
+                           max_depth=args.max_depth,
+                           follow_symlinks=args.follow_symlinks,
+                           one_file_system=args.one_file_system, max_ops=args.max_ops,
+                           max_bytes=args.max_bytes, idle=args.idle, resume=args.resume)
+            if close is not None:
+                finished.wait()
+                close()
+    except DaemonError as e:
+        print(e, file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
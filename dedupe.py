@@ -0,0 +1,484 @@
+"""De-duplicate vendor files across projects with a content-addressed hardlink store.
+
+Every regular vendor file that has a byte-identical twin (same SHA-256 and
+permission bits) is replaced by a hardlink to one object in the store
+under get_persistent_data_dir()/cas, so each package version is kept on
+disk once however many projects install it:
+
+    python dedupe.py ~/code/shop ~/code/blog           # dry run: reclaimable bytes
+    python dedupe.py ~/code/shop ~/code/blog --apply   # link the duplicates
+    python dedupe.py --verify                          # re-hash every stored object
+    python dedupe.py --undo ~/code/shop                # give one project its own copies
+
+Hardlinks only work within one filesystem, so files on another device
+than the store are left alone and reported. Linked files share their
+content: a file edited in place changes in every project linked to it,
+which --verify detects. Composer replaces files rather than editing them,
+so installs and updates simply unlink a project from the store.
+"""
+import os
+import sys
+import stat
+import json
+import time
+import shutil
+import hashlib
+import argparse
+import threading
+
+from throttle import add_throttle_arguments, run_workers, throttle_from_args
+from utils import format_size, get_persistent_data_dir
+from workqueue import WorkQueue
+
+
+DEFAULT_JOBS = 8
+
+# Smaller files are left alone: a link saves at most one block
+MIN_SIZE = 1024
+
+# Read size while hashing
+CHUNK_SIZE = 1 << 20
+
+# Minimum delay between two progress callbacks
+PROGRESS_INTERVAL = 0.2
+
+# Suffix of the temporary link renamed over a duplicate
+TEMP_SUFFIX = '.dedupe-tmp'
+
+
+def default_store_dir():
+    return os.path.join(get_persistent_data_dir(), 'cas')
+
+
+def hash_file(path, throttle=None):
+    """SHA-256 hex digest of a file's content"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+            if throttle is not None:
+                throttle.spend(0, len(chunk))
+    if throttle is not None:
+        throttle.spend(1)
+    return digest.hexdigest()
+
+
+def _disk_size(st):
+    # st_blocks is in 512-byte units; Windows has no st_blocks
+    if hasattr(st, 'st_blocks'):
+        return st.st_blocks * 512
+    return st.st_size
+
+
+def _same_file(a, b):
+    return a.st_ino == b.st_ino and a.st_dev == b.st_dev
+
+
+def _unchanged(before, after):
+    return (_same_file(before, after) and before.st_size == after.st_size
+            and before.st_mtime_ns == after.st_mtime_ns)
+
+
+def _list_files(directories, jobs, throttle=None):
+    """[(directory, path, stat)] of the regular files below each directory, walked in parallel"""
+    lock = threading.Lock()
+    files = []
+    work = WorkQueue(jobs)
+    work.push(0, [(directory, directory) for directory in directories])
+
+    def worker(index):
+        while True:
+            item = work.pop(index)
+            if item is None:
+                return
+            path, top = item
+            subdirs = []
+            found = []
+            try:
+                with os.scandir(path) as it:
+                    for entry in it:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                subdirs.append((entry.path, top))
+                            elif entry.is_file(follow_symlinks=False):
+                                found.append((top, entry.path, entry.stat(follow_symlinks=False)))
+                        except OSError:
+                            continue
+            except OSError:
+                pass
+            finally:
+                with lock:
+                    files.extend(found)
+                work.complete(index, subdirs)
+            if throttle is not None:
+                throttle.spend(1 + len(found))
+
+    run_workers(worker, jobs, throttle)
+    return files
+
+
+class DedupeReport:
+    """Outcome of a de-duplication run, or of a dry run"""
+
+    def __init__(self, dry_run):
+        self.dry_run = dry_run
+        self.projects = 0
+        self.files = 0
+        self.files_hashed = 0
+        self.bytes_hashed = 0
+        # Files replaced (or that would be replaced) by a link to the store
+        self.files_linked = 0
+        self.bytes_reclaimable = 0
+        self.already_linked = 0
+        self.other_device = 0
+        self.too_small = 0
+        self.changed = 0
+        self.cancelled = False
+        self.errors = []
+        # project -> bytes its duplicates free
+        self.by_project = {}
+        self.started = time.monotonic()
+        self.seconds = 0.0
+
+    def summary(self):
+        verb = "reclaimable" if self.dry_run else "reclaimed"
+        text = (f"{format_size(self.bytes_reclaimable)} {verb} in {self.files_linked:,} duplicate "
+                f"files of {self.projects} project(s)")
+        if self.already_linked:
+            text += f", {self.already_linked:,} already linked"
+        if self.other_device:
+            text += f", {self.other_device:,} on another filesystem"
+        if self.errors:
+            text += f", {len(self.errors)} error(s)"
+        return text
+
+    def as_dict(self):
+        data = dict(vars(self))
+        del data['started']
+        data['seconds'] = round(self.seconds, 3)
+        return data
+
+
+class Deduplicator:
+    """Link identical vendor files of many projects to one copy in a content-addressed store.
+
+    Objects live in <store>/objects/<first two hex digits>/<sha256>-<mode>,
+    so files with the same content but different permission bits are kept
+    apart (hardlinks share their mode). Only sizes shared by at least two
+    files, or by a stored object, are hashed at all; hashing runs in
+    `jobs` threads. Linking writes a temporary link next to the duplicate
+    and renames it over the duplicate, so a project never sees a missing
+    file, and a file that changed since it was hashed is skipped. A
+    throttle.Throttle caps the listings, links and bytes hashed per second.
+    """
+
+    def __init__(self, store_dir=None, jobs=DEFAULT_JOBS, min_size=MIN_SIZE, target='vendor',
+                 throttle=None):
+        self.store_dir = store_dir or default_store_dir()
+        self.objects_dir = os.path.join(self.store_dir, 'objects')
+        self.jobs = max(1, jobs)
+        self.min_size = max(1, min_size)
+        self.target = target
+        self.throttle = throttle
+
+    def object_path(self, digest, mode):
+        return os.path.join(self.objects_dir, digest[:2], f"{digest}-{stat.S_IMODE(mode):o}")
+
+    def _objects(self):
+        """{(st_dev, st_ino): (path, stat)} of every stored object"""
+        objects = {}
+        for _, path, st in _list_files([self.objects_dir], self.jobs, self.throttle):
+            if not path.endswith(TEMP_SUFFIX):
+                objects[(st.st_dev, st.st_ino)] = (path, st)
+        return objects
+
+    def _hash_all(self, paths, report, on_progress=None, token=None):
+        """{path: digest} of the given paths, hashed by the worker threads"""
+        digests = {}
+        lock = threading.Lock()
+        position = [0]
+        last_report = [0.0]
+
+        def worker(index):
+            while True:
+                if token is not None and token.cancelled:
+                    return
+                with lock:
+                    if position[0] >= len(paths):
+                        return
+                    path, size = paths[position[0]]
+                    position[0] += 1
+                try:
+                    digest = hash_file(path, self.throttle)
+                except OSError as e:
+                    with lock:
+                        report.errors.append(f"{path}: {e}")
+                    continue
+                with lock:
+                    digests[path] = digest
+                    report.files_hashed += 1
+                    report.bytes_hashed += size
+                    now = time.monotonic()
+                    if on_progress is not None and now - last_report[0] >= PROGRESS_INTERVAL:
+                        last_report[0] = now
+                        on_progress(report.files_hashed, len(paths))
+
+        run_workers(worker, min(self.jobs, max(1, len(paths))), self.throttle)
+        return digests
+
+    def run(self, project_paths, dry_run=True, on_progress=None, token=None):
+        """De-duplicate the vendor files of the projects; returns a DedupeReport.
+
+        With dry_run nothing is changed and the report tells what a real
+        run would reclaim. on_progress(files_hashed, files_to_hash) is
+        called from the hashing threads. A ScanToken can cancel the run
+        before anything is linked.
+        """
+        report = DedupeReport(dry_run)
+        os.makedirs(self.objects_dir, exist_ok=True)
+        store_dev = os.stat(self.store_dir).st_dev
+        if not dry_run:
+            self.collect_garbage()
+        objects = self._objects()
+        object_sizes = {st.st_size for _, st in objects.values()}
+
+        directories = {}
+        for project in project_paths:
+            directory = os.path.join(project, self.target)
+            if os.path.isdir(directory):
+                directories[directory] = project
+        report.projects = len(directories)
+
+        # Files of each inode; an inode linked twice inside the projects is hashed once
+        inodes = {}
+        for directory, path, st in _list_files(list(directories), self.jobs, self.throttle):
+            report.files += 1
+            if path.endswith(TEMP_SUFFIX):
+                continue
+            if st.st_dev != store_dev:
+                report.other_device += 1
+            elif st.st_size < self.min_size:
+                report.too_small += 1
+            elif (st.st_dev, st.st_ino) in objects:
+                report.already_linked += 1
+            else:
+                inodes.setdefault(st.st_ino, []).append((directories[directory], path, st))
+
+        # Only a size shared with another inode or a stored object can be a duplicate
+        sizes = {}
+        for links in inodes.values():
+            size = links[0][2].st_size
+            sizes[size] = sizes.get(size, 0) + 1
+        candidates = [(links[0][1], links[0][2].st_size) for links in inodes.values()
+                      if sizes[links[0][2].st_size] > 1 or links[0][2].st_size in object_sizes]
+        digests = self._hash_all(candidates, report, on_progress, token)
+        if token is not None and token.cancelled:
+            report.cancelled = True
+            report.seconds = time.monotonic() - report.started
+            return report
+
+        groups = {}
+        for links in inodes.values():
+            digest = digests.get(links[0][1])
+            if digest is not None:
+                groups.setdefault(self.object_path(digest, links[0][2].st_mode), []).append(links)
+
+        for object_path, group in groups.items():
+            stored = os.path.exists(object_path)
+            if not stored and len(group) < 2:
+                continue
+            # Without a stored object, the first copy becomes the object
+            replaced = group if stored else group[1:]
+            if not dry_run and not stored and not self._store_object(group[0], object_path, report):
+                continue
+            for links in replaced:
+                st = links[0][2]
+                # Blocks are freed only when every link to the inode is replaced
+                freed = _disk_size(st) if st.st_nlink <= len(links) else 0
+                linked = 0
+                for project, path, link_st in links:
+                    if dry_run or self._link(object_path, path, link_st, report):
+                        linked += 1
+                if linked:
+                    report.files_linked += linked
+                    if linked == len(links):
+                        project = links[0][0]
+                        report.bytes_reclaimable += freed
+                        report.by_project[project] = report.by_project.get(project, 0) + freed
+
+        report.seconds = time.monotonic() - report.started
+        return report
+
+    def _store_object(self, links, object_path, report):
+        """Hardlink the first copy of a group into the store"""
+        _, path, st = links[0]
+        try:
+            os.makedirs(os.path.dirname(object_path), exist_ok=True)
+            if not _unchanged(st, os.lstat(path)):
+                report.changed += 1
+                return False
+            os.link(path, object_path)
+            return True
+        except OSError as e:
+            report.errors.append(f"{path}: {e}")
+            return False
+
+    def _link(self, object_path, path, st, report):
+        """Replace path by a hardlink to object_path, unless it changed since it was hashed"""
+        temp_path = path + TEMP_SUFFIX
+        try:
+            if not _unchanged(st, os.lstat(path)):
+                report.changed += 1
+                return False
+            os.link(object_path, temp_path)
+            os.replace(temp_path, path)
+            if self.throttle is not None:
+                self.throttle.spend(3)
+            return True
+        except OSError as e:
+            report.errors.append(f"{path}: {e}")
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+            return False
+
+    def verify(self, project_paths=None):
+        """Re-hash every stored object and find files whose shared content was edited.
+
+        Returns {'objects', 'bytes', 'corrupt': [object paths], 'affected':
+        [files of project_paths linked to a corrupt object]}.
+        """
+        objects = self._objects()
+        report = DedupeReport(dry_run=True)
+        paths = [(path, st.st_size) for path, st in objects.values()]
+        digests = self._hash_all(paths, report)
+        corrupt = {}
+        for key, (path, st) in objects.items():
+            digest = digests.get(path)
+            if digest is not None and os.path.basename(path).split('-')[0] != digest:
+                corrupt[key] = path
+
+        affected = []
+        if corrupt and project_paths:
+            directories = [os.path.join(p, self.target) for p in project_paths]
+            for _, path, st in _list_files(directories, self.jobs, self.throttle):
+                if (st.st_dev, st.st_ino) in corrupt:
+                    affected.append(path)
+        return {
+            'objects': len(objects),
+            'bytes': sum(st.st_size for _, st in objects.values()),
+            'corrupt': sorted(corrupt.values()),
+            'affected': sorted(affected),
+            'errors': report.errors,
+        }
+
+    def undo(self, project_path):
+        """Give a project its own copies of every file linked to the store.
+
+        Returns (files copied, errors). Objects no other project links to
+        any more are removed afterwards.
+        """
+        objects = self._objects()
+        copied = 0
+        errors = []
+        directory = os.path.join(project_path, self.target)
+        for _, path, st in _list_files([directory], self.jobs, self.throttle):
+            if (st.st_dev, st.st_ino) not in objects or path.endswith(TEMP_SUFFIX):
+                continue
+            temp_path = path + TEMP_SUFFIX
+            try:
+                shutil.copy2(path, temp_path)
+                os.replace(temp_path, path)
+                copied += 1
+            except OSError as e:
+                errors.append(f"{path}: {e}")
+                try:
+                    os.unlink(temp_path)
+                except OSError:
+                    pass
+        self.collect_garbage()
+        return copied, errors
+
+    def collect_garbage(self):
+        """Remove stored objects no project links to any more; returns (objects, bytes) freed"""
+        removed = freed = 0
+        if not os.path.isdir(self.objects_dir):
+            return 0, 0
+        for _, path, st in _list_files([self.objects_dir], self.jobs, self.throttle):
+            if st.st_nlink > 1:
+                continue
+            try:
+                os.unlink(path)
+            except OSError:
+                continue
+            removed += 1
+            freed += _disk_size(st)
+        return removed, freed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="De-duplicate vendor files across Laravel projects with hardlinks.")
+    parser.add_argument('projects', nargs='*', metavar='PROJECT', help="project folder")
+    parser.add_argument('--apply', action='store_true',
+                        help="link the duplicates (default: only report what would be reclaimed)")
+    parser.add_argument('--verify', action='store_true',
+                        help="re-hash every stored object; lists edited files of the given projects")
+    parser.add_argument('--undo', action='store_true',
+                        help="give the given projects their own copies again")
+    parser.add_argument('--store', help="store folder (default: the app data folder's cas/)")
+    parser.add_argument('-j', '--jobs', type=int, default=DEFAULT_JOBS, help="hashing threads")
+    parser.add_argument('--min-size', type=int, default=MIN_SIZE,
+                        help="leave smaller files alone (bytes)")
+    parser.add_argument('--json', action='store_true', help="print the report as JSON")
+    add_throttle_arguments(parser)
+    args = parser.parse_args(argv)
+
+    throttle = throttle_from_args(args)
+    deduplicator = Deduplicator(args.store, args.jobs, args.min_size, throttle=throttle)
+    if args.verify:
+        result = deduplicator.verify(args.projects)
+        if args.json:
+            print(json.dumps(result, indent=2))
+        else:
+            print(f"{result['objects']:,} objects, {format_size(result['bytes'])}, "
+                  f"{len(result['corrupt'])} corrupt")
+            for path in result['corrupt'] + result['affected']:
+                print(f"  {path}")
+        return 1 if result['corrupt'] else 0
+
+    if not args.projects:
+        parser.error("no project given")
+    if args.undo:
+        failed = False
+        for project in args.projects:
+            copied, errors = deduplicator.undo(project)
+            print(f"{project}: {copied:,} files copied back")
+            for error in errors:
+                print(f"  {error}", file=sys.stderr)
+            failed = failed or bool(errors)
+        return 1 if failed else 0
+
+    report = deduplicator.run(args.projects, dry_run=not args.apply)
+    if args.json:
+        result = report.as_dict()
+        if throttle is not None:
+            result['throttle'] = throttle.as_dict()
+        print(json.dumps(result, indent=2))
+    else:
+        print(report.summary())
+        if throttle is not None and throttle.waits:
+            print(f"Throttled: {throttle.summary()}")
+        for project, freed in sorted(report.by_project.items(), key=lambda item: -item[1]):
+            print(f"  {format_size(freed):>10}  {project}")
+        for error in report.errors[:20]:
+            print(f"  {error}", file=sys.stderr)
+    return 1 if report.errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+import os
+import re
+import json
+import time
+
+
+# One read of this many bytes covers the whole composer.json of almost every
+# application; the require section sits near the top of the rest.
+PROBE_BYTES = 16 * 1024
+
+FRAMEWORK_PACKAGES = ('laravel/framework', 'laravel/lumen-framework')
+
+# Sections where a dependency counts as "this is a Laravel application"
+REQUIRE_SECTIONS = ('require', 'require-dev')
+
+_PACKAGE = re.compile(rb'"laravel/(?:lumen-)?framework"')
+# JSON escapes that could hide a package name from a plain byte search
+_ESCAPES = (b'\\/', b'\\u')
+
+_OPEN_FLAGS = os.O_RDONLY | getattr(os, 'O_BINARY', 0)
+
+
+def _read_prefix(composer_path):
+    """Read up to PROBE_BYTES with a single read; returns (data, complete)"""
+    fd = os.open(composer_path, _OPEN_FLAGS)
+    try:
+        data = os.read(fd, PROBE_BYTES)
+    finally:
+        os.close(fd)
+    return data, len(data) < PROBE_BYTES
+
+
+def _fast_reject(data, complete):
+    """True when the prefix proves the file does not name the framework at all.
+
+    A byte match is never taken as a yes: the file may be malformed or list
+    the package somewhere else, so a hit is confirmed by decoding.
+    """
+    if not complete or any(escape in data for escape in _ESCAPES):
+        return False
+    return not _PACKAGE.search(data)
+
+
+def requires_laravel(composer):
+    """Whether a decoded composer.json requires Laravel or Lumen, also as a dev dependency"""
+    for section in REQUIRE_SECTIONS:
+        dependencies = composer.get(section)
+        if isinstance(dependencies, dict) and any(p in dependencies for p in FRAMEWORK_PACKAGES):
+            return True
+    return False
+
+
+def probe_composer(composer_path, counters=None):
+    """Check whether a composer.json requires laravel/framework or laravel/lumen-framework.
+
+    The file is read with one os.read of PROBE_BYTES and searched as bytes;
+    a file that never names either package is rejected right there. Any
+    other file (a match, a file larger than the prefix, escaped names) is
+    decoded and its require sections looked up. `counters`, if given,
+    is a dict that receives per-stage counts and nanoseconds, the files and
+    bytes read, and, if it holds a 'probe_us' list, each probe's duration.
+    """
+    started = time.perf_counter_ns()
+    try:
+        data, complete = _read_prefix(composer_path)
+    except OSError:
+        return False
+    reads = 1
+    read_bytes = len(data)
+
+    if _fast_reject(data, complete):
+        if counters is not None:
+            _count(counters, 'fast', started, reads, read_bytes)
+        return False
+
+    try:
+        if not complete:
+            with open(composer_path, 'rb') as f:
+                data = f.read()
+            reads += 1
+            read_bytes += len(data)
+        composer = json.loads(data)
+        result = isinstance(composer, dict) and requires_laravel(composer)
+    except Exception:
+        result = False
+    if counters is not None:
+        _count(counters, 'full', started, reads, read_bytes)
+    return result
+
+
+def _count(counters, stage, started, reads, read_bytes):
+    elapsed = time.perf_counter_ns() - started
+    counters[f'probes_{stage}'] = counters.get(f'probes_{stage}', 0) + 1
+    counters[f'probe_{stage}_ns'] = counters.get(f'probe_{stage}_ns', 0) + elapsed
+    counters['files_read'] = counters.get('files_read', 0) + reads
+    counters['bytes_read'] = counters.get('bytes_read', 0) + read_bytes
+    samples = counters.get('probe_us')
+    if samples is not None:
+        samples.append(elapsed / 1000)
@@ -0,0 +1,274 @@
+"""Filesystems of a scan and a work queue that schedules each one separately.
+
+A slow device (a sleeping USB disk, an NFS home over a VPN) should not hold
+up the walk of a fast one, and a spinning disk gets slower, not faster,
+with more threads seeking on it. DeviceQueue keeps one queue and one
+concurrency limit per st_dev and tunes each limit from the measured
+throughput of that device.
+"""
+import os
+import time
+import threading
+from collections import deque
+
+
+# Filesystem types whose latency is a network round trip
+NETWORK_FS_TYPES = {
+    'nfs', 'nfs4', 'cifs', 'smb3', 'smbfs', 'afs', 'ncpfs', '9p', 'ceph', 'glusterfs',
+    'fuse.sshfs', 'fuse.rclone', 'fuse.s3fs', 'fuse.gcsfuse', 'davfs',
+}
+
+# Threads a spinning disk starts with; everything else starts with all of them
+ROTATIONAL_START_LIMIT = 2
+
+# Directories per device between two tuning steps, and the change in
+# throughput that counts as better or worse
+TUNE_WINDOW = 64
+TUNE_MARGIN = 0.1
+
+
+def _unescape(field):
+    # mountinfo escapes space, tab, newline and backslash as \ooo
+    return field.encode('utf-8').decode('unicode_escape').encode('latin-1').decode('utf-8')
+
+
+class MountTable:
+    """Mount points of the system, read once from /proc/self/mountinfo (Linux).
+
+    Elsewhere the table is empty and the walker falls back to the st_dev of
+    the directories it stats anyway.
+    """
+
+    def __init__(self, path='/proc/self/mountinfo'):
+        # mount point -> st_dev, and st_dev -> (mount point, filesystem type, source)
+        self.points = {}
+        self.devices = {}
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                lines = f.readlines()
+        except OSError:
+            return
+        for line in lines:
+            fields = line.split()
+            try:
+                separator = fields.index('-')
+                major, minor = fields[2].split(':')
+                device = os.makedev(int(major), int(minor))
+                point = _unescape(fields[4])
+                fs_type, source = fields[separator + 1], fields[separator + 2]
+            except (ValueError, IndexError):
+                continue
+            # Later lines mount over earlier ones
+            self.points[point] = device
+            known = self.devices.get(device)
+            if known is None or len(point) < len(known[0]):
+                self.devices[device] = (point, fs_type, _unescape(source))
+
+    def __bool__(self):
+        return bool(self.points)
+
+    def mount_point(self, path):
+        """Mount point a path lives on, from its text alone (no stat), or None"""
+        path = os.path.abspath(path)
+        while True:
+            if path in self.points:
+                return path
+            parent = os.path.dirname(path)
+            if parent == path:
+                return None
+            path = parent
+
+    def label(self, device):
+        entry = self.devices.get(device)
+        if entry is None:
+            return f"dev {os.major(device)}:{os.minor(device)}"
+        return entry[0]
+
+    def kind(self, device):
+        """'network', 'rotational', 'ssd' or 'unknown'"""
+        entry = self.devices.get(device)
+        if entry is not None and (entry[1] in NETWORK_FS_TYPES or entry[1].startswith('fuse.sshfs')):
+            return 'network'
+        block = f"/sys/dev/block/{os.major(device)}:{os.minor(device)}"
+        for queue_dir in (block, os.path.join(block, '..')):
+            try:
+                with open(os.path.join(queue_dir, 'queue', 'rotational'), 'r') as f:
+                    return 'rotational' if f.read().strip() == '1' else 'ssd'
+            except OSError:
+                continue
+        return 'unknown'
+
+
+class _Device:
+    """Queue, limit and throughput of one filesystem"""
+
+    def __init__(self, key, label, kind, limit):
+        self.key = key
+        self.label = label
+        self.kind = kind
+        self.items = deque()
+        self.active = 0
+        self.limit = limit
+        self.dirs = 0
+        self.busy = 0.0
+        self.first = None
+        self.last = None
+        # Current tuning window
+        self.window_dirs = 0
+        self.window_start = None
+        self.window_saturated = True
+        self.last_rate = None
+        self.direction = -1 if kind == 'network' else 1
+
+    def as_dict(self):
+        elapsed = (self.last - self.first) if self.first is not None else 0.0
+        return {
+            'device': self.label,
+            'kind': self.kind,
+            'dirs': self.dirs,
+            'dirs_per_second': round(self.dirs / elapsed, 1) if elapsed > 0 else 0.0,
+            'mean_latency_ms': round(self.busy / self.dirs * 1000, 3) if self.dirs else 0.0,
+            'threads': self.limit,
+            'queued': len(self.items),
+        }
+
+
+class DeviceQueue:
+    """Walker work queue with one queue and one concurrency limit per device.
+
+    Items are tuples whose fourth element is the st_dev of the directory.
+    A worker takes the deepest queued directory (LIFO, for locality) of
+    the least busy device that is below its limit; while other devices
+    have work queued, no device may take the workers they need, so a
+    device whose listings hang cannot absorb every thread.
+
+    Every TUNE_WINDOW directories of a device that had work queued the
+    whole time, its throughput is compared with the previous window's:
+    the limit keeps moving in the same direction while throughput
+    improves and turns around when it drops (hill climbing). Devices on
+    which more threads mean longer listings and no more directories per
+    second, like spinning disks, settle on few threads; network mounts,
+    whose latency hides well behind parallel requests, settle on many.
+    """
+
+    def __init__(self, workers, mounts=None):
+        self.workers = workers
+        self.mounts = mounts if mounts is not None else MountTable()
+        self._devices = {}
+        # worker -> the item it is processing, for snapshot()
+        self._running = {}
+        self._pending = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+    def _device(self, key):
+        device = self._devices.get(key)
+        if device is None:
+            kind = self.mounts.kind(key) if self.mounts else 'unknown'
+            limit = ROTATIONAL_START_LIMIT if kind == 'rotational' else self.workers
+            label = self.mounts.label(key) if self.mounts else f"dev {key}"
+            device = self._devices[key] = _Device(key, label, kind, min(limit, self.workers))
+        return device
+
+    def push(self, worker, items):
+        with self._cond:
+            for item in items:
+                self._device(item[3]).items.append(item)
+            self._pending += len(items)
+            self._cond.notify(len(items))
+
+    def _pick(self):
+        waiting = [device for device in self._devices.values() if device.items]
+        if not waiting:
+            return None
+        # Leave one worker for each other device with queued work
+        reserve = len(waiting) - 1
+        waiting.sort(key=lambda device: device.active)
+        for device in waiting:
+            if device.active < min(device.limit, max(1, self.workers - reserve)):
+                return device
+        return None
+
+    def pop(self, worker):
+        """Return the next directory for this worker, or None when done"""
+        with self._cond:
+            while True:
+                if self._closed:
+                    return None
+                device = self._pick()
+                if device is not None:
+                    device.active += 1
+                    if device.window_start is None:
+                        device.window_start = time.perf_counter()
+                    item = self._running[worker] = device.items.pop()
+                    return item
+                if self._pending == 0:
+                    return None
+                self._cond.wait()
+
+    def complete(self, worker, items, device_key=None, seconds=0.0):
+        """Mark one directory of device_key as processed and queue its children"""
+        with self._cond:
+            self._running.pop(worker, None)
+            device = self._devices.get(device_key)
+            if device is not None:
+                device.active -= 1
+                self._record(device, seconds)
+            for item in items:
+                self._device(item[3]).items.append(item)
+            self._pending += len(items) - 1
+            if self._pending == 0:
+                self._cond.notify_all()
+            else:
+                # A finished directory also frees a slot of its device
+                self._cond.notify(len(items) + 1)
+
+    def snapshot(self):
+        """Every item queued or being processed, in one consistent view.
+
+        Children are queued in the same step that finishes their parent,
+        so the items returned cover exactly the part of the walk not done
+        yet.
+        """
+        with self._cond:
+            items = list(self._running.values())
+            for device in self._devices.values():
+                items.extend(device.items)
+        return items
+
+    def close(self):
+        """Stop handing out work and wake up all idle workers"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def _record(self, device, seconds):
+        now = time.perf_counter()
+        device.dirs += 1
+        device.busy += seconds
+        if device.first is None:
+            device.first = now - seconds
+        device.last = now
+        device.window_dirs += 1
+        if not device.items:
+            # Throughput of a device that ran out of work says nothing about its limit
+            device.window_saturated = False
+        if device.window_dirs < TUNE_WINDOW:
+            return
+        if device.window_saturated and device.window_start is not None:
+            rate = device.window_dirs / max(now - device.window_start, 1e-6)
+            if device.last_rate is not None and rate < device.last_rate * (1 - TUNE_MARGIN):
+                # The last step made it worse: head back the other way
+                device.direction = -device.direction
+            device.limit = min(max(1, device.limit + device.direction), self.workers)
+            device.last_rate = rate
+        device.window_dirs = 0
+        device.window_start = now
+        device.window_saturated = True
+
+    def devices(self):
+        """Per-device counters, busiest first"""
+        with self._cond:
+            rows = [device.as_dict() for device in self._devices.values()]
+        rows.sort(key=lambda row: row['dirs'], reverse=True)
+        return rows
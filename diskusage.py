@@ -0,0 +1,187 @@
+import os
+import threading
+from collections import namedtuple
+
+from throttle import run_workers
+from workqueue import WorkQueue
+
+
+DEFAULT_JOBS = 8
+
+# Directories of a project that can be measured, relative to the project root
+TARGETS = {
+    'vendor': 'vendor',
+    'node_modules': 'node_modules',
+    'logs': os.path.join('storage', 'logs'),
+}
+
+# Files rewritten by the package manager on every install/update. Their mtime,
+# together with the directory's own, tells whether a cached size is stale.
+STAMP_FILES = {
+    'vendor': os.path.join('composer', 'installed.json'),
+    'node_modules': '.package-lock.json',
+}
+
+
+DiskUsage = namedtuple('DiskUsage', ['apparent', 'disk', 'files'])
+
+EMPTY_USAGE = DiskUsage(0, 0, 0)
+
+
+def usage_stamp(target, path):
+    """Cache key for a measured directory, or None if it cannot be cached.
+
+    Log files grow without touching their directory's mtime, so `logs` is
+    always measured again.
+    """
+    if target not in STAMP_FILES:
+        return None
+    try:
+        stamp = os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+    try:
+        stamp = max(stamp, os.stat(os.path.join(path, STAMP_FILES[target])).st_mtime_ns)
+    except OSError:
+        pass
+    return stamp
+
+
+def _disk_size(st):
+    # st_blocks is in 512-byte units; Windows has no st_blocks
+    if hasattr(st, 'st_blocks'):
+        return st.st_blocks * 512
+    return st.st_size
+
+
+class _Totals:
+    """Per-measurement totals shared by the worker threads"""
+
+    def __init__(self, seen_inodes):
+        self.lock = threading.Lock()
+        self.apparent = 0
+        self.disk = 0
+        self.files = 0
+        self.seen_inodes = seen_inodes if seen_inodes is not None else set()
+
+
+def _measure_directory(path, totals, throttle=None):
+    """List one directory and add its files; returns the subdirectories"""
+    try:
+        with os.scandir(path) as it:
+            entries = list(it)
+    except OSError:
+        return []
+    # The listing, then one stat per file
+    if throttle is not None:
+        throttle.spend(1 + len(entries))
+
+    subdirs = []
+    apparent = disk = files = 0
+    linked = []
+    for entry in entries:
+        try:
+            if entry.is_dir(follow_symlinks=False):
+                subdirs.append(entry.path)
+                continue
+            st = entry.stat(follow_symlinks=False)
+        except OSError:
+            continue
+        if st.st_nlink > 1:
+            # Hardlinked files are counted once, by inode
+            linked.append(st)
+            continue
+        apparent += st.st_size
+        disk += _disk_size(st)
+        files += 1
+
+    with totals.lock:
+        for st in linked:
+            key = (st.st_dev, st.st_ino)
+            if key in totals.seen_inodes:
+                continue
+            totals.seen_inodes.add(key)
+            apparent += st.st_size
+            disk += _disk_size(st)
+            files += 1
+        totals.apparent += apparent
+        totals.disk += disk
+        totals.files += files
+    return subdirs
+
+
+def measure(path, jobs=DEFAULT_JOBS, seen_inodes=None, throttle=None):
+    """Apparent size, on-disk size and file count of a directory tree.
+
+    The tree is walked by `jobs` threads sharing a work-stealing queue.
+    Symlinks are not followed. Pass the same `seen_inodes` set to several
+    calls to count files hardlinked between them only once, and a
+    throttle.Throttle to cap the operations per second.
+    """
+    jobs = max(1, jobs)
+    totals = _Totals(seen_inodes)
+    work = WorkQueue(jobs)
+    work.push(0, [path])
+
+    def worker(index):
+        while True:
+            directory = work.pop(index)
+            if directory is None:
+                return
+            subdirs = []
+            try:
+                subdirs = _measure_directory(directory, totals, throttle)
+            finally:
+                work.complete(index, subdirs)
+
+    run_workers(worker, jobs, throttle)
+    return DiskUsage(totals.apparent, totals.disk, totals.files)
+
+
+class DiskUsageEngine:
+    """Measure project directories, reusing sizes cached in the project store"""
+
+    def __init__(self, store=None, jobs=DEFAULT_JOBS, throttle=None):
+        self.store = store
+        self.jobs = jobs
+        self.throttle = throttle
+
+    def measure_project(self, project_path, targets=('vendor',)):
+        """Return {target: DiskUsage} for the targets that exist in the project"""
+        results = {}
+        cached = self.store.cached_usage(project_path) if self.store is not None else {}
+        fresh = []
+        for target in targets:
+            path = os.path.join(project_path, TARGETS[target])
+            if not os.path.isdir(path):
+                results[target] = EMPTY_USAGE
+                fresh.append((target, None, EMPTY_USAGE))
+                continue
+            stamp = usage_stamp(target, path)
+            hit = cached.get(target)
+            if stamp is not None and hit is not None and hit[0] == stamp:
+                results[target] = DiskUsage(*hit[1:])
+                continue
+            usage = measure(path, self.jobs, throttle=self.throttle)
+            results[target] = usage
+            fresh.append((target, stamp, usage))
+
+        if fresh and self.store is not None:
+            self.store.save_usage(project_path, fresh)
+        return results
+
+    def measure_projects(self, project_paths, targets=('vendor',), on_result=None, token=None):
+        """Measure many projects one after another, each with the parallel walker.
+
+        on_result(path, {target: DiskUsage}) is called after each project.
+        A ScanToken can be passed to stop between projects.
+        """
+        all_results = {}
+        for project_path in project_paths:
+            if token is not None and token.cancelled:
+                break
+            usage = self.measure_project(project_path, targets)
+            all_results[project_path] = usage
+            if on_result is not None:
+                on_result(project_path, usage)
+        return all_results
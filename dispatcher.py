@@ -0,0 +1,157 @@
+import time
+from collections import deque
+
+from instrumentation import Metrics
+
+
+# Longest the Tk thread spends on posted updates before it handles input and redraws
+SLICE_SECONDS = 0.008
+# Frame interval while updates are arriving, and while nothing is happening
+FRAME_MS = 16
+IDLE_MS = 50
+# Falling further behind than this is shown next to the status text
+LAG_REPORT_SECONDS = 0.25
+
+
+class UIDispatcher:
+    """Applies updates posted from any thread on the Tk thread, in time-boxed slices.
+
+    Worker threads call post(callback, *args) instead of touching widgets
+    or calling after() themselves. Each frame runs queued callbacks in
+    order for at most SLICE_SECONDS, then the callbacks registered with
+    touch() (list refreshes, button states) once each, then draws the
+    latest status() text; intermediate status texts are dropped. While
+    updates are waiting, frames follow each other with only a 1 ms gap so
+    Tk can process input in between.
+
+    post(), touch() and status() only append to a deque or assign, which
+    is atomic under the GIL, so they are safe from any thread.
+    """
+
+    def __init__(self, widget, set_status, slice_seconds=SLICE_SECONDS):
+        self.widget = widget
+        self._set_status = set_status
+        self.slice_seconds = slice_seconds
+        self._items = deque()
+        self._touched = {}
+        self._status = None
+        self._shown_status = None
+        self._shown_lag = None
+        self._tickers = []
+        self._running = False
+        # Wait of each update in the queue, and length of each slice
+        self.metrics = Metrics()
+        self.lag = 0.0
+        self.max_lag = 0.0
+        self.frames = 0
+        self.overruns = 0
+
+    def start(self):
+        if not self._running:
+            self._running = True
+            self.widget.after(FRAME_MS, self._frame)
+
+    def stop(self):
+        self._running = False
+
+    def post(self, callback, *args):
+        """Run callback(*args) on the Tk thread, after everything posted before it"""
+        self._items.append((time.perf_counter(), callback, args))
+
+    def touch(self, callback):
+        """Run callback() once at the end of the next frame, however often it is touched"""
+        self._touched[callback] = True
+
+    def status(self, text):
+        """Set the status text; only the latest text of a frame is drawn"""
+        self._status = text
+
+    def repeat(self, seconds, callback):
+        """Call callback() on the Tk thread every `seconds` until it returns False"""
+        self._tickers.append([time.perf_counter() + seconds, seconds, callback])
+
+    def _frame(self):
+        if not self._running:
+            return
+        started = time.perf_counter()
+        deadline = started + self.slice_seconds
+        items = self._items
+        waits = []
+        busy = bool(items or self._touched or self._tickers)
+        while items:
+            queued, callback, args = items.popleft()
+            now = time.perf_counter()
+            waits.append((now - queued) * 1e6)
+            try:
+                callback(*args)
+            except Exception as e:
+                print(f"Error applying UI update: {e}")
+            if time.perf_counter() >= deadline:
+                break
+
+        if self._tickers:
+            now = time.perf_counter()
+            for ticker in list(self._tickers):
+                if now < ticker[0]:
+                    continue
+                ticker[0] = now + ticker[1]
+                try:
+                    keep = ticker[2]() is not False
+                except Exception as e:
+                    print(f"Error applying UI update: {e}")
+                    keep = False
+                if not keep:
+                    self._tickers.remove(ticker)
+
+        while self._touched:
+            callback, _ = self._touched.popitem()
+            try:
+                callback()
+            except Exception as e:
+                print(f"Error applying UI update: {e}")
+
+        ended = time.perf_counter()
+        # How long the oldest update still waiting has been queued
+        self.lag = ended - items[0][0] if items else 0.0
+        self.max_lag = max(self.max_lag, self.lag)
+        self._draw_status()
+
+        if busy:
+            self.frames += 1
+            # A single slow callback can overshoot the budget; count the bad ones
+            if ended - started > 2 * self.slice_seconds:
+                self.overruns += 1
+            self.metrics.observe_many('ui_queue_wait_us', waits)
+            self.metrics.observe('ui_slice_us', (ended - started) * 1e6)
+
+        if items:
+            delay = 1
+        elif busy:
+            delay = FRAME_MS
+        else:
+            delay = IDLE_MS
+        self.widget.after(delay, self._frame)
+
+    def _draw_status(self):
+        # Never cleared, so a text set by a worker while drawing is not lost
+        text = self._status
+        lag = round(self.lag, 1) if self.lag >= LAG_REPORT_SECONDS else None
+        if text is self._shown_status and lag == self._shown_lag:
+            return
+        self._shown_status = text
+        self._shown_lag = lag
+        text = text or ""
+        if lag is not None:
+            text += f" (display {lag:.1f}s behind, {len(self._items):,} updates queued)"
+        self._set_status(text)
+
+    def as_dict(self):
+        return {
+            'backlog': len(self._items),
+            'lag_s': round(self.lag, 4),
+            'max_lag_s': round(self.max_lag, 4),
+            'frames': self.frames,
+            'overruns': self.overruns,
+            'slice_ms': self.slice_seconds * 1000,
+            **self.metrics.as_dict(),
+        }
@@ -1,15 +1,37 @@
 import os
+import json
 import threading
 import tkinter as tk
-from tkinter import filedialog, messagebox, ttk
-from datetime import datetime
-import shutil
+from tkinter import filedialog, messagebox
 
-from scanner import scan_for_laravel_projects
-from utils import open_folder, open_in_vscode, open_url, get_data_file_path
+from checkpoint import CHECKPOINT_WAIT_SECONDS, ScanCheckpoint
+from daemon import DaemonClient, DaemonError
+from dedupe import Deduplicator
+from diskusage import EMPTY_USAGE, DiskUsageEngine
+from dispatcher import UIDispatcher
+from instrumentation import Metrics, Profiler, format_report
+from metadata import MetadataExtractor
+from project_list import FILTERS, VirtualProjectList
+from prune import PruneRules, parse_patterns
+from purge import VendorPurger
+from scan_index import ScanIndex
+from scan_plan import ScanPlan, split_roots
+from scanner import ScanStats, ScanToken, iter_laravel_projects
+from snapshot import load_snapshot, save_snapshot
+from store import ProjectStore
+from throttle import Throttle
+from utils import format_size, open_url, get_data_file_path
+import validation
+import watcher
 
 
 class LaravelScannerApp(tk.Tk):
+    # How often the status bar shows the progress of a running scan
+    SCAN_PROGRESS_SECONDS = 0.1
+
+    # How long closing the window waits for a stopped scan to save its checkpoint and results
+    CLOSE_WAIT_SECONDS = CHECKPOINT_WAIT_SECONDS + 5.0
+
     # Laravel & Material Design Color Palette
     LARAVEL_RED = "#FF2D20"
     LARAVEL_RED_DARK = "#E6291C"
@@ -35,13 +57,37 @@ class LaravelScannerApp(tk.Tk):
         # Configure main window styling
         self.configure(bg=self.MATERIAL_GRAY_50)
         
+        # Known projects live in an SQLite store in the persistent data folder
+        self.store = ProjectStore(get_data_file_path("doprojects.db"))
+        self.watcher = None
+        self.scanning = False
+        # The running local scan, if any
+        self.scan_token = None
+        self.scan_thread = None
+        # Worker threads hand every UI change to the dispatcher, which applies
+        # them on the Tk thread in short slices
+        self.dispatcher = UIDispatcher(self, lambda text: self.status_label.config(text=text))
+        # Counters of the last scan, shown in the diagnostics window
+        self.scan_stats = None
+        self.diagnostics_window = None
+        # A running background daemon owns scanning and validation; None without one
+        self.daemon = DaemonClient.connect()
+        self.daemon_unsubscribe = None
+        
         self.create_widgets()
+        self.dispatcher.start()
         
-        # Load saved folder path on startup
+        # Load saved folder path and scan options on startup
         self.load_saved_folder_path()
+        self.load_scan_options()
         
-        # Load and validate projects from file on startup
+        # Draw the last known list at once; validation then fixes the rows that changed
+        self.show_snapshot()
         self.after(100, self.load_and_validate_projects)
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+        
+        # Finish vendor deletions interrupted by a crash or exit
+        self.after(1000, self.resume_vendor_purges)
 
     def create_widgets(self):
         # Header frame with Laravel red background (compact)
@@ -74,7 +120,7 @@ class LaravelScannerApp(tk.Tk):
         
         self.path_label = tk.Label(
             input_inner,
-            text="Select folder to scan:",
+            text=f"Select folders to scan (separate several with '{os.pathsep}'):",
             font=("Segoe UI", 10),
             bg=self.MATERIAL_WHITE,
             fg=self.MATERIAL_GRAY_800,
@@ -109,6 +155,175 @@ class LaravelScannerApp(tk.Tk):
         )
         self.browse_btn.pack(side=tk.LEFT)
 
+        self.add_folder_btn = self.create_material_button(
+            entry_frame,
+            text="Add Folder",
+            command=self.add_folder,
+            bg_color=self.MATERIAL_GRAY_300,
+            hover_color=self.MATERIAL_GRAY_200,
+            height=32
+        )
+        self.add_folder_btn.pack(side=tk.LEFT, padx=(8, 0))
+
+        # Prune options: extra exclude patterns and maximum depth
+        options_frame = tk.Frame(input_inner, bg=self.MATERIAL_WHITE)
+        options_frame.pack(fill=tk.X, pady=(0, 8))
+
+        tk.Label(
+            options_frame,
+            text="Exclude:",
+            font=("Segoe UI", 9),
+            bg=self.MATERIAL_WHITE,
+            fg=self.MATERIAL_GRAY_800
+        ).pack(side=tk.LEFT, padx=(0, 6))
+
+        self.exclude_entry = tk.Entry(
+            options_frame,
+            font=("Segoe UI", 9),
+            bg=self.MATERIAL_GRAY_100,
+            fg=self.MATERIAL_GRAY_900,
+            relief=tk.FLAT,
+            borderwidth=0,
+            insertbackground=self.LARAVEL_RED
+        )
+        self.exclude_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, ipady=4, padx=(0, 8))
+
+        self.use_default_prune_var = tk.BooleanVar(value=True)
+        tk.Checkbutton(
+            options_frame,
+            text="Skip heavy dirs",
+            variable=self.use_default_prune_var,
+            font=("Segoe UI", 9),
+            bg=self.MATERIAL_WHITE,
+            fg=self.MATERIAL_GRAY_800,
+            activebackground=self.MATERIAL_WHITE,
+            selectcolor=self.MATERIAL_WHITE
+        ).pack(side=tk.LEFT, padx=(0, 8))
+
+        tk.Label(
+            options_frame,
+            text="Max depth:",
+            font=("Segoe UI", 9),
+            bg=self.MATERIAL_WHITE,
+            fg=self.MATERIAL_GRAY_800
+        ).pack(side=tk.LEFT, padx=(0, 6))
+
+        # Empty means unlimited
+        self.max_depth_spinbox = tk.Spinbox(
+            options_frame,
+            from_=0,
+            to=99,
+            width=4,
+            font=("Segoe UI", 9),
+            bg=self.MATERIAL_GRAY_100,
+            relief=tk.FLAT,
+            borderwidth=0
+        )
+        self.max_depth_spinbox.delete(0, tk.END)
+        self.max_depth_spinbox.pack(side=tk.LEFT, ipady=4)
+
+        self.follow_symlinks_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(
+            options_frame,
+            text="Follow symlinks",
+            variable=self.follow_symlinks_var,
+            font=("Segoe UI", 9),
+            bg=self.MATERIAL_WHITE,
+            fg=self.MATERIAL_GRAY_800,
+            activebackground=self.MATERIAL_WHITE,
+            selectcolor=self.MATERIAL_WHITE
+        ).pack(side=tk.LEFT, padx=(8, 0))
+
+        self.one_file_system_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(
+            options_frame,
+            text="One filesystem",
+            variable=self.one_file_system_var,
+            font=("Segoe UI", 9),
+            bg=self.MATERIAL_WHITE,
+            fg=self.MATERIAL_GRAY_800,
+            activebackground=self.MATERIAL_WHITE,
+            selectcolor=self.MATERIAL_WHITE
+        ).pack(side=tk.LEFT, padx=(8, 0))
+
+        self.watch_var = tk.BooleanVar(value=True)
+        tk.Checkbutton(
+            options_frame,
+            text="Watch for changes",
+            variable=self.watch_var,
+            command=self.toggle_watcher,
+            font=("Segoe UI", 9),
+            bg=self.MATERIAL_WHITE,
+            fg=self.MATERIAL_GRAY_800,
+            activebackground=self.MATERIAL_WHITE,
+            selectcolor=self.MATERIAL_WHITE
+        ).pack(side=tk.LEFT, padx=(8, 0))
+
+        # I/O limits for scans, size analysis, vendor removal and de-duplication
+        io_frame = tk.Frame(input_inner, bg=self.MATERIAL_WHITE)
+        io_frame.pack(fill=tk.X, pady=(0, 8))
+
+        tk.Label(
+            io_frame,
+            text="I/O limit:",
+            font=("Segoe UI", 9),
+            bg=self.MATERIAL_WHITE,
+            fg=self.MATERIAL_GRAY_800
+        ).pack(side=tk.LEFT, padx=(0, 6))
+
+        # Empty means unlimited
+        self.max_ops_entry = tk.Entry(
+            io_frame,
+            width=7,
+            font=("Segoe UI", 9),
+            bg=self.MATERIAL_GRAY_100,
+            fg=self.MATERIAL_GRAY_900,
+            relief=tk.FLAT,
+            borderwidth=0,
+            insertbackground=self.LARAVEL_RED
+        )
+        self.max_ops_entry.pack(side=tk.LEFT, ipady=4)
+
+        tk.Label(
+            io_frame,
+            text="ops/s",
+            font=("Segoe UI", 9),
+            bg=self.MATERIAL_WHITE,
+            fg=self.MATERIAL_GRAY_800
+        ).pack(side=tk.LEFT, padx=(4, 8))
+
+        self.max_mbps_entry = tk.Entry(
+            io_frame,
+            width=5,
+            font=("Segoe UI", 9),
+            bg=self.MATERIAL_GRAY_100,
+            fg=self.MATERIAL_GRAY_900,
+            relief=tk.FLAT,
+            borderwidth=0,
+            insertbackground=self.LARAVEL_RED
+        )
+        self.max_mbps_entry.pack(side=tk.LEFT, ipady=4)
+
+        tk.Label(
+            io_frame,
+            text="MB/s",
+            font=("Segoe UI", 9),
+            bg=self.MATERIAL_WHITE,
+            fg=self.MATERIAL_GRAY_800
+        ).pack(side=tk.LEFT, padx=(4, 8))
+
+        self.idle_io_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(
+            io_frame,
+            text="Low priority",
+            variable=self.idle_io_var,
+            font=("Segoe UI", 9),
+            bg=self.MATERIAL_WHITE,
+            fg=self.MATERIAL_GRAY_800,
+            activebackground=self.MATERIAL_WHITE,
+            selectcolor=self.MATERIAL_WHITE
+        ).pack(side=tk.LEFT)
+
         # Action buttons frame (compact)
         buttons_frame = tk.Frame(input_inner, bg=self.MATERIAL_WHITE)
         buttons_frame.pack(fill=tk.X, pady=(4, 0))
@@ -124,6 +339,29 @@ class LaravelScannerApp(tk.Tk):
             height=32
         )
         self.scan_btn.pack(side=tk.LEFT, padx=(0, 8))
+
+        # Pause/resume and stop the running scan
+        self.pause_btn = self.create_material_button(
+            buttons_frame,
+            text="Pause",
+            command=self.toggle_pause_scan,
+            bg_color=self.MATERIAL_GRAY_300,
+            hover_color=self.MATERIAL_GRAY_200,
+            state=tk.DISABLED,
+            height=32
+        )
+        self.pause_btn.pack(side=tk.LEFT, padx=(0, 8))
+
+        self.stop_btn = self.create_material_button(
+            buttons_frame,
+            text="Stop",
+            command=self.stop_scan,
+            bg_color=self.MATERIAL_GRAY_300,
+            hover_color=self.MATERIAL_GRAY_200,
+            state=tk.DISABLED,
+            height=32
+        )
+        self.stop_btn.pack(side=tk.LEFT, padx=(0, 8))
         
         # Button to remove vendor packages from selected projects (compact, same height)
         self.remove_vendor_btn = self.create_material_button(
@@ -136,7 +374,55 @@ class LaravelScannerApp(tk.Tk):
             state=tk.DISABLED,
             height=32
         )
-        self.remove_vendor_btn.pack(side=tk.LEFT)
+        self.remove_vendor_btn.pack(side=tk.LEFT, padx=(0, 8))
+
+        # Measure vendor (and optionally node_modules/logs) sizes of the listed projects
+        self.analyze_btn = self.create_material_button(
+            buttons_frame,
+            text="Analyze Sizes",
+            command=self.analyze_sizes,
+            bg_color=self.MATERIAL_BLUE,
+            hover_color="#1976D2",
+            fg_color=self.MATERIAL_WHITE,
+            height=32
+        )
+        self.analyze_btn.pack(side=tk.LEFT, padx=(0, 8))
+
+        # Hardlink identical vendor files of the selected (or listed) projects to one copy
+        self.dedupe_btn = self.create_material_button(
+            buttons_frame,
+            text="Deduplicate",
+            command=self.deduplicate_vendors,
+            bg_color=self.MATERIAL_GRAY_300,
+            hover_color=self.MATERIAL_GRAY_200,
+            height=32
+        )
+        self.dedupe_btn.pack(side=tk.LEFT, padx=(0, 8))
+
+        self.include_extra_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(
+            buttons_frame,
+            text="Include node_modules & logs",
+            variable=self.include_extra_var,
+            font=("Segoe UI", 9),
+            bg=self.MATERIAL_WHITE,
+            fg=self.MATERIAL_GRAY_800,
+            activebackground=self.MATERIAL_WHITE,
+            selectcolor=self.MATERIAL_WHITE
+        ).pack(side=tk.LEFT)
+
+        # Counters, timings and profile of the last scan
+        self.diagnostics_btn = self.create_material_button(
+            buttons_frame,
+            text="Diagnostics",
+            command=self.show_diagnostics,
+            bg_color=self.MATERIAL_GRAY_300,
+            hover_color=self.MATERIAL_GRAY_200,
+            height=32
+        )
+        self.diagnostics_btn.pack(side=tk.RIGHT)
+        # Profiler used for the next scans: 'off', 'sample' or 'cprofile'
+        self.profile_mode_var = tk.StringVar(value='off')
 
         # Footer frame for status and credits (packed first to reserve space)
         footer_frame = tk.Frame(content_frame, bg=self.MATERIAL_GRAY_50, height=30)
@@ -166,55 +452,55 @@ class LaravelScannerApp(tk.Tk):
             padx=12
         )
         results_title.pack(side=tk.LEFT, fill=tk.Y)
-        
-        # Create scrollable frame for results (compact)
-        results_frame = tk.Frame(results_card, bg=self.MATERIAL_WHITE)
-        results_frame.pack(fill=tk.BOTH, expand=True, padx=8, pady=8)
-        
-        # Canvas and scrollbar for scrolling
-        self.results_canvas = tk.Canvas(
-            results_frame,
+
+        # Search and filter, applied to the list model without rebuilding any rows
+        self.filter_titles = {title: name for name, title in FILTERS}
+        self.filter_var = tk.StringVar(value=FILTERS[0][1])
+        filter_menu = tk.OptionMenu(results_header, self.filter_var, *self.filter_titles,
+                                    command=lambda _: self.dispatcher.touch(self.apply_search))
+        filter_menu.config(font=("Segoe UI", 8), relief=tk.FLAT, bg=self.MATERIAL_GRAY_100,
+                           highlightthickness=0)
+        filter_menu.pack(side=tk.RIGHT, padx=(0, 8))
+
+        self.search_var = tk.StringVar()
+        self.search_var.trace_add('write', lambda *_: self.dispatcher.touch(self.apply_search))
+        search_entry = tk.Entry(
+            results_header,
+            textvariable=self.search_var,
+            width=28,
+            font=("Segoe UI", 9),
             bg=self.MATERIAL_WHITE,
-            highlightthickness=0
-        )
-        scrollbar = ttk.Scrollbar(
-            results_frame,
-            orient="vertical",
-            command=self.results_canvas.yview
+            fg=self.MATERIAL_GRAY_900,
+            relief=tk.FLAT,
+            borderwidth=0,
+            insertbackground=self.LARAVEL_RED
         )
-        self.results_scrollable_frame = tk.Frame(
-            self.results_canvas,
-            bg=self.MATERIAL_WHITE
+        search_entry.pack(side=tk.RIGHT, padx=(0, 8), pady=4, ipady=2)
+        search_entry.bind("<Escape>", lambda e: self.search_var.set(""))
+        tk.Label(
+            results_header,
+            text="Search:",
+            font=("Segoe UI", 8),
+            bg=self.MATERIAL_GRAY_100,
+            fg=self.MATERIAL_GRAY_600
+        ).pack(side=tk.RIGHT, padx=(0, 4))
+
+        self.search_count_label = tk.Label(
+            results_header,
+            font=("Segoe UI", 8),
+            bg=self.MATERIAL_GRAY_100,
+            fg=self.MATERIAL_GRAY_600
         )
-        
-        def on_frame_configure(event):
-            self.results_canvas.configure(scrollregion=self.results_canvas.bbox("all"))
-        
-        self.results_scrollable_frame.bind("<Configure>", on_frame_configure)
-        
-        self.canvas_window = self.results_canvas.create_window(
-            (0, 0),
-            window=self.results_scrollable_frame,
-            anchor="nw"
+        self.search_count_label.pack(side=tk.RIGHT, padx=(0, 8))
+
+        # Virtualized list: only the visible rows have widgets (compact)
+        self.project_list = VirtualProjectList(
+            results_card,
+            self,
+            on_selection_change=self.update_remove_button_state,
+            on_view_change=self.show_search_count
         )
-        self.results_canvas.configure(yscrollcommand=scrollbar.set)
-        
-        # Bind mouse wheel scrolling
-        def _on_mousewheel(event):
-            self.results_canvas.yview_scroll(int(-1*(event.delta/120)), "units")
-        self.results_canvas.bind_all("<MouseWheel>", _on_mousewheel)
-        
-        # Update canvas width when window resizes
-        def configure_canvas_width(event):
-            canvas_width = event.width
-            self.results_canvas.itemconfig(self.canvas_window, width=canvas_width)
-        self.results_canvas.bind('<Configure>', configure_canvas_width)
-        
-        self.results_canvas.pack(side="left", fill="both", expand=True)
-        scrollbar.pack(side="right", fill="y")
-        
-        # Store project rows for selection
-        self.project_rows = []
+        self.project_list.pack(fill=tk.BOTH, expand=True, padx=8, pady=8)
 
         # Footer inner frame for proper layout
         footer_inner = tk.Frame(footer_frame, bg=self.MATERIAL_GRAY_50)
@@ -329,12 +615,83 @@ class LaravelScannerApp(tk.Tk):
             try:
                 with open(filename, 'r', encoding='utf-8') as f:
                     folder_path = f.read().strip()
-                    if folder_path and os.path.isdir(folder_path):
+                    if folder_path and any(os.path.isdir(p) for p in split_roots(folder_path)):
                         self.path_entry.delete(0, tk.END)
                         self.path_entry.insert(0, folder_path)
             except Exception as e:
                 print(f"Error loading folder path: {e}")
     
+    def save_scan_options(self):
+        """Save the prune options shown next to the path entry"""
+        filename = get_data_file_path("doscan_options")
+        options = {
+            'exclude': parse_patterns(self.exclude_entry.get()),
+            'use_default_prune': self.use_default_prune_var.get(),
+            'max_depth': self.max_depth_spinbox.get().strip(),
+            'watch': self.watch_var.get(),
+            'follow_symlinks': self.follow_symlinks_var.get(),
+            'one_file_system': self.one_file_system_var.get(),
+            'max_ops': self.max_ops_entry.get().strip(),
+            'max_mbps': self.max_mbps_entry.get().strip(),
+            'idle_io': self.idle_io_var.get(),
+            'profile': self.profile_mode_var.get(),
+        }
+        try:
+            with open(filename, 'w', encoding='utf-8') as f:
+                json.dump(options, f)
+        except Exception as e:
+            print(f"Error saving scan options: {e}")
+
+    def load_scan_options(self):
+        """Load the prune options from file"""
+        filename = get_data_file_path("doscan_options")
+        if os.path.exists(filename):
+            try:
+                with open(filename, 'r', encoding='utf-8') as f:
+                    options = json.load(f)
+                self.exclude_entry.delete(0, tk.END)
+                self.exclude_entry.insert(0, ", ".join(options.get('exclude', [])))
+                self.use_default_prune_var.set(options.get('use_default_prune', True))
+                self.max_depth_spinbox.delete(0, tk.END)
+                self.max_depth_spinbox.insert(0, options.get('max_depth', ''))
+                self.watch_var.set(options.get('watch', True))
+                self.follow_symlinks_var.set(options.get('follow_symlinks', False))
+                self.one_file_system_var.set(options.get('one_file_system', False))
+                self.max_ops_entry.delete(0, tk.END)
+                self.max_ops_entry.insert(0, options.get('max_ops', ''))
+                self.max_mbps_entry.delete(0, tk.END)
+                self.max_mbps_entry.insert(0, options.get('max_mbps', ''))
+                self.idle_io_var.set(options.get('idle_io', False))
+                self.profile_mode_var.set(options.get('profile', 'off'))
+            except Exception as e:
+                print(f"Error loading scan options: {e}")
+
+    def throttle_options(self):
+        """I/O limit options as keyword arguments of Throttle.from_options"""
+        mbps = self.max_mbps_entry.get().strip()
+        return {
+            'max_ops': self.max_ops_entry.get().strip() or None,
+            'max_bytes': f"{mbps}M" if mbps else None,
+            'idle': self.idle_io_var.get(),
+        }
+
+    def make_throttle(self):
+        """Throttle for the I/O limit options, or None when there is no limit"""
+        try:
+            return Throttle.from_options(**self.throttle_options())
+        except ValueError:
+            self.set_status("Invalid I/O limit - running without one")
+            return None
+
+    def get_prune_rules(self):
+        """Build the prune rules from the options next to the path entry"""
+        max_depth = self.max_depth_spinbox.get().strip()
+        return PruneRules(
+            patterns=parse_patterns(self.exclude_entry.get()),
+            use_defaults=self.use_default_prune_var.get(),
+            max_depth=int(max_depth) if max_depth.isdigit() else None
+        )
+
     def browse_folder(self):
         folder_selected = filedialog.askdirectory()
         if folder_selected:
@@ -343,169 +700,195 @@ class LaravelScannerApp(tk.Tk):
             # Save the selected folder path
             self.save_folder_path(folder_selected)
 
+    def add_folder(self):
+        """Append another folder to the list of folders to scan"""
+        folder_selected = filedialog.askdirectory()
+        if folder_selected:
+            roots = split_roots(self.path_entry.get())
+            if folder_selected not in roots:
+                roots.append(folder_selected)
+            self.path_entry.delete(0, tk.END)
+            self.path_entry.insert(0, os.pathsep.join(roots))
+            self.save_folder_path(self.path_entry.get())
+
     def start_scan(self):
-        root_dir = self.path_entry.get()
-        if not root_dir or not os.path.isdir(root_dir):
+        roots_text = self.path_entry.get()
+        prune = self.get_prune_rules()
+        # Nested, duplicate and missing folders are dropped before walking
+        plan = ScanPlan(split_roots(roots_text), prune)
+        if not plan.roots:
             messagebox.showerror("Error", "Please select a valid directory")
             return
 
-        # Save the folder path
-        self.save_folder_path(root_dir)
+        # Save the folder path and options
+        self.save_folder_path(roots_text)
+        self.save_scan_options()
+
+        # A scan of the same folders that was stopped or cut short can pick up where it was
+        checkpoint = ScanCheckpoint.load(get_data_file_path("doscan_checkpoint"))
+        resume = checkpoint.resumable(plan.roots, prune, self.follow_symlinks_var.get(),
+                                      self.one_file_system_var.get()) and messagebox.askyesno(
+            "Resume Scan",
+            f"An earlier scan of these folders did not finish: {checkpoint.describe()}.\n\n"
+            f"Resume it? Choose No to scan from the start.")
+        if not resume:
+            checkpoint = ScanCheckpoint(checkpoint.path)
+
+        if self.daemon is not None:
+            self.start_daemon_scan(plan, resume)
+            return
 
         # Clear previous results
-        for widget in self.results_scrollable_frame.winfo_children():
-            widget.destroy()
-        self.project_rows = []
+        self.clear_results()
         
-        self.status_label.config(text="Scanning...")
+        self.set_status("Resuming scan..." if resume else "Scanning...")
         self.scan_btn.config(state=tk.DISABLED)
+        self.pause_btn.config(state=tk.NORMAL, text="Pause")
+        self.stop_btn.config(state=tk.NORMAL)
+
+        # Timings are always collected; profiling only when asked for
+        profile_mode = self.profile_mode_var.get()
+        profiler = Profiler(profile_mode) if profile_mode in Profiler.MODES else None
+        self.scan_stats = ScanStats(Metrics(), profiler)
+        self.scan_token = ScanToken()
+        self.scanning = True
 
         # Run scan in another thread to avoid freezing UI
-        threading.Thread(target=self.scan_and_display,
-                         args=(root_dir,), daemon=True).start()
+        self.scan_thread = threading.Thread(
+            target=self.scan_and_display,
+            args=(plan, prune, self.scan_stats, self.scan_token, self.follow_symlinks_var.get(),
+                  self.one_file_system_var.get(), self.make_throttle(), checkpoint),
+            daemon=True)
+        self.scan_thread.start()
+        self.dispatcher.repeat(self.SCAN_PROGRESS_SECONDS, self.show_scan_progress)
 
-    def scan_and_display(self, root_dir):
-        projects = scan_for_laravel_projects(root_dir)
-        
-        # Clear previous results in UI thread
-        self.after(0, self.clear_results)
-        
-        # Create rows for each project (fix lambda closure issue)
-        def add_all_projects():
-            for proj in projects:
-                self.add_project_row(proj)
-        
-        self.after(0, add_all_projects)
+    def toggle_pause_scan(self):
+        """Pause the running scan, or resume it if it is paused"""
+        if self.daemon is not None:
+            paused = self.pause_btn.cget('text') == "Resume"
+            self.daemon_request('resume' if paused else 'pause')
+            self.pause_btn.config(text="Pause" if paused else "Resume")
+            return
+        if self.scan_token.paused:
+            self.scan_token.resume()
+            self.pause_btn.config(text="Pause")
+        else:
+            self.scan_token.pause()
+            self.pause_btn.config(text="Resume")
 
-        # Save results to file
-        self.save_results_to_file(projects, root_dir)
+    def stop_scan(self):
+        """Cancel the running scan, keeping the projects found so far"""
+        if self.daemon is not None:
+            self.daemon_request('cancel')
+        else:
+            self.scan_token.cancel()
+        self.pause_btn.config(state=tk.DISABLED, text="Pause")
+        self.stop_btn.config(state=tk.DISABLED)
+        self.set_status("Stopping scan...")
+
+    def scan_and_display(self, plan, prune, stats, token, follow_symlinks=False,
+                         one_file_system=False, throttle=None, checkpoint=None):
+        """Hand projects to the UI as the scan finds them"""
+        # Directories unchanged since the last scan are reused from the index
+        index = ScanIndex.load(get_data_file_path("doscan_index"))
+        projects = []
+        vendor_flags = {}
+        modified_times = {}
+        try:
+            for proj in iter_laravel_projects(plan, prune=prune, stats=stats, index=index,
+                                              token=token, follow_symlinks=follow_symlinks,
+                                              one_file_system=one_file_system,
+                                              throttle=throttle, checkpoint=checkpoint):
+                projects.append(proj)
+                vendor_flags[proj] = self.has_vendor_directory(proj)
+                modified_times[proj] = validation.last_modified(proj)
+                self.dispatcher.post(self.add_project_row, proj, vendor_flags[proj],
+                                     modified_times[proj])
+            index.save()
+
+            # Save results to file (partial results too if the scan was stopped)
+            status = self.save_results_to_file(projects, plan, stats, vendor_flags,
+                                               modified_times)
+            if token.cancelled:
+                status = f"Scan stopped - {status}"
+            if throttle is not None and throttle.waits:
+                status += f" - {throttle.summary()}"
+        except Exception as e:
+            status = f"Scan failed: {e}"
+        self.dispatcher.post(self.finish_scan, status)
 
-        self.after(0, lambda: self.scan_btn.config(state=tk.NORMAL))
+    def show_scan_progress(self):
+        """Progress of the running scan; returns False once it is over"""
+        if not self.scanning:
+            return False
+        if self.scan_token.paused:
+            self.set_status(f"Paused - {self.scan_stats.progress_summary()}")
+        elif not self.scan_token.cancelled:
+            self.set_status(f"Scanning... {self.scan_stats.progress_summary()}")
+        return True
+
+    def finish_scan(self, status):
+        self.scanning = False
+        self.set_status(status)
+        self.scan_btn.config(state=tk.NORMAL)
+        self.pause_btn.config(state=tk.DISABLED, text="Pause")
+        self.stop_btn.config(state=tk.DISABLED)
+        self.load_metadata(list(self.project_list.model.paths))
+        self.start_watcher()
+        self.save_snapshot()
+        self.refresh_diagnostics()
     
+    def set_status(self, text):
+        """Show text in the status bar; safe from any thread, drawn with the next frame"""
+        self.dispatcher.status(text)
+
     def clear_results(self):
         """Clear all project rows"""
-        for widget in self.results_scrollable_frame.winfo_children():
-            widget.destroy()
-        self.project_rows = []
+        self.project_list.clear()
+        self.update_remove_button_state()
     
     def has_vendor_directory(self, project_path):
         """Check if project has a vendor directory"""
         vendor_path = os.path.join(project_path, 'vendor')
         return os.path.exists(vendor_path) and os.path.isdir(vendor_path)
     
-    def add_project_row(self, project_path):
-        """Add a row with a VSCode button, vendor indicator, checkbox, and project path (compact)"""
-        # Create card-like row frame with Material Design styling (compact)
-        row_frame = tk.Frame(
-            self.results_scrollable_frame,
-            bg=self.MATERIAL_WHITE,
-            relief=tk.FLAT
-        )
-        row_frame.pack(fill=tk.X, padx=3, pady=3)
-        
-        # Inner frame with border effect (simulating elevation, compact)
-        inner_frame = tk.Frame(
-            row_frame,
-            bg=self.MATERIAL_GRAY_100,
-            relief=tk.FLAT
-        )
-        inner_frame.pack(fill=tk.X, padx=1, pady=1)
-        
-        content_frame = tk.Frame(inner_frame, bg=self.MATERIAL_WHITE)
-        content_frame.pack(fill=tk.X, padx=10, pady=6)
-        
-        # Check if vendor directory exists
-        has_vendor = self.has_vendor_directory(project_path)
-        
-        # Checkbox for selection (only enabled if vendor exists, compact)
-        checkbox_var = tk.BooleanVar()
-        checkbox = tk.Checkbutton(
-            content_frame,
-            variable=checkbox_var,
-            state=tk.NORMAL if has_vendor else tk.DISABLED,
-            command=lambda: self.update_remove_button_state(),
-            bg=self.MATERIAL_WHITE,
-            activebackground=self.MATERIAL_WHITE,
-            selectcolor=self.MATERIAL_WHITE
-        )
-        checkbox.pack(side=tk.LEFT, padx=(0, 8))
-        
-        # Vendor indicator with Material Design styling (compact)
-        vendor_indicator = tk.Label(
-            content_frame,
-            text="✓" if has_vendor else "✗",
-            fg=self.MATERIAL_GREEN if has_vendor else self.MATERIAL_GRAY_600,
-            bg=self.MATERIAL_WHITE,
-            font=("Segoe UI", 10, "bold"),
-            width=2
-        )
-        vendor_indicator.pack(side=tk.LEFT, padx=(0, 8))
-        
-        # Project path label (selectable) with Material Design typography (compact)
-        path_label = tk.Label(
-            content_frame,
-            text=project_path,
-            anchor="w",
-            cursor="hand2",
-            bg=self.MATERIAL_WHITE,
-            fg=self.MATERIAL_GRAY_900,
-            font=("Segoe UI", 9),
-            padx=8
-        )
-        path_label.pack(side=tk.LEFT, fill=tk.X, expand=True)
-        path_label.bind("<Double-1>", lambda e, p=project_path: open_folder(p))
-        
-        # VSCode button with Material Design styling (compact, same height)
-        vscode_btn = self.create_material_button(
-            content_frame,
-            text="VSCode",
-            command=lambda p=project_path: open_in_vscode(p),
-            bg_color=self.MATERIAL_BLUE,
-            hover_color="#1976D2",
-            fg_color=self.MATERIAL_WHITE,
-            font_size=8,
-            height=32
-        )
-        vscode_btn.pack(side=tk.LEFT, padx=(8, 0))
-        
-        # Store row reference
-        self.project_rows.append({
-            'frame': row_frame,
-            'inner_frame': inner_frame,
-            'content_frame': content_frame,
-            'path': project_path,
-            'has_vendor': has_vendor,
-            'checkbox': checkbox,
-            'checkbox_var': checkbox_var,
-            'vendor_indicator': vendor_indicator
-        })
-        
-        # Update canvas scroll region
-        self.results_canvas.update_idletasks()
-        self.results_canvas.configure(scrollregion=self.results_canvas.bbox("all"))
-        
-        # Update remove button state
-        self.update_remove_button_state()
+    def add_project_row(self, project_path, has_vendor=None, modified=None):
+        """Add a project to the list model; the widgets are recycled by the list"""
+        if has_vendor is None:
+            has_vendor = self.has_vendor_directory(project_path)
+        self.project_list.append(project_path, has_vendor)
+        if modified is not None:
+            model = self.project_list.model
+            model.set_value(model.index_of(project_path), 'last_modified', modified)
+        
+        # Update remove button state (once per frame)
+        self.dispatcher.touch(self.update_remove_button_state)
     
+    def apply_search(self):
+        """Narrow the list to the search text and the chosen filter"""
+        self.project_list.set_search(self.search_var.get(),
+                                     self.filter_titles.get(self.filter_var.get(), 'all'))
+
+    def show_search_count(self, shown, total):
+        if not self.project_list.is_narrowed():
+            text = ""
+        else:
+            text = f"{shown:,} of {total:,}"
+            if self.project_list.is_fuzzy():
+                text += " (fuzzy)"
+        if self.search_count_label.cget('text') != text:
+            self.search_count_label.config(text=text)
+
     def update_remove_button_state(self):
         """Update the remove vendor button state based on selected projects"""
-        selected_count = 0
-        for row in self.project_rows:
-            if row.get('has_vendor') and row.get('checkbox_var'):
-                if row['checkbox_var'].get():
-                    selected_count += 1
-        if selected_count > 0:
+        if self.project_list.model.selected_count() > 0:
             self.remove_vendor_btn.config(state=tk.NORMAL)
         else:
             self.remove_vendor_btn.config(state=tk.DISABLED)
     
     def remove_vendor_packages(self):
         """Remove vendor directories from selected projects"""
-        selected_projects = []
-        for row in self.project_rows:
-            if row.get('has_vendor') and row.get('checkbox_var'):
-                if row['checkbox_var'].get():
-                    selected_projects.append(row['path'])
+        selected_projects = self.project_list.model.selected_paths()
         
         if not selected_projects:
             messagebox.showinfo("Info", "No projects with vendor directory selected")
@@ -523,170 +906,717 @@ class LaravelScannerApp(tk.Tk):
             return
         
         # Remove vendor directories
-        self.status_label.config(text=f"Removing vendor directories from {count} project(s)...")
+        self.set_status(f"Removing vendor directories from {count} project(s)...")
         self.remove_vendor_btn.config(state=tk.DISABLED)
+        if self.daemon is not None:
+            # Rows flip to "no vendor" through the daemon's events
+            if self.daemon_request('remove_vendor', paths=selected_projects,
+                                   **self.throttle_options()) is None:
+                self.update_remove_button_state()
+            return
+        self.purge_progress = {}
+        throttle = self.make_throttle()
         
         def remove_vendors():
-            removed_count = 0
-            failed_count = 0
-            failed_projects = []
+            purger = VendorPurger(self.store, throttle=throttle)
             
-            for project_path in selected_projects:
-                vendor_path = os.path.join(project_path, 'vendor')
-                try:
-                    if os.path.exists(vendor_path):
-                        shutil.rmtree(vendor_path)
-                        removed_count += 1
-                except Exception as e:
-                    failed_count += 1
-                    failed_projects.append((project_path, str(e)))
+            def on_tombstoned(path, error):
+                self.dispatcher.post(self.mark_vendor_removed, path, error)
             
-            # Update UI
-            def update_ui():
-                # Refresh vendor indicators
-                for row in self.project_rows:
-                    if row['path'] in selected_projects:
-                        has_vendor = self.has_vendor_directory(row['path'])
-                        row['has_vendor'] = has_vendor
-                        row['vendor_indicator'].config(
-                            text="✓" if has_vendor else "✗",
-                            fg=self.MATERIAL_GREEN if has_vendor else self.MATERIAL_GRAY_600
-                        )
-                        row['checkbox'].config(state=tk.NORMAL if has_vendor else tk.DISABLED)
-                        if not has_vendor:
-                            row['checkbox_var'].set(False)
-                
-                self.update_remove_button_state()
-                
-                if failed_count == 0:
-                    self.status_label.config(
-                        text=f"Successfully removed vendor directories from {removed_count} project(s)"
-                    )
-                else:
-                    error_msg = f"Removed from {removed_count} project(s). Failed: {failed_count}"
-                    if failed_projects:
-                        error_msg += "\n" + "\n".join([f"  - {p}: {e}" for p, e in failed_projects[:3]])
-                    self.status_label.config(text=error_msg)
-                    if len(failed_projects) > 3:
-                        messagebox.showerror("Some removals failed", error_msg)
+            def on_progress(path, files, freed, done, error):
+                self.dispatcher.post(self.update_purge_progress, path, (files, freed, done, error))
             
-            self.after(0, update_ui)
+            results = {}
+            try:
+                results = purger.purge(selected_projects, on_tombstoned, on_progress)
+            except Exception as e:
+                print(f"Error removing vendor directories: {e}")
+            
+            vendor_states = [(p, self.has_vendor_directory(p)) for p in selected_projects]
+            try:
+                self.store.set_vendor_flags(dict(vendor_states))
+                for project_path, has_vendor in vendor_states:
+                    if not has_vendor:
+                        self.store.save_usage(project_path, [('vendor', None, EMPTY_USAGE)])
+            except Exception as e:
+                print(f"Error updating project store: {e}")
+            self.dispatcher.post(self.finish_vendor_removal, results, vendor_states, throttle)
         
         threading.Thread(target=remove_vendors, daemon=True).start()
+    
+    def mark_vendor_removed(self, path, error):
+        """A vendor directory was renamed away: the project has no vendor from now on"""
+        model = self.project_list.model
+        row = model.index_of(path)
+        if row is not None and error is None:
+            model.set_vendor(row, False)
+            model.set_value(row, 'vendor_disk', 0)
+            model.set_value(row, 'vendor_files', 0)
+            self.project_list.schedule_refresh()
+            self.dispatcher.touch(self.update_remove_button_state)
+    
+    def update_purge_progress(self, path, progress):
+        if self.purge_progress is not None:
+            self.purge_progress[path] = progress
+            self.dispatcher.touch(self.show_purge_progress)
+    
+    def show_purge_progress(self):
+        if self.purge_progress is None:
+            return
+        progress = self.purge_progress.values()
+        finished = sum(1 for _, _, is_done, _ in progress if is_done)
+        files = sum(p[0] for p in progress)
+        freed = sum(p[1] for p in progress)
+        self.set_status(f"Removing vendor directories: {finished}/{len(self.purge_progress)} done, "
+                        f"{files:,} files, {format_size(freed)} freed")
+    
+    def finish_vendor_removal(self, results, vendor_states, throttle=None):
+        self.purge_progress = None
+        model = self.project_list.model
+        # Refresh vendor indicators
+        for project_path, has_vendor in vendor_states:
+            row = model.index_of(project_path)
+            if row is not None:
+                model.set_vendor(row, has_vendor)
+                if not has_vendor:
+                    model.set_value(row, 'vendor_disk', 0)
+                    model.set_value(row, 'vendor_files', 0)
+        self.project_list.refresh()
+        self.update_remove_button_state()
+        
+        failed_projects = [(p, error) for p, (_, _, error) in results.items() if error]
+        removed_count = len(results) - len(failed_projects)
+        freed = sum(freed for _, freed, _ in results.values())
+        if not failed_projects:
+            text = (f"Successfully removed vendor directories from {removed_count} project(s), "
+                    f"{format_size(freed)} freed")
+            if throttle is not None and throttle.waits:
+                text += f" - {throttle.summary()}"
+            self.set_status(text)
+        else:
+            error_msg = f"Removed from {removed_count} project(s). Failed: {len(failed_projects)}"
+            error_msg += "\n" + "\n".join([f"  - {p}: {e}" for p, e in failed_projects[:3]])
+            self.set_status(error_msg)
+            if len(failed_projects) > 3:
+                messagebox.showerror("Some removals failed", error_msg)
+    
+    def resume_vendor_purges(self):
+        """Finish deleting vendor directories left half-deleted by a previous session"""
+        if self.daemon is not None:
+            # The daemon finishes them itself when it starts
+            return
+        throttle = self.make_throttle()
 
-    def read_projects_from_file(self):
-        """Read project paths from the file"""
-        filename = get_data_file_path("dolaravel_projects")
-        projects = []
+        def resume():
+            try:
+                results = VendorPurger(self.store, throttle=throttle).resume_leftovers()
+            except Exception as e:
+                print(f"Error resuming vendor removal: {e}")
+                return
+            if results:
+                freed = sum(freed for _, freed, _ in results.values())
+                text = (f"Finished removing {len(results)} interrupted vendor deletion(s), "
+                        f"{format_size(freed)} freed")
+                self.set_status(text)
+        
+        threading.Thread(target=resume, daemon=True).start()
+
+    def analyze_sizes(self):
+        """Measure the vendor directories (and optionally node_modules/logs) of all listed projects"""
+        model = self.project_list.model
+        projects = [path for row, path in enumerate(model.paths) if not model.is_unreachable(row)]
+        if not projects:
+            messagebox.showinfo("Info", "No projects to analyze")
+            return
         
-        if not os.path.exists(filename):
-            return projects
+        targets = ('vendor', 'node_modules', 'logs') if self.include_extra_var.get() else ('vendor',)
+        self.analyze_btn.config(state=tk.DISABLED)
+        self.set_status(f"Measuring sizes of {len(projects)} project(s)...")
+        throttle = self.make_throttle()
         
-        try:
-            with open(filename, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-                
-            # Find the separator line and get paths after it
-            separator_found = False
-            for line in lines:
-                line = line.strip()
-                if separator_found and line:  # After separator and not empty
-                    # Check if it's a valid path (not a header line)
-                    # A valid path should not be all equals signs and should look like a path
-                    if line and not line.startswith("=") and (os.path.sep in line or (len(line) > 2 and line[1] == ':')):
-                        projects.append(line)
-                elif line and all(c == '=' for c in line) and len(line) >= 10:  # Separator line (all equals, at least 10 chars)
-                    separator_found = True
-                    
-        except Exception as e:
-            print(f"Error reading file: {e}")
+        def measure():
+            engine = DiskUsageEngine(self.store, throttle=throttle)
+            
+            def on_result(path, usage):
+                self.dispatcher.post(self.apply_sizes, path, usage)
+            
+            try:
+                engine.measure_projects(projects, targets, on_result)
+            except Exception as e:
+                print(f"Error measuring sizes: {e}")
+            self.dispatcher.post(self.finish_size_analysis, throttle)
         
-        return projects
+        threading.Thread(target=measure, daemon=True).start()
+    
+    def finish_size_analysis(self, throttle=None):
+        self.analyze_btn.config(state=tk.NORMAL)
+        text = self.size_totals_text()
+        if throttle is not None and throttle.waits:
+            text += f" - {throttle.summary()}"
+        self.set_status(text)
     
-    def validate_projects(self, projects):
-        """Check which projects still exist and return only valid ones"""
-        valid_projects = []
-        for project_path in projects:
-            if os.path.exists(project_path) and os.path.isdir(project_path):
-                valid_projects.append(project_path)
-        return valid_projects
+    def apply_sizes(self, path, usage):
+        """Copy {target: DiskUsage} of one project into the list model"""
+        model = self.project_list.model
+        row = model.index_of(path)
+        if row is None:
+            return
+        vendor = usage.get('vendor')
+        if vendor is not None:
+            model.set_value(row, 'vendor_disk', vendor.disk)
+            model.set_value(row, 'vendor_files', vendor.files)
+        extra = [u.disk for target, u in usage.items() if target != 'vendor']
+        if extra:
+            model.set_value(row, 'extra_disk', sum(extra))
+        self.project_list.schedule_refresh()
+    
+    def deduplicate_vendors(self):
+        """Report what de-duplicating vendor files would reclaim, then link them if confirmed"""
+        model = self.project_list.model
+        projects = model.selected_paths()
+        if not projects:
+            # Nothing checked: every listed project with a reachable vendor directory
+            rows = [model.index_of(path) for path in self.project_list.visible_paths()]
+            projects = [model.paths[row] for row in rows
+                        if model.has_vendor(row) and not model.is_unreachable(row)]
+        if not projects:
+            messagebox.showinfo("Info", "No projects with vendor directories to de-duplicate")
+            return
+
+        self.dedupe_btn.config(state=tk.DISABLED)
+        self.set_status(f"Hashing vendor files of {len(projects)} project(s)...")
+        throttle = self.make_throttle()
+
+        def on_progress(hashed, total):
+            self.set_status(f"Hashing vendor files... {hashed:,} of {total:,}")
+
+        def dry_run():
+            try:
+                report = Deduplicator(throttle=throttle).run(projects, dry_run=True,
+                                                             on_progress=on_progress)
+            except Exception as e:
+                print(f"Error de-duplicating vendor files: {e}")
+                report = None
+            self.dispatcher.post(self.confirm_deduplication, projects, report)
+
+        threading.Thread(target=dry_run, daemon=True).start()
+
+    def confirm_deduplication(self, projects, report):
+        if report is None:
+            self.dedupe_btn.config(state=tk.NORMAL)
+            self.set_status("De-duplication failed")
+            return
+        if not report.files_linked:
+            self.dedupe_btn.config(state=tk.NORMAL)
+            self.set_status(f"Nothing to de-duplicate - {report.summary()}")
+            return
+        confirm = messagebox.askyesno(
+            "Confirm De-duplication",
+            f"{report.summary()}.\n\n"
+            f"Identical files will be replaced by hardlinks to one shared copy. "
+            f"Editing a linked file in place changes it in every project; "
+            f"'python dedupe.py --undo PROJECT' gives a project its own copies again."
+        )
+        if not confirm:
+            self.dedupe_btn.config(state=tk.NORMAL)
+            self.set_status("De-duplication cancelled")
+            return
+
+        self.set_status(f"De-duplicating vendor files of {len(projects)} project(s)...")
+        throttle = self.make_throttle()
+
+        def apply():
+            try:
+                result = Deduplicator(throttle=throttle).run(projects, dry_run=False)
+                status = f"De-duplicated: {result.summary()}"
+                if throttle is not None and throttle.waits:
+                    status += f" - {throttle.summary()}"
+            except Exception as e:
+                status = f"De-duplication failed: {e}"
+            self.dispatcher.post(self.finish_deduplication, status)
+
+        threading.Thread(target=apply, daemon=True).start()
+
+    def finish_deduplication(self, status):
+        self.dedupe_btn.config(state=tk.NORMAL)
+        self.set_status(status)
+
+    def size_totals_text(self):
+        """Status bar totals of the measured sizes"""
+        model = self.project_list.model
+        vendor_total, vendor_count = model.totals('vendor_disk')
+        files_total, _ = model.totals('vendor_files')
+        text = (f"Vendor total: {format_size(vendor_total)} in {files_total:,} files "
+                f"({vendor_count} projects measured)")
+        extra_total, extra_count = model.totals('extra_disk')
+        if extra_count:
+            text += f" - node_modules & logs: {format_size(extra_total)}"
+        return text
     
-    def update_file_with_projects(self, projects):
-        """Update the file with only valid projects"""
-        filename = get_data_file_path("dolaravel_projects")
+    def load_metadata(self, projects):
+        """Read Laravel version, PHP constraint and package count from composer.lock in the background"""
+        if not projects:
+            return
+        
+        def extract():
+            def on_result(path, metadata):
+                self.dispatcher.post(self.apply_metadata, path, metadata)
+            
+            try:
+                MetadataExtractor(self.store).extract_many(projects, on_result)
+            except Exception as e:
+                print(f"Error reading project metadata: {e}")
         
+        threading.Thread(target=extract, daemon=True).start()
+    
+    def apply_metadata(self, path, metadata):
+        """Copy the composer.lock metadata of one project into the list model"""
+        model = self.project_list.model
+        row = model.index_of(path)
+        if row is None:
+            return
+        if metadata is None:
+            metadata = (None, None, None)
+        for column, value in zip(('laravel_version', 'php_constraint', 'package_count'), metadata):
+            model.set_value(row, column, value)
+        self.project_list.schedule_refresh()
+    
+    def toggle_watcher(self):
+        self.save_scan_options()
+        if self.watch_var.get():
+            self.start_watcher()
+        else:
+            self.stop_watcher()
+            self.set_status("Stopped watching folders")
+    
+    def start_watcher(self):
+        """(Re)start watching the scanned roots and the listed projects"""
+        self.stop_watcher()
+        if not self.watch_var.get() or self.daemon is not None:
+            # An attached daemon watches the folders itself
+            return
+        model = self.project_list.model
+        projects = [path for row, path in enumerate(model.paths) if not model.is_unreachable(row)]
         try:
-            with open(filename, 'w', encoding='utf-8') as f:
-                f.write(f"Laravel Projects Scan Results\n")
-                f.write(f"Scan Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                f.write(f"Total Projects Found: {len(projects)}\n")
-                f.write(f"{'='*80}\n\n")
-                
-                for proj in projects:
-                    f.write(f"{proj}\n")
+            roots = self.store.roots()
         except Exception as e:
-            print(f"Error updating file: {e}")
+            print(f"Error reading scanned roots: {e}")
+            roots = []
+        project_watcher = watcher.ProjectWatcher(
+            lambda changes: self.on_watch_changes(changes, roots, project_watcher),
+            prune=self.get_prune_rules())
+        self.watcher = project_watcher
+        project_watcher.start(roots, projects)
     
+    def stop_watcher(self):
+        if self.watcher is not None:
+            self.watcher.stop()
+            self.watcher = None
+    
+    def on_watch_changes(self, changes, roots, project_watcher):
+        """Apply filesystem changes to the store (runs on the watcher thread)"""
+        metadata_paths = []
+        try:
+            for kind, path, has_vendor in changes:
+                if kind == watcher.ADDED:
+                    root = next((r for r in roots if path.startswith(os.path.join(r, ''))), None)
+                    self.store.upsert_projects([path], root=root, vendor_flags={path: has_vendor})
+                    metadata_paths.append(path)
+                elif kind == watcher.REMOVED:
+                    self.store.remove_projects([path])
+                elif kind == watcher.VENDOR:
+                    self.store.set_vendor_flags({path: has_vendor})
+                    if not has_vendor:
+                        self.store.save_usage(path, [('vendor', None, EMPTY_USAGE)])
+                elif kind == watcher.METADATA:
+                    metadata_paths.append(path)
+            metadata = MetadataExtractor(self.store).extract_many(metadata_paths)
+        except Exception as e:
+            print(f"Error applying folder changes: {e}")
+            metadata = {}
+        self.dispatcher.post(self.apply_watch_changes, changes, metadata, project_watcher)
+    
+    def apply_watch_changes(self, changes, metadata, project_watcher):
+        """Update only the rows touched by filesystem changes"""
+        if project_watcher is not self.watcher:
+            # Changes of a watcher that was stopped since
+            return
+        model = self.project_list.model
+        for kind, path, has_vendor in changes:
+            if kind == watcher.ADDED:
+                model.append(path, has_vendor)
+            elif kind == watcher.REMOVED:
+                model.remove(path)
+            elif kind == watcher.VENDOR:
+                row = model.index_of(path)
+                if row is not None:
+                    model.set_vendor(row, has_vendor)
+                    # A reinstalled vendor has not been measured yet
+                    model.set_value(row, 'vendor_disk', None if has_vendor else 0)
+                    model.set_value(row, 'vendor_files', None if has_vendor else 0)
+        for path, values in metadata.items():
+            self.apply_metadata(path, values)
+        
+        if changes:
+            self.project_list.schedule_refresh()
+            self.dispatcher.touch(self.update_remove_button_state)
+            self.set_status(
+                f"Applied {len(changes)} change(s) from the file system - {self.watcher.watch_summary()}")
+    
+    def read_projects_from_file(self):
+        """Read project paths from the project store"""
+        try:
+            # One-time import of the old dolaravel_projects text file
+            self.store.migrate_legacy_file(get_data_file_path("dolaravel_projects"))
+            return self.store.project_paths()
+        except Exception as e:
+            print(f"Error reading project store: {e}")
+            return []
+    
+    def remove_projects_from_file(self, projects):
+        """Remove projects that no longer exist from the store"""
+        try:
+            self.store.remove_projects(projects)
+        except Exception as e:
+            print(f"Error updating project store: {e}")
+    
+    def show_snapshot(self):
+        """Fill the list from the snapshot written when the list last changed"""
+        columns = load_snapshot(get_data_file_path("doprojects.snapshot"))
+        if columns is None:
+            return
+        try:
+            self.project_list.restore(columns)
+        except Exception as e:
+            print(f"Error loading project snapshot: {e}")
+            return
+        self.set_status(f"{len(self.project_list.model)} projects - checking...")
+        self.update_remove_button_state()
+
+    def save_snapshot(self):
+        save_snapshot(get_data_file_path("doprojects.snapshot"), self.project_list.model.columns())
+
+    def on_close(self):
+        if self.daemon_unsubscribe is not None:
+            self.daemon_unsubscribe()
+        if self.scanning and self.scan_thread is not None:
+            # Stop the local scan and let it write its checkpoint and the projects found so far
+            self.scan_token.cancel()
+            self.scan_thread.join(self.CLOSE_WAIT_SECONDS)
+        self.dispatcher.stop()
+        self.stop_watcher()
+        self.save_snapshot()
+        self.destroy()
+
     def load_and_validate_projects(self):
-        """Load projects from file, validate them, and display"""
-        self.status_label.config(text="Loading projects from file...")
+        """Validate the stored projects in the background and fix only the rows that changed.
+
+        Rows drawn from the snapshot stay on screen meanwhile. Rows whose
+        vendor or reachability status differs are updated, deleted projects
+        are dropped, and stored projects missing from the snapshot are added.
+        """
+        if self.daemon is not None:
+            self.attach_daemon()
+            return
+        shown = self.project_list.model.row_states()
+        if not shown:
+            self.set_status("Loading projects from file...")
         
         # Run in thread to avoid freezing UI
         def validate_and_display():
             projects = self.read_projects_from_file()
-            valid_projects = self.validate_projects(projects)
-            deleted_count = len(projects) - len(valid_projects)
+            stored_vendor = self.store.vendor_flags()
+            stored_sizes = self.store.project_sizes()
+            stored_metadata = self.store.cached_metadata()
+            stored_modified = self.store.last_modified()
+            deleted = []
+            unreachable = []
+            vendor_flags = {}
+            modified_times = {}
             
-            # Update file if some projects were deleted
-            if deleted_count > 0:
-                self.update_file_with_projects(valid_projects)
+            def on_result(path, status, has_vendor, modified):
+                if status == validation.DELETED:
+                    deleted.append(path)
+                    return
+                if status == validation.UNREACHABLE:
+                    # Keep the project and its last known vendor status
+                    unreachable.append(path)
+                    has_vendor = stored_vendor.get(path, False)
+                    modified = stored_modified.get(path)
+                else:
+                    vendor_flags[path] = has_vendor
+                    modified_times[path] = modified
+                state = (bool(has_vendor), status == validation.UNREACHABLE,
+                         None if modified is None else int(modified))
+                if shown.get(path) == state:
+                    # Already drawn as it is
+                    return
+                cached = stored_metadata.get(path)
+                self.dispatcher.post(
+                    self.apply_validated_row, path, has_vendor, state[1], modified,
+                    stored_sizes.get(path), cached[1] if cached is not None else None)
             
-            # Display valid projects in UI
-            self.after(0, self.clear_results)
+            validation.Validator().run(projects, on_result)
             
-            def display_projects():
-                for proj in valid_projects:
-                    self.add_project_row(proj)
-                
-                if deleted_count > 0:
-                    self.status_label.config(
-                        text=f"Loaded {len(valid_projects)} projects ({deleted_count} deleted projects removed)")
-                else:
-                    self.status_label.config(
-                        text=f"Loaded {len(valid_projects)} projects from file")
+            # Update the store: only projects that are really gone are removed
+            if deleted:
+                self.remove_projects_from_file(deleted)
+            try:
+                self.store.set_vendor_flags(vendor_flags)
+                self.store.set_last_modified(modified_times)
+            except Exception as e:
+                print(f"Error updating project store: {e}")
             
-            self.after(0, display_projects)
+            loaded = len(projects) - len(deleted)
+            details = []
+            if deleted:
+                details.append(f"{len(deleted)} deleted projects removed")
+            if unreachable:
+                details.append(f"{len(unreachable)} unreachable")
+            if details:
+                status = f"Loaded {loaded} projects ({', '.join(details)})"
+            else:
+                status = f"Loaded {loaded} projects from file"
+            skipped = set(deleted) | set(unreachable)
+            reachable = [p for p in projects if p not in skipped]
+            # Drawn rows that are deleted or no longer in the store
+            kept = set(projects) - set(deleted)
+            gone = [p for p in shown if p not in kept]
+            self.dispatcher.post(self.finish_validation, status, reachable, gone)
         
         threading.Thread(target=validate_and_display, daemon=True).start()
     
-    def save_results_to_file(self, projects, root_dir):
-        """Save the scan results to a text file"""
-        filename = get_data_file_path("dolaravel_projects")
-        
+    def apply_validated_row(self, path, has_vendor, unreachable, modified, sizes, metadata):
+        """Add or fix one row whose validated state differs from what is shown"""
+        model = self.project_list.model
+        row = model.append(path, has_vendor, unreachable)
+        model.set_value(row, 'last_modified', modified)
+        if sizes is not None:
+            for column, value in zip(('vendor_disk', 'vendor_files', 'extra_disk'), sizes):
+                model.set_value(row, column, value)
+        if metadata is not None:
+            self.apply_metadata(path, metadata)
+        self.project_list.schedule_refresh()
+        self.dispatcher.touch(self.update_remove_button_state)
+    
+    def finish_validation(self, status, reachable, gone):
+        self.project_list.remove_many(gone)
+        if self.project_list.model.totals('vendor_disk')[1]:
+            status += f" - {self.size_totals_text()}"
+        self.set_status(status)
+        self.update_remove_button_state()
+        self.save_snapshot()
+        # Refresh the stored metadata of projects whose composer.lock changed
+        self.load_metadata(reachable)
+        self.start_watcher()
+    
+    # Background daemon
+
+    def attach_daemon(self):
+        """Show the daemon's projects and follow its changes instead of validating here"""
+        self.set_status("Attaching to the background scanner...")
+
+        def attach():
+            try:
+                # Subscribed first, so no change between the two requests is lost
+                self.daemon_unsubscribe = self.daemon.subscribe(
+                    lambda event: self.dispatcher.post(self.apply_daemon_event, event),
+                    lambda: self.dispatcher.post(self.detach_daemon))
+                rows = self.daemon.request('query')
+                status = self.daemon.request('status')
+            except DaemonError as e:
+                print(f"Error attaching to the daemon: {e}")
+                self.dispatcher.post(self.detach_daemon)
+                return
+            self.dispatcher.post(self.apply_daemon_rows, rows, True)
+            self.dispatcher.post(self.set_status, f"Background scanner: {status['status']}")
+            if status['scanning']:
+                self.dispatcher.post(self.show_daemon_scan, True)
+
+        threading.Thread(target=attach, daemon=True).start()
+
+    def detach_daemon(self):
+        """The daemon went away: validate and watch locally from now on"""
+        if self.daemon is None:
+            return
+        self.daemon = None
+        self.daemon_unsubscribe = None
+        self.show_daemon_scan(False)
+        self.set_status("Background scanner stopped - checking projects here...")
+        self.load_and_validate_projects()
+
+    def daemon_request(self, op, **params):
+        """Send a request to the daemon; errors are shown in the status bar and return None"""
+        try:
+            return self.daemon.request(op, **params)
+        except DaemonError as e:
+            self.set_status(f"Background scanner: {e}")
+            return None
+
+    def start_daemon_scan(self, plan, resume=False):
+        prune = self.get_prune_rules()
+        result = self.daemon_request(
+            'scan', roots=plan.roots, exclude=parse_patterns(self.exclude_entry.get()),
+            use_default_excludes=self.use_default_prune_var.get(), max_depth=prune.max_depth,
+            follow_symlinks=self.follow_symlinks_var.get(),
+            one_file_system=self.one_file_system_var.get(), resume=resume,
+            **self.throttle_options())
+        if result is not None:
+            self.set_status("Scanning in the background scanner...")
+            self.show_daemon_scan(True)
+
+    def show_daemon_scan(self, running):
+        self.scanning = running
+        self.scan_btn.config(state=tk.DISABLED if running else tk.NORMAL)
+        self.pause_btn.config(state=tk.NORMAL if running else tk.DISABLED, text="Pause")
+        self.stop_btn.config(state=tk.NORMAL if running else tk.DISABLED)
+
+    def apply_daemon_rows(self, rows, replace=False):
+        """Copy rows sent by the daemon into the list model"""
+        model = self.project_list.model
+        if replace:
+            known = {row['path'] for row in rows}
+            model.remove_many([path for path in model.paths if path not in known])
+        for values in rows:
+            row = model.append(values['path'], values['has_vendor'], values['unreachable'])
+            for column in model.NUMERIC_COLUMNS + model.TEXT_COLUMNS:
+                model.set_value(row, column, values.get(column))
+        self.project_list.schedule_refresh()
+        self.dispatcher.touch(self.update_remove_button_state)
+
+    def apply_daemon_event(self, event):
+        kind = event['event']
+        if kind == 'rows':
+            self.apply_daemon_rows(event['rows'])
+        elif kind == 'removed':
+            self.project_list.remove_many(event['paths'])
+            self.dispatcher.touch(self.update_remove_button_state)
+        elif kind == 'status':
+            self.set_status(f"Background scanner: {event['text']}")
+        elif kind == 'scan':
+            running = event['state'] != 'finished'
+            if running != self.scanning:
+                self.show_daemon_scan(running)
+            self.set_status(event['text'])
+            if not running:
+                self.save_snapshot()
+        elif kind == 'purge':
+            self.set_status(event['text'])
+            self.update_remove_button_state()
+            self.save_snapshot()
+
+    def show_diagnostics(self):
+        """Open (or raise) the window with the counters and profile of the last scan"""
+        if self.diagnostics_window is not None and self.diagnostics_window.winfo_exists():
+            self.diagnostics_window.lift()
+            self.refresh_diagnostics()
+            return
+
+        window = tk.Toplevel(self)
+        window.title("Scan Diagnostics")
+        window.geometry("760x520")
+        window.configure(bg=self.MATERIAL_WHITE)
+        self.diagnostics_window = window
+
+        bar = tk.Frame(window, bg=self.MATERIAL_WHITE)
+        bar.pack(fill=tk.X, padx=12, pady=(12, 6))
+        tk.Label(
+            bar,
+            text="Profile scans:",
+            font=("Segoe UI", 9),
+            bg=self.MATERIAL_WHITE,
+            fg=self.MATERIAL_GRAY_800
+        ).pack(side=tk.LEFT, padx=(0, 6))
+        profile_menu = tk.OptionMenu(bar, self.profile_mode_var, 'off', *Profiler.MODES,
+                                     command=lambda _: self.save_scan_options())
+        profile_menu.config(font=("Segoe UI", 9), relief=tk.FLAT, bg=self.MATERIAL_GRAY_100)
+        profile_menu.pack(side=tk.LEFT)
+
+        self.create_material_button(
+            bar,
+            text="Export JSON",
+            command=self.export_diagnostics,
+            bg_color=self.MATERIAL_BLUE,
+            hover_color="#1976D2",
+            fg_color=self.MATERIAL_WHITE,
+            height=28
+        ).pack(side=tk.RIGHT)
+        self.create_material_button(
+            bar,
+            text="Refresh",
+            command=self.refresh_diagnostics,
+            bg_color=self.MATERIAL_GRAY_300,
+            hover_color=self.MATERIAL_GRAY_200,
+            height=28
+        ).pack(side=tk.RIGHT, padx=(0, 8))
+
+        self.diagnostics_text = tk.Text(
+            window,
+            font=("Consolas", 9),
+            bg=self.MATERIAL_GRAY_50,
+            fg=self.MATERIAL_GRAY_900,
+            relief=tk.FLAT,
+            wrap=tk.NONE
+        )
+        self.diagnostics_text.pack(fill=tk.BOTH, expand=True, padx=12, pady=(0, 12))
+        self.refresh_diagnostics()
+
+    def refresh_diagnostics(self):
+        """Redraw the diagnostics window, if it is open"""
+        window = self.diagnostics_window
+        if window is None or not window.winfo_exists():
+            return
+        text = format_report(self.diagnostics_data())
+        self.diagnostics_text.config(state=tk.NORMAL)
+        self.diagnostics_text.delete('1.0', tk.END)
+        self.diagnostics_text.insert('1.0', text)
+        self.diagnostics_text.config(state=tk.DISABLED)
+
+    def export_diagnostics(self):
+        """Save the diagnostics as JSON"""
+        filename = filedialog.asksaveasfilename(
+            parent=self.diagnostics_window,
+            defaultextension=".json",
+            filetypes=[("JSON files", "*.json")],
+            initialfile="scan-diagnostics.json"
+        )
+        if not filename:
+            return
         try:
-            # Read existing projects to merge
-            existing_projects = self.read_projects_from_file()
-            
-            # Combine existing and new projects, removing duplicates
-            all_projects = list(set(existing_projects + projects))
-            all_projects.sort()  # Sort for consistency
-            
             with open(filename, 'w', encoding='utf-8') as f:
-                f.write(f"Laravel Projects Scan Results\n")
-                f.write(f"Scan Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                f.write(f"Scanned Directory: {root_dir}\n")
-                f.write(f"Total Projects Found: {len(all_projects)}\n")
-                f.write(f"{'='*80}\n\n")
-                
-                for proj in all_projects:
-                    f.write(f"{proj}\n")
-            
-            # Update status to show file was saved (show just the filename, not full path)
-            file_display_name = os.path.basename(filename)
-            self.after(0, lambda: self.status_label.config(
-                text=f"Found {len(projects)} new projects - Total: {len(all_projects)} - Saved to {file_display_name}"))
+                json.dump(self.diagnostics_data(), f, indent=2)
         except Exception as e:
-            # Update status to show error
-            self.after(0, lambda: self.status_label.config(
-                text=f"Found {len(projects)} Laravel projects - Error saving file: {str(e)}"))
+            messagebox.showerror("Error", f"Error exporting diagnostics: {e}")
+
+    def diagnostics_data(self):
+        """Diagnostics of the last scan plus the state of the UI dispatcher"""
+        data = self.scan_stats.as_dict() if self.scan_stats is not None else {}
+        data['ui'] = self.dispatcher.as_dict()
+        return data
 
+    def save_results_to_file(self, projects, plan, stats=None, vendor_flags=None,
+                             modified_times=None):
+        """Save the scan results to the project store and return the status message"""
+        try:
+            # Merging with known projects is an upsert on the path, grouped by scanned root
+            by_root = {}
+            for project in projects:
+                by_root.setdefault(plan.root_of(project), []).append(project)
+            for root, root_projects in by_root.items():
+                self.store.upsert_projects(root_projects, root=root, vendor_flags=vendor_flags)
+            if modified_times:
+                self.store.set_last_modified(modified_times)
+            total = self.store.count()
+            
+            # Status showing the store was saved (just the filename, not full path)
+            file_display_name = os.path.basename(self.store.path)
+            status = f"Found {len(projects)} new projects - Total: {total} - Saved to {file_display_name}"
+            if len(plan.roots) > 1 or plan.dropped:
+                status += f" - {plan.summary()}"
+            if stats is not None:
+                status += (f" ({stats.prune_summary()}, {stats.index_summary()}, "
+                           f"{stats.probe_summary()})")
+            return status
+        except Exception as e:
+            # Status showing the error
+            return f"Found {len(projects)} Laravel projects - Error saving file: {str(e)}"
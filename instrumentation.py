@@ -0,0 +1,266 @@
+import sys
+import threading
+from collections import Counter
+
+
+class Histogram:
+    """Power-of-two buckets of durations in microseconds"""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+        self.buckets = Counter()
+
+    def observe(self, value):
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        self.buckets[int(value).bit_length()] += 1
+
+    def percentile(self, fraction):
+        """Upper bound of the bucket holding the given fraction of the values"""
+        if not self.count:
+            return 0
+        wanted = self.count * fraction
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= wanted:
+                return min((1 << bucket) - 1 if bucket else 0, round(self.max))
+        return round(self.max)
+
+    def as_dict(self):
+        return {
+            'count': self.count,
+            'total_us': round(self.total, 1),
+            'mean_us': round(self.total / self.count, 1) if self.count else 0,
+            'min_us': round(self.min or 0, 1),
+            'p50_us': self.percentile(0.5),
+            'p90_us': self.percentile(0.9),
+            'p99_us': self.percentile(0.99),
+            'max_us': round(self.max, 1),
+            # Bucket upper bound in microseconds -> number of values
+            'buckets': {str((1 << b) - 1 if b else 0): n for b, n in sorted(self.buckets.items())},
+        }
+
+
+class Metrics:
+    """Histograms and per-root durations shared by the threads of one scan.
+
+    Hot loops should collect values locally and hand them over in batches
+    through observe_many()/add_root(), as the walker does, to keep the lock
+    off the per-directory path.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.histograms = {}
+        # root -> [directories, first start (perf_counter), last end]
+        self.roots = {}
+
+    def observe(self, name, value_us):
+        self.observe_many(name, (value_us,))
+
+    def observe_many(self, name, values_us):
+        if not values_us:
+            return
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            for value in values_us:
+                histogram.observe(value)
+
+    def add_root(self, root, dirs, first, last):
+        with self._lock:
+            entry = self.roots.get(root)
+            if entry is None:
+                self.roots[root] = [dirs, first, last]
+            else:
+                entry[0] += dirs
+                entry[1] = min(entry[1], first)
+                entry[2] = max(entry[2], last)
+
+    def as_dict(self):
+        with self._lock:
+            return {
+                'histograms': {name: h.as_dict() for name, h in sorted(self.histograms.items())},
+                'roots': {
+                    root: {'dirs': dirs, 'seconds': round(last - first, 4)}
+                    for root, (dirs, first, last) in sorted(self.roots.items())
+                },
+            }
+
+
+class Profiler:
+    """Optional per-scan profiler for the walker threads.
+
+    'cprofile' runs a cProfile.Profile in every walker thread and merges
+    them; exact, but slows the scan down noticeably. 'sample' looks at the
+    walker threads' stacks every `interval` seconds from a separate thread;
+    cheap enough to leave on, and it also shows time spent blocked in
+    system calls.
+    """
+
+    MODES = ('cprofile', 'sample')
+
+    def __init__(self, mode='sample', interval=0.005):
+        if mode not in self.MODES:
+            raise ValueError(f"unknown profiler mode: {mode}")
+        self.mode = mode
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._stats = None
+        self._threads = set()
+        self._samples = Counter()
+        self._stacks = Counter()
+        self._sample_count = 0
+        self._stop = threading.Event()
+        self._sampler = None
+
+    def start(self):
+        if self.mode == 'sample' and self._sampler is None:
+            self._stop.clear()
+            self._sampler = threading.Thread(target=self._sample_loop, daemon=True)
+            self._sampler.start()
+
+    def stop(self):
+        if self._sampler is not None:
+            self._stop.set()
+            self._sampler.join()
+            self._sampler = None
+
+    def run(self, function, *args):
+        """Run function(*args) in the calling thread under the profiler"""
+        if self.mode == 'cprofile':
+            # Imported here: pstats pulls in a lot and is rarely needed
+            import cProfile
+            import pstats
+            profile = cProfile.Profile()
+            try:
+                return profile.runcall(function, *args)
+            finally:
+                with self._lock:
+                    if self._stats is None:
+                        self._stats = pstats.Stats(profile)
+                    else:
+                        self._stats.add(profile)
+
+        ident = threading.get_ident()
+        with self._lock:
+            self._threads.add(ident)
+        try:
+            return function(*args)
+        finally:
+            with self._lock:
+                self._threads.discard(ident)
+
+    def _sample_loop(self):
+        while not self._stop.wait(self.interval):
+            with self._lock:
+                threads = set(self._threads)
+            if not threads:
+                continue
+            frames = sys._current_frames()
+            for ident in threads:
+                frame = frames.get(ident)
+                if frame is None:
+                    continue
+                code = frame.f_code
+                self._samples[f"{code.co_filename}:{frame.f_lineno}({code.co_name})"] += 1
+                stack = []
+                while frame is not None and len(stack) < 12:
+                    stack.append(frame.f_code.co_name)
+                    frame = frame.f_back
+                self._stacks[';'.join(reversed(stack))] += 1
+                self._sample_count += 1
+
+    def as_dict(self, top=25):
+        if self.mode == 'cprofile':
+            if self._stats is None:
+                return {'mode': self.mode, 'functions': []}
+            rows = []
+            for (filename, line, name), (_, calls, own, cumulative, _) in self._stats.stats.items():
+                rows.append({
+                    'function': f"{filename}:{line}({name})",
+                    'calls': calls,
+                    'own_s': round(own, 6),
+                    'cumulative_s': round(cumulative, 6),
+                })
+            rows.sort(key=lambda row: row['own_s'], reverse=True)
+            return {'mode': self.mode, 'functions': rows[:top]}
+
+        total = self._sample_count or 1
+        return {
+            'mode': self.mode,
+            'interval_s': self.interval,
+            'samples': self._sample_count,
+            'top_frames': [
+                {'frame': frame, 'samples': n, 'share': round(n / total, 4)}
+                for frame, n in self._samples.most_common(top)
+            ],
+            'top_stacks': [
+                {'stack': stack, 'samples': n}
+                for stack, n in self._stacks.most_common(top)
+            ],
+        }
+
+
+def _histogram_lines(histograms):
+    lines = [f"{'Histogram (us)':<22}{'count':>9}{'mean':>9}{'p50':>8}{'p90':>8}"
+             f"{'p99':>8}{'max':>10}"]
+    for name, h in histograms.items():
+        lines.append(f"  {name:<20}{h['count']:>9,}{h['mean_us']:>9.1f}{h['p50_us']:>8}"
+                     f"{h['p90_us']:>8}{h['p99_us']:>8}{h['max_us']:>10.0f}")
+    return lines
+
+
+def format_report(data, top=10):
+    """Plain-text rendering of ScanStats.as_dict() for the diagnostics panel.
+
+    A 'ui' entry (UIDispatcher.as_dict()) is rendered too; without scan
+    counters only that part is shown.
+    """
+    lines = []
+    if 'counters' not in data:
+        lines.append("No scan has run yet.")
+    else:
+        lines += [f"Elapsed: {data['elapsed_s']:.3f}s"
+                  + ("" if data.get('finished') else " (running)")
+                  + f" - {data['dirs_per_second']:.0f} dirs/s", ""]
+        lines.append("Counters")
+        for name, value in data['counters'].items():
+            lines.append(f"  {name:<18}{value:>14,}")
+
+    metrics = data.get('metrics')
+    if metrics:
+        lines += [""] + _histogram_lines(metrics['histograms'])
+        if metrics['roots']:
+            lines += ["", "Roots"]
+            for root, values in metrics['roots'].items():
+                lines.append(f"  {values['seconds']:>8.3f}s {values['dirs']:>10,} dirs  {root}")
+
+    profile = data.get('profile')
+    if profile:
+        lines += ["", f"Profile ({profile['mode']})"]
+        if profile['mode'] == 'cprofile':
+            for row in profile['functions'][:top]:
+                lines.append(f"  {row['own_s']:>9.4f}s {row['calls']:>9,}  {row['function']}")
+        else:
+            lines.append(f"  {profile['samples']} samples every {profile['interval_s'] * 1000:g} ms")
+            for row in profile['top_frames'][:top]:
+                lines.append(f"  {row['share'] * 100:>5.1f}% {row['samples']:>7}  {row['frame']}")
+
+    ui = data.get('ui')
+    if ui:
+        lines += ["", f"UI updates: {ui['frames']:,} frames, {ui['overruns']:,} over the "
+                      f"{ui['slice_ms']:g} ms budget, {ui['backlog']:,} queued, "
+                      f"lag {ui['lag_s']:.3f}s (max {ui['max_lag_s']:.3f}s)"]
+        if ui['histograms']:
+            lines += _histogram_lines(ui['histograms'])
+    return '\n'.join(lines)
@@ -0,0 +1,199 @@
+import os
+import re
+import json
+import queue
+import threading
+from collections import namedtuple
+
+
+DEFAULT_JOBS = 8
+
+FRAMEWORK_PACKAGES = ('laravel/framework', 'laravel/lumen-framework')
+
+# composer.lock is read in chunks of this many characters
+READ_CHUNK = 64 * 1024
+
+
+ProjectMetadata = namedtuple('ProjectMetadata', ['laravel_version', 'php_constraint', 'package_count'])
+
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_VERSION_PART = re.compile(r'\d+')
+
+
+class _LockStream:
+    """Minimal pull parser over a composer.lock file.
+
+    Only the structure around the values we need is walked by hand; each
+    value itself (a package object, a string, ...) is decoded by the C
+    JSON decoder. The buffer never holds much more than one package, so a
+    lock file of several MB is read without loading it whole.
+    """
+
+    def __init__(self, f):
+        self.f = f
+        self.buf = ''
+        self.pos = 0
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self):
+        data = self.f.read(READ_CHUNK)
+        if not data:
+            return False
+        self.buf = self.buf[self.pos:] + data
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Next non-whitespace character, without consuming it"""
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                raise ValueError("unexpected end of composer.lock")
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"expected {char!r} in composer.lock")
+        self.pos += 1
+
+    def value(self):
+        """Decode the next complete JSON value"""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                # Most likely cut off at the end of the buffer
+                if not self._fill():
+                    raise
+                continue
+            if end == len(self.buf) and not isinstance(value, (dict, list, str)):
+                # A number or literal may continue in the next chunk
+                if self._fill():
+                    continue
+            self.pos = end
+            return value
+
+    def items(self, close):
+        """Yield after each ',' separated member until the closing character"""
+        if self.peek() == close:
+            self.pos += 1
+            return
+        while True:
+            yield
+            char = self.peek()
+            self.pos += 1
+            if char == close:
+                return
+            if char != ',':
+                raise ValueError("malformed composer.lock")
+
+
+def read_lock(lock_path):
+    """Locked framework version, PHP constraint and package count of a composer.lock"""
+    version = None
+    php = None
+    count = 0
+    with open(lock_path, 'r', encoding='utf-8') as f:
+        stream = _LockStream(f)
+        stream.expect('{')
+        for _ in stream.items('}'):
+            key = stream.value()
+            stream.expect(':')
+            if key in ('packages', 'packages-dev') and stream.peek() == '[':
+                stream.pos += 1
+                for _ in stream.items(']'):
+                    package = stream.value()
+                    count += 1
+                    if (version is None and isinstance(package, dict)
+                            and package.get('name') in FRAMEWORK_PACKAGES):
+                        version = package.get('version')
+            else:
+                value = stream.value()
+                if key == 'platform' and isinstance(value, dict):
+                    php = value.get('php')
+    return ProjectMetadata(version, php, count)
+
+
+def lock_stamp(project_path):
+    """(size, mtime_ns) of a project's composer.lock, or None if it has none"""
+    try:
+        st = os.stat(os.path.join(project_path, 'composer.lock'))
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime_ns
+
+
+def version_key(version):
+    """Sort key for a version string such as v10.48.4; unparsable versions sort first"""
+    if not version:
+        return ()
+    return tuple(int(part) for part in _VERSION_PART.findall(version))
+
+
+class MetadataExtractor:
+    """Read composer.lock metadata, reusing values cached in the project store.
+
+    A cached entry is valid as long as the lock file has the same size and
+    mtime as when it was read.
+    """
+
+    def __init__(self, store=None, jobs=DEFAULT_JOBS):
+        self.store = store
+        self.jobs = max(1, jobs)
+
+    def extract(self, project_path, cached=None):
+        """Return (stamp, ProjectMetadata or None, from_cache) for one project"""
+        stamp = lock_stamp(project_path)
+        if stamp is None:
+            # Nothing to store unless metadata of a removed lock file is cached
+            return None, None, cached is None
+        if cached is not None and cached[0] == stamp:
+            return stamp, ProjectMetadata(*cached[1]), True
+        try:
+            metadata = read_lock(os.path.join(project_path, 'composer.lock'))
+        except Exception as e:
+            print(f"Error reading composer.lock of {project_path}: {e}")
+            metadata = None
+        return stamp, metadata, False
+
+    def extract_many(self, project_paths, on_result=None, token=None):
+        """Extract metadata of many projects on a pool of threads.
+
+        on_result(path, ProjectMetadata or None) is called from the worker
+        threads as each project finishes. Returns {path: ProjectMetadata or None}.
+        """
+        cached = self.store.cached_metadata() if self.store is not None else {}
+        pending = queue.Queue()
+        for path in project_paths:
+            pending.put(path)
+        results = {}
+        fresh = []
+        lock = threading.Lock()
+
+        def work():
+            while token is None or not token.cancelled:
+                try:
+                    path = pending.get_nowait()
+                except queue.Empty:
+                    return
+                stamp, metadata, from_cache = self.extract(path, cached.get(path))
+                with lock:
+                    results[path] = metadata
+                    if not from_cache:
+                        fresh.append((path, stamp, metadata))
+                if on_result is not None:
+                    on_result(path, metadata)
+
+        threads = [threading.Thread(target=work, daemon=True)
+                   for _ in range(min(self.jobs, len(project_paths)))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        if fresh and self.store is not None:
+            self.store.save_metadata(fresh)
+        return results
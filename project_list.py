@@ -0,0 +1,631 @@
+import time
+import tkinter as tk
+from array import array
+from tkinter import ttk
+
+from metadata import version_key
+from search import PathIndex
+from utils import format_size, open_folder, open_in_vscode
+
+
+# Bits of ProjectListModel.flags
+HAS_VENDOR = 1
+SELECTED = 2
+UNREACHABLE = 4
+
+# Sortable columns shown right of the path: (model column, title, width in chars)
+TEXT_COLUMNS = (
+    ('laravel_version', "Laravel", 9),
+    ('php_constraint', "PHP", 8),
+)
+COUNT_COLUMNS = (
+    ('package_count', "Pkgs", 5),
+)
+SIZE_COLUMNS = (
+    ('vendor_disk', "Vendor", 9),
+    ('vendor_files', "Files", 8),
+    ('extra_disk', "node/logs", 9),
+)
+# Seconds since the epoch, shown as a date
+DATE_COLUMNS = (
+    ('last_modified', "Modified", 10),
+)
+COLUMNS = TEXT_COLUMNS + COUNT_COLUMNS + SIZE_COLUMNS + DATE_COLUMNS
+
+DATE_NAMES = tuple(column for column, _, _ in DATE_COLUMNS)
+
+# Row filters offered above the list: (name, title)
+FILTERS = (
+    ('all', "All projects"),
+    ('vendor', "Has vendor"),
+    ('no_vendor', "No vendor"),
+    ('untouched', "Untouched 90+ days"),
+)
+UNTOUCHED_DAYS = 90
+
+# Sort keys of text columns that do not sort as plain strings
+TEXT_SORT_KEYS = {
+    'laravel_version': version_key,
+}
+
+# Value of a numeric column that has not been measured yet
+UNKNOWN = -1
+
+
+class ProjectListModel:
+    """Compact row state for the project list, independent of any widget.
+
+    Rows are stored column-wise: a list of paths, one flag byte per row,
+    packed integer arrays for the counts and measured sizes, and lists for
+    the short composer.lock strings, so tens of thousands of projects cost
+    a few dozen bytes each beyond the strings themselves.
+    """
+
+    TEXT_COLUMNS = tuple(column for column, _, _ in TEXT_COLUMNS)
+    NUMERIC_COLUMNS = tuple(column for column, _, _ in COUNT_COLUMNS + SIZE_COLUMNS + DATE_COLUMNS)
+
+    def __init__(self):
+        # Bumped on every change, and when the paths or their order change
+        self.version = 0
+        self.paths_version = 0
+        self.clear()
+
+    def __len__(self):
+        return len(self.paths)
+
+    def clear(self):
+        self.paths = []
+        self.flags = bytearray()
+        for column in self.NUMERIC_COLUMNS:
+            setattr(self, column, array('q'))
+        for column in self.TEXT_COLUMNS:
+            setattr(self, column, [])
+        self._index = {}
+        self._selected_count = 0
+        self.version += 1
+        self.paths_version += 1
+
+    def append(self, path, has_vendor, unreachable=False):
+        """Add a row, or update its flags if the path is already listed"""
+        row = self._index.get(path)
+        if row is None:
+            row = len(self.paths)
+            self._index[path] = row
+            self.paths.append(path)
+            self.flags.append(0)
+            for column in self.NUMERIC_COLUMNS:
+                getattr(self, column).append(UNKNOWN)
+            for column in self.TEXT_COLUMNS:
+                getattr(self, column).append(None)
+            self.paths_version += 1
+        self.version += 1
+        self.set_vendor(row, has_vendor)
+        self.set_unreachable(row, unreachable)
+        return row
+
+    def remove(self, path):
+        """Drop the row of a path; returns False if it is not listed"""
+        row = self._index.get(path)
+        if row is None:
+            return False
+        self.set_selected(row, False)
+        del self.paths[row]
+        del self.flags[row]
+        for column in self.NUMERIC_COLUMNS + self.TEXT_COLUMNS:
+            del getattr(self, column)[row]
+        self._index = {path: row for row, path in enumerate(self.paths)}
+        self.version += 1
+        self.paths_version += 1
+        return True
+
+    def remove_many(self, paths):
+        """Drop the rows of many paths at once; returns how many were listed"""
+        gone = {path for path in paths if path in self._index}
+        if not gone:
+            return 0
+        keep = [row for row, path in enumerate(self.paths) if path not in gone]
+        self._selected_count -= sum(1 for path in gone if self.is_selected(self._index[path]))
+        self._reorder(keep)
+        return len(gone)
+
+    def columns(self):
+        """Plain copies of all columns, without selections, for a snapshot"""
+        columns = {
+            'paths': list(self.paths),
+            'flags': [flag & ~SELECTED & 0xFF for flag in self.flags],
+        }
+        for column in self.NUMERIC_COLUMNS:
+            columns[column] = getattr(self, column).tolist()
+        for column in self.TEXT_COLUMNS:
+            columns[column] = list(getattr(self, column))
+        return columns
+
+    def restore(self, columns):
+        """Replace every row with columns saved by columns()"""
+        self.clear()
+        count = len(columns['paths'])
+        self.paths = list(columns['paths'])
+        self.flags = bytearray(flag & ~SELECTED & 0xFF for flag in columns['flags'])
+        for column in self.NUMERIC_COLUMNS:
+            values = columns.get(column)
+            setattr(self, column, array('q', values if values is not None else [UNKNOWN] * count))
+        for column in self.TEXT_COLUMNS:
+            values = columns.get(column)
+            setattr(self, column, list(values) if values is not None else [None] * count)
+        if len(self.flags) != count or any(len(getattr(self, c)) != count
+                                           for c in self.NUMERIC_COLUMNS + self.TEXT_COLUMNS):
+            self.clear()
+            raise ValueError("columns of different lengths")
+        self._index = {path: row for row, path in enumerate(self.paths)}
+        self.version += 1
+        self.paths_version += 1
+
+    def row_states(self):
+        """(has_vendor, unreachable, last_modified) of every row, keyed by path"""
+        return {path: (bool(flag & HAS_VENDOR), bool(flag & UNREACHABLE),
+                       None if modified == UNKNOWN else modified)
+                for path, flag, modified in zip(self.paths, self.flags, self.last_modified)}
+
+    def set_value(self, row, column, value):
+        if column in self.TEXT_COLUMNS:
+            getattr(self, column)[row] = value
+        else:
+            getattr(self, column)[row] = UNKNOWN if value is None else int(value)
+        self.version += 1
+
+    def filter_rows(self, name, rows=None):
+        """The rows (all, or those given) that pass one of the FILTERS"""
+        if rows is None:
+            rows = range(len(self.paths))
+        flags = self.flags
+        if name == 'vendor':
+            return [row for row in rows if flags[row] & HAS_VENDOR]
+        if name == 'no_vendor':
+            return [row for row in rows if not flags[row] & HAS_VENDOR]
+        if name == 'untouched':
+            # Projects never dated are left out rather than guessed
+            cutoff = time.time() - UNTOUCHED_DAYS * 86400
+            modified = self.last_modified
+            return [row for row in rows if modified[row] != UNKNOWN and modified[row] < cutoff]
+        return list(rows)
+
+    def totals(self, column):
+        """Sum and count of the measured values of a numeric column"""
+        values = [v for v in getattr(self, column) if v != UNKNOWN]
+        return sum(values), len(values)
+
+    def sort(self, column='path', reverse=False):
+        """Reorder all rows by a column; unmeasured values always go last"""
+        if column == 'path':
+            values = self.paths
+            order = sorted(range(len(values)), key=values.__getitem__, reverse=reverse)
+        elif column in self.TEXT_COLUMNS:
+            values = getattr(self, column)
+            key = TEXT_SORT_KEYS.get(column, str)
+            known = [i for i in range(len(values)) if values[i] is not None]
+            known.sort(key=lambda i: key(values[i]), reverse=reverse)
+            order = known + [i for i in range(len(values)) if values[i] is None]
+        else:
+            values = getattr(self, column)
+            known = [i for i in range(len(values)) if values[i] != UNKNOWN]
+            known.sort(key=values.__getitem__, reverse=reverse)
+            order = known + [i for i in range(len(values)) if values[i] == UNKNOWN]
+        self._reorder(order)
+
+    def _reorder(self, order):
+        """Keep only the rows listed in order, in that order"""
+        self.paths = [self.paths[i] for i in order]
+        self.flags = bytearray(self.flags[i] for i in order)
+        for name in self.NUMERIC_COLUMNS:
+            old = getattr(self, name)
+            setattr(self, name, array(old.typecode, (old[i] for i in order)))
+        for name in self.TEXT_COLUMNS:
+            old = getattr(self, name)
+            setattr(self, name, [old[i] for i in order])
+        self._index = {path: row for row, path in enumerate(self.paths)}
+        self.version += 1
+        self.paths_version += 1
+
+    def index_of(self, path):
+        return self._index.get(path)
+
+    def has_vendor(self, row):
+        return bool(self.flags[row] & HAS_VENDOR)
+
+    def is_selected(self, row):
+        return bool(self.flags[row] & SELECTED)
+
+    def is_unreachable(self, row):
+        return bool(self.flags[row] & UNREACHABLE)
+
+    def set_unreachable(self, row, unreachable):
+        if unreachable:
+            # Nothing can be removed from a project we cannot reach
+            self.set_selected(row, False)
+            self.flags[row] |= UNREACHABLE
+        else:
+            self.flags[row] &= ~UNREACHABLE & 0xFF
+        self.version += 1
+
+    def set_vendor(self, row, has_vendor):
+        if has_vendor:
+            self.flags[row] |= HAS_VENDOR
+        else:
+            # Only projects with a vendor directory can stay selected
+            self.set_selected(row, False)
+            self.flags[row] &= ~HAS_VENDOR & 0xFF
+        self.version += 1
+
+    def set_selected(self, row, selected):
+        if selected and (not self.has_vendor(row) or self.is_unreachable(row)):
+            return
+        if selected != self.is_selected(row):
+            self._selected_count += 1 if selected else -1
+        if selected:
+            self.flags[row] |= SELECTED
+        else:
+            self.flags[row] &= ~SELECTED & 0xFF
+
+    def selected_count(self):
+        return self._selected_count
+
+    def selected_paths(self):
+        return [path for path, flag in zip(self.paths, self.flags) if flag & SELECTED]
+
+
+class VirtualProjectList(tk.Frame):
+    """Scrollable project list that only builds widgets for the visible rows.
+
+    Row widgets are kept in a small pool sized to the viewport and re-bound
+    to different model rows as the list scrolls, so the widget count does
+    not grow with the number of projects. A search query and a filter
+    narrow the rows shown; the model keeps every row.
+    """
+
+    ROW_HEIGHT = 50
+
+    def __init__(self, parent, app, on_selection_change=None, on_view_change=None):
+        super().__init__(parent, bg=app.MATERIAL_WHITE)
+        self.app = app
+        self.model = ProjectListModel()
+        self.on_selection_change = on_selection_change
+        # Called with (rows shown, rows in the model) after every redraw
+        self.on_view_change = on_view_change
+        self._offset = 0
+        self._slots = []
+        self._refresh_pending = False
+        self._sort_column = None
+        self._sort_reverse = False
+        self._query = ""
+        self._filter = 'all'
+        self._search_index = None
+        # Model rows shown, in order, or None when nothing is narrowed
+        self._view = None
+        self._view_key = None
+
+        body = tk.Frame(self, bg=app.MATERIAL_WHITE)
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.yview)
+        body.pack(side="left", fill="both", expand=True)
+        self.scrollbar.pack(side="right", fill="y")
+
+        self._create_header(body)
+        self.viewport = tk.Frame(body, bg=app.MATERIAL_WHITE)
+        self.viewport.pack(side="top", fill="both", expand=True)
+
+        self.viewport.bind("<Configure>", lambda e: self.refresh())
+
+        # Bind mouse wheel scrolling
+        def _on_mousewheel(event):
+            self.yview("scroll", int(-1*(event.delta/120)), "units")
+        self.bind_all("<MouseWheel>", _on_mousewheel)
+        self.bind_all("<Button-4>", lambda e: self.yview("scroll", -1, "units"))
+        self.bind_all("<Button-5>", lambda e: self.yview("scroll", 1, "units"))
+
+    def _create_header(self, parent):
+        """Column titles; clicking one sorts the list by that column"""
+        app = self.app
+        header = tk.Frame(parent, bg=app.MATERIAL_WHITE)
+        header.pack(side="top", fill=tk.X, padx=14)
+        self._header_labels = {}
+
+        def add(column, title, width=None, side=tk.LEFT, expand=False):
+            label = tk.Label(
+                header,
+                text=title,
+                width=width,
+                anchor="e" if width else "w",
+                cursor="hand2",
+                bg=app.MATERIAL_WHITE,
+                fg=app.MATERIAL_GRAY_600,
+                font=("Segoe UI", 8, "bold")
+            )
+            label.pack(side=side, fill=tk.X, expand=expand)
+            label.bind("<Button-1>", lambda e: self.sort(column))
+            self._header_labels[column] = (label, title)
+
+        # Leaves room for the VSCode button of the rows
+        self._header_spacer = tk.Frame(header, bg=app.MATERIAL_WHITE, width=80, height=1)
+        self._header_spacer.pack(side=tk.RIGHT)
+        for column, title, width in reversed(COLUMNS):
+            add(column, title, width, side=tk.RIGHT)
+        add('path', "Project", expand=True)
+
+    def sort(self, column):
+        """Sort by column, toggling the direction when it is already the sort column"""
+        if self._sort_column == column:
+            self._sort_reverse = not self._sort_reverse
+        else:
+            # Sizes and versions are most useful largest first
+            self._sort_column = column
+            self._sort_reverse = column != 'path'
+        self.model.sort(column, self._sort_reverse)
+        for name, (label, title) in self._header_labels.items():
+            arrow = (" ▼" if self._sort_reverse else " ▲") if name == column else ""
+            label.config(text=title + arrow)
+        self.refresh()
+
+    def set_search(self, query=None, filter_name=None):
+        """Show only rows matching query (see search.PathIndex) and the named filter"""
+        if query is not None:
+            self._query = query
+        if filter_name is not None:
+            self._filter = filter_name
+        self._offset = 0
+        self.refresh()
+
+    def is_narrowed(self):
+        return bool(self._query.strip()) or self._filter != 'all'
+
+    def is_fuzzy(self):
+        """Whether the current query only matched some term fuzzily"""
+        index = self._search_index
+        return bool(self._query.strip()) and index is not None and index[1].fuzzy
+
+    def visible_paths(self):
+        """Paths of the rows passing the search and filter, in list order"""
+        rows = self._rows()
+        paths = self.model.paths
+        if rows is None:
+            return list(paths)
+        return [paths[row] for row in rows]
+
+    def _rows(self):
+        """Model rows to show, recomputed only after the model, query or filter changed"""
+        model = self.model
+        key = (model.version, self._query, self._filter)
+        if key == self._view_key:
+            return self._view
+        rows = None
+        if self._query.strip():
+            index = self._search_index
+            if index is None or index[0] != model.paths_version:
+                # Rows are positions in model.paths: rebuilt after sorting or removals
+                index = self._search_index = (model.paths_version, PathIndex(model.paths))
+            rows = index[1].search(self._query)
+        if self._filter != 'all':
+            rows = model.filter_rows(self._filter, rows)
+        self._view = rows
+        self._view_key = key
+        return rows
+
+    def _count(self):
+        rows = self._rows()
+        return len(self.model) if rows is None else len(rows)
+
+    # Model changes
+
+    def append(self, path, has_vendor, unreachable=False):
+        self.model.append(path, has_vendor, unreachable)
+        self.schedule_refresh()
+
+    def remove(self, path):
+        if self.model.remove(path):
+            self.schedule_refresh()
+
+    def remove_many(self, paths):
+        if self.model.remove_many(paths):
+            self.schedule_refresh()
+
+    def restore(self, columns):
+        """Show rows saved by ProjectListModel.columns()"""
+        self.model.restore(columns)
+        self._offset = 0
+        self.schedule_refresh()
+
+    def clear(self):
+        self.model.clear()
+        self._offset = 0
+        self.schedule_refresh()
+
+    def schedule_refresh(self):
+        """Coalesce many model changes into one redraw"""
+        if not self._refresh_pending:
+            self._refresh_pending = True
+            self.after_idle(self.refresh)
+
+    # Scrolling
+
+    def _max_offset(self):
+        total = self._count() * self.ROW_HEIGHT
+        return max(0, total - self.viewport.winfo_height())
+
+    def yview(self, *args):
+        """Scrollbar protocol: ("moveto", fraction) or ("scroll", n, "units"|"pages")"""
+        if not args:
+            return
+        if args[0] == "moveto":
+            offset = float(args[1]) * self._count() * self.ROW_HEIGHT
+        elif args[0] == "scroll":
+            step = self.ROW_HEIGHT
+            if args[2] == "pages":
+                step = max(self.ROW_HEIGHT, self.viewport.winfo_height() - self.ROW_HEIGHT)
+            offset = self._offset + int(args[1]) * step
+        else:
+            return
+        self._offset = int(min(max(0, offset), self._max_offset()))
+        self.refresh()
+
+    # Rendering
+
+    def _create_slot(self):
+        """Build the widgets of one row (same look as a card row)"""
+        app = self.app
+        slot = {'row': None}
+
+        row_frame = tk.Frame(self.viewport, bg=app.MATERIAL_WHITE, relief=tk.FLAT)
+        inner_frame = tk.Frame(row_frame, bg=app.MATERIAL_GRAY_100, relief=tk.FLAT)
+        inner_frame.pack(fill=tk.BOTH, expand=True, padx=1, pady=1)
+        content_frame = tk.Frame(inner_frame, bg=app.MATERIAL_WHITE)
+        content_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=6)
+
+        checkbox_var = tk.BooleanVar()
+        checkbox = tk.Checkbutton(
+            content_frame,
+            variable=checkbox_var,
+            command=lambda: self._on_toggle(slot),
+            bg=app.MATERIAL_WHITE,
+            activebackground=app.MATERIAL_WHITE,
+            selectcolor=app.MATERIAL_WHITE
+        )
+        checkbox.pack(side=tk.LEFT, padx=(0, 8))
+
+        vendor_indicator = tk.Label(
+            content_frame,
+            bg=app.MATERIAL_WHITE,
+            font=("Segoe UI", 10, "bold"),
+            width=2
+        )
+        vendor_indicator.pack(side=tk.LEFT, padx=(0, 8))
+
+        path_label = tk.Label(
+            content_frame,
+            anchor="w",
+            cursor="hand2",
+            bg=app.MATERIAL_WHITE,
+            fg=app.MATERIAL_GRAY_900,
+            font=("Segoe UI", 9),
+            padx=8
+        )
+        path_label.bind("<Double-1>", lambda e: self._open(slot, open_folder))
+
+        vscode_btn = app.create_material_button(
+            content_frame,
+            text="VSCode",
+            command=lambda: self._open(slot, open_in_vscode),
+            bg_color=app.MATERIAL_BLUE,
+            hover_color="#1976D2",
+            fg_color=app.MATERIAL_WHITE,
+            font_size=8,
+            height=32
+        )
+        vscode_btn.pack(side=tk.RIGHT, padx=(8, 0))
+
+        column_labels = []
+        for column, _, width in reversed(COLUMNS):
+            label = tk.Label(
+                content_frame,
+                width=width,
+                anchor="e",
+                bg=app.MATERIAL_WHITE,
+                fg=app.MATERIAL_GRAY_700,
+                font=("Segoe UI", 8)
+            )
+            label.pack(side=tk.RIGHT)
+            column_labels.insert(0, (column, label))
+
+        # Packed last so that a narrow window squeezes the path, not the columns
+        path_label.pack(side=tk.LEFT, fill=tk.X, expand=True)
+
+        # Align the header with the first row's columns
+        self._header_spacer.config(width=vscode_btn.winfo_reqwidth() + 8)
+
+        slot.update({
+            'frame': row_frame,
+            'column_labels': column_labels,
+            'checkbox': checkbox,
+            'checkbox_var': checkbox_var,
+            'vendor_indicator': vendor_indicator,
+            'path_label': path_label,
+        })
+        return slot
+
+    def _bind_slot(self, slot, row):
+        """Show model row `row` in a recycled slot"""
+        app = self.app
+        model = self.model
+        slot['row'] = row
+        has_vendor = model.has_vendor(row)
+        unreachable = model.is_unreachable(row)
+        slot['checkbox_var'].set(model.is_selected(row))
+        slot['checkbox'].config(state=tk.NORMAL if has_vendor and not unreachable else tk.DISABLED)
+        if unreachable:
+            # The mount did not answer in time; the project is kept, not deleted
+            slot['vendor_indicator'].config(text="?", fg=app.MATERIAL_ORANGE)
+        else:
+            slot['vendor_indicator'].config(
+                text="✓" if has_vendor else "✗",
+                fg=app.MATERIAL_GREEN if has_vendor else app.MATERIAL_GRAY_600
+            )
+        slot['path_label'].config(
+            text=model.paths[row],
+            fg=app.MATERIAL_GRAY_600 if unreachable else app.MATERIAL_GRAY_900
+        )
+        for column, label in slot['column_labels']:
+            value = getattr(model, column)[row]
+            if column in model.TEXT_COLUMNS:
+                label.config(text=value or "")
+            elif value == UNKNOWN:
+                label.config(text="")
+            elif column in DATE_NAMES:
+                label.config(text=time.strftime("%Y-%m-%d", time.localtime(value)))
+            elif column.endswith(('_files', '_count')):
+                label.config(text=f"{value:,}")
+            else:
+                label.config(text=format_size(value))
+
+    def refresh(self):
+        """Place and bind the row widgets for the current scroll position"""
+        self._refresh_pending = False
+        height = self.viewport.winfo_height()
+        rows = self._rows()
+        total = len(self.model) if rows is None else len(rows)
+        self._offset = min(self._offset, self._max_offset())
+
+        visible = height // self.ROW_HEIGHT + 2
+        while len(self._slots) < min(visible, total):
+            self._slots.append(self._create_slot())
+
+        first = self._offset // self.ROW_HEIGHT
+        shift = self._offset % self.ROW_HEIGHT
+        for i, slot in enumerate(self._slots):
+            position = first + i
+            if position < total and i < visible:
+                self._bind_slot(slot, position if rows is None else rows[position])
+                slot['frame'].place(x=3, y=i * self.ROW_HEIGHT - shift + 3,
+                                    relwidth=1, width=-6, height=self.ROW_HEIGHT - 6)
+            else:
+                slot['row'] = None
+                slot['frame'].place_forget()
+
+        if total:
+            content = total * self.ROW_HEIGHT
+            self.scrollbar.set(self._offset / content, min(1.0, (self._offset + height) / content))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+        if self.on_view_change:
+            self.on_view_change(total, len(self.model))
+
+    # Row actions
+
+    def _on_toggle(self, slot):
+        row = slot['row']
+        if row is None:
+            return
+        self.model.set_selected(row, slot['checkbox_var'].get())
+        if self.on_selection_change:
+            self.on_selection_change()
+
+    def _open(self, slot, opener):
+        row = slot['row']
+        if row is not None:
+            opener(self.model.paths[row])
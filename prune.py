@@ -0,0 +1,147 @@
+import os
+import re
+
+
+# Directories that hold most of the inodes on a dev machine and never hold a
+# project of their own. Names like `vendor`, `storage` or `venv` are left
+# out: people keep whole project folders under such names (a `storage`
+# disk, a `vendor` folder of client work), and a Laravel root is never
+# descended into anyway. Anything else can be added with exclude patterns.
+DEFAULT_PRUNE_PATTERNS = (
+    'node_modules',
+    '.git',
+)
+
+
+_CASE_INSENSITIVE = os.name == 'nt'
+
+
+def _fold(name):
+    return name.lower() if _CASE_INSENSITIVE else name
+
+
+def parse_patterns(text):
+    """Split user input (commas or newlines) into a list of patterns"""
+    patterns = []
+    for line in text.replace(',', '\n').splitlines():
+        line = line.strip()
+        if line and not line.startswith('#'):
+            patterns.append(line)
+    return patterns
+
+
+def _translate(pattern):
+    """Translate a gitignore-style glob into a regular expression"""
+    parts = []
+    i = 0
+    n = len(pattern)
+    while i < n:
+        c = pattern[i]
+        if pattern.startswith('**/', i):
+            parts.append('(?:.*/)?')
+            i += 3
+        elif pattern.startswith('/**', i) and i + 3 == n:
+            parts.append('(?:/.*)?')
+            i += 3
+        elif pattern.startswith('**', i):
+            parts.append('.*')
+            i += 2
+        elif c == '*':
+            parts.append('[^/]*')
+            i += 1
+        elif c == '?':
+            parts.append('[^/]')
+            i += 1
+        elif c == '[':
+            end = pattern.find(']', i + 1)
+            if end == -1:
+                parts.append(re.escape(c))
+                i += 1
+            else:
+                body = pattern[i + 1:end]
+                if body.startswith('!'):
+                    body = '^' + body[1:]
+                parts.append('[' + body.replace('\\', '\\\\') + ']')
+                i = end + 1
+        elif c == '\\' and i + 1 < n:
+            parts.append(re.escape(pattern[i + 1]))
+            i += 2
+        else:
+            parts.append(re.escape(c))
+            i += 1
+    return re.compile(''.join(parts) + r'\Z', re.IGNORECASE if _CASE_INSENSITIVE else 0)
+
+
+class PrunePattern:
+    """A single gitignore-style pattern.
+
+    Patterns without a slash match a directory name at any depth. Patterns
+    with a slash (or a leading `/`) are anchored to the scan root. A leading
+    `!` re-includes directories excluded by an earlier pattern.
+    """
+
+    def __init__(self, pattern):
+        self.source = pattern
+        self.negated = pattern.startswith('!')
+        if self.negated:
+            pattern = pattern[1:]
+        pattern = pattern.rstrip('/')
+        self.anchored = '/' in pattern
+        self.regex = _translate(pattern.lstrip('/'))
+
+    def matches(self, name, rel_path):
+        if self.anchored:
+            return self.regex.match(rel_path) is not None
+        return self.regex.match(name) is not None
+
+
+class PruneRules:
+    """Decide which directories a scan should not descend into"""
+
+    def __init__(self, patterns=(), use_defaults=True, max_depth=None):
+        sources = list(DEFAULT_PRUNE_PATTERNS) if use_defaults else []
+        sources.extend(patterns)
+        self.patterns = [PrunePattern(p) for p in sources]
+        self.max_depth = max_depth
+        self.needs_rel_path = any(p.anchored for p in self.patterns)
+        # Plain names are by far the common case; check them with a set
+        self._names = set()
+        self._complex = []
+        for p in self.patterns:
+            if not p.negated and not p.anchored and not any(c in p.source for c in '*?[\\'):
+                if not self._complex:
+                    self._names.add(_fold(p.source.rstrip('/')))
+                    continue
+            self._complex.append(p)
+
+    def prunes(self, name, rel_path=''):
+        """Return True if a directory should be skipped.
+
+        `rel_path` is the directory path relative to the scan root, using
+        `/` as separator; it is only needed when anchored patterns exist.
+        """
+        pruned = _fold(name) in self._names
+        # Last matching pattern wins, like in .gitignore
+        for p in self._complex:
+            if p.negated == pruned and p.matches(name, rel_path):
+                pruned = not p.negated
+        return pruned
+
+    def too_deep(self, depth):
+        return self.max_depth is not None and depth > self.max_depth
+
+
+NO_PRUNING = PruneRules(use_defaults=False)
+
+
+def estimate_entries(path):
+    """Lower-bound estimate of the entries saved by skipping a directory.
+
+    Counts the directory itself plus its subdirectories from the link count
+    (st_nlink - 2 on POSIX filesystems), so no listing is needed.
+    """
+    try:
+        nlink = os.lstat(path).st_nlink
+    except OSError:
+        return 1
+    return max(1, nlink - 1)
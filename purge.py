@@ -0,0 +1,264 @@
+import os
+import stat
+import time
+import threading
+
+from throttle import run_workers
+from workqueue import WorkQueue
+
+
+DEFAULT_JOBS = 16
+
+# Prefix of the hidden directory a vendor folder is renamed to before deletion
+TOMBSTONE_PREFIX = '.vendor.deleting-'
+
+# Minimum delay between two progress callbacks for the same project
+PROGRESS_INTERVAL = 0.2
+
+
+def _freed_bytes(st):
+    # A file with other hardlinks keeps its blocks until the last link goes
+    if st.st_nlink > 1:
+        return 0
+    if hasattr(st, 'st_blocks'):
+        return st.st_blocks * 512
+    return st.st_size
+
+
+def _unlink(path):
+    try:
+        os.unlink(path)
+    except PermissionError:
+        # Read-only files (Windows, some git packs) need write permission first
+        os.chmod(path, stat.S_IWRITE)
+        os.unlink(path)
+
+
+class _Tree:
+    """Deletion state of one tombstone"""
+
+    def __init__(self, project, path):
+        self.project = project
+        self.path = path
+        self.files = 0
+        self.bytes = 0
+        self.error = None
+        self.done = False
+        self.last_report = 0.0
+
+
+class VendorPurger:
+    """Remove vendor directories without blocking on the deletion.
+
+    Each vendor directory is first renamed to a tombstone inside its project
+    (atomic on the same filesystem), so the project has no vendor directory
+    the moment the rename returns. The tombstones are then deleted in
+    parallel by a pool of workers. Tombstones are recorded in the project
+    store before the rename, so a deletion interrupted by a crash or exit is
+    picked up again by resume_leftovers() on the next start.
+
+    A symlinked vendor directory (for example one shared between
+    projects) only loses the link: nothing is ever deleted through a
+    symlink. A tombstone stays recorded until it is deleted without
+    errors, so a failed deletion is retried on the next start.
+
+    A throttle.Throttle caps the unlinks and rmdirs per second.
+    """
+
+    def __init__(self, store=None, jobs=DEFAULT_JOBS, throttle=None):
+        self.store = store
+        self.jobs = max(1, jobs)
+        self.throttle = throttle
+
+    def tombstone(self, project_path):
+        """Rename project/vendor to a tombstone; returns its path or None if there is no vendor.
+
+        A symlinked vendor is never tombstoned: see remove_link().
+        """
+        vendor_path = os.path.join(project_path, 'vendor')
+        if os.path.islink(vendor_path) or not os.path.isdir(vendor_path):
+            return None
+        tombstone_path = os.path.join(project_path, f"{TOMBSTONE_PREFIX}{time.time_ns()}")
+        if self.store is not None:
+            self.store.add_tombstone(tombstone_path, project_path)
+        try:
+            os.rename(vendor_path, tombstone_path)
+        except OSError:
+            if self.store is not None:
+                self.store.remove_tombstones([tombstone_path])
+            raise
+        return tombstone_path
+
+    def remove_link(self, project_path):
+        """Remove project/vendor if it is a symlink, leaving its target alone; True if it was one"""
+        vendor_path = os.path.join(project_path, 'vendor')
+        if not os.path.islink(vendor_path):
+            return False
+        os.unlink(vendor_path)
+        return True
+
+    def delete_tombstones(self, tombstones, on_progress=None):
+        """Delete (project, tombstone_path) pairs in parallel.
+
+        on_progress(project, files, bytes_freed, done, error) is called from
+        the worker threads as each tombstone makes progress and once when it
+        is gone. Returns {project: (files, bytes_freed, error)}.
+        """
+        trees = []
+        results = {}
+        for project, path in tombstones:
+            if os.path.islink(path):
+                # Never walk into a link: only the link itself goes
+                error = None
+                try:
+                    os.unlink(path)
+                except OSError as e:
+                    error = str(e)
+                if error is None and self.store is not None:
+                    self.store.remove_tombstones([path])
+                results[project] = (0, 0, error)
+                continue
+            trees.append(_Tree(project, path))
+        if not trees:
+            return results
+
+        lock = threading.Lock()
+        throttle = self.throttle
+        # Directory -> [subdirectories left, parent directory, tree]
+        pending = {}
+        work = WorkQueue(self.jobs)
+        work.push(0, [(tree.path, None, tree) for tree in trees])
+
+        def report(tree, force=False):
+            if on_progress is None:
+                return
+            now = time.monotonic()
+            if force or now - tree.last_report >= PROGRESS_INTERVAL:
+                tree.last_report = now
+                on_progress(tree.project, tree.files, tree.bytes, tree.done, tree.error)
+
+        def finish_directory(path):
+            # Remove a directory whose contents are gone, then walk up to
+            # every parent that became empty as a result
+            while True:
+                with lock:
+                    _, parent, tree = pending.pop(path)
+                try:
+                    os.rmdir(path)
+                except OSError as e:
+                    tree.error = tree.error or str(e)
+                if throttle is not None:
+                    throttle.spend(1)
+                if parent is None:
+                    tree.done = True
+                    # A tombstone that could not be fully deleted stays recorded for a retry
+                    if self.store is not None and not tree.error:
+                        self.store.remove_tombstones([tree.path])
+                    report(tree, force=True)
+                    return
+                with lock:
+                    pending[parent][0] -= 1
+                    if pending[parent][0] > 0:
+                        return
+                path = parent
+
+        def delete_directory(path, tree):
+            """Unlink the files of one directory; returns its subdirectories"""
+            subdirs = []
+            files = freed = 0
+            error = None
+            try:
+                with os.scandir(path) as it:
+                    entries = list(it)
+            except OSError as e:
+                entries = []
+                error = str(e)
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+                        continue
+                    st = entry.stat(follow_symlinks=False)
+                    _unlink(entry.path)
+                except OSError as e:
+                    error = error or str(e)
+                    continue
+                files += 1
+                freed += _freed_bytes(st)
+            if throttle is not None:
+                # The listing and one unlink per file
+                throttle.spend(1 + files)
+            with lock:
+                tree.files += files
+                tree.bytes += freed
+                if error and not tree.error:
+                    tree.error = error
+            return subdirs
+
+        def worker(index):
+            while True:
+                item = work.pop(index)
+                if item is None:
+                    return
+                path, parent, tree = item
+                children = []
+                try:
+                    subdirs = delete_directory(path, tree)
+                    children = [(child, path, tree) for child in subdirs]
+                    with lock:
+                        pending[path] = [len(children), parent, tree]
+                    if not children:
+                        finish_directory(path)
+                    report(tree)
+                finally:
+                    work.complete(index, children)
+
+        run_workers(worker, self.jobs, throttle)
+
+        results.update((tree.project, (tree.files, tree.bytes, tree.error)) for tree in trees)
+        return results
+
+    def purge(self, project_paths, on_tombstoned=None, on_progress=None):
+        """Tombstone the vendor directory of every project, then delete them all.
+
+        on_tombstoned(project, error) is called right after each rename, so
+        the UI can flip the project to "no vendor" before deletion starts.
+        Returns {project: (files, bytes_freed, error)}.
+        """
+        tombstones = []
+        results = {}
+        for project_path in project_paths:
+            try:
+                if self.remove_link(project_path):
+                    results[project_path] = (0, 0, None)
+                    if on_tombstoned is not None:
+                        on_tombstoned(project_path, None)
+                    continue
+                tombstone_path = self.tombstone(project_path)
+            except OSError as e:
+                results[project_path] = (0, 0, str(e))
+                if on_tombstoned is not None:
+                    on_tombstoned(project_path, str(e))
+                continue
+            if tombstone_path is not None:
+                tombstones.append((project_path, tombstone_path))
+            if on_tombstoned is not None:
+                on_tombstoned(project_path, None)
+
+        results.update(self.delete_tombstones(tombstones, on_progress))
+        return results
+
+    def resume_leftovers(self, on_progress=None):
+        """Finish deleting tombstones left over by an interrupted purge"""
+        if self.store is None:
+            return {}
+        leftovers = []
+        gone = []
+        for tombstone_path, project_path in self.store.tombstones():
+            if os.path.lexists(tombstone_path):
+                leftovers.append((project_path, tombstone_path))
+            else:
+                gone.append(tombstone_path)
+        if gone:
+            self.store.remove_tombstones(gone)
+        return self.delete_tombstones(leftovers, on_progress)
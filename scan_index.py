@@ -0,0 +1,114 @@
+import os
+import json
+import time
+
+
+# Directories modified this close to the start of a scan may change again
+# within the same mtime tick, so they are never reused from the index.
+RACY_WINDOW_NS = 2 * 1000 * 1000 * 1000
+
+
+def composer_signature(composer_path, st=None):
+    """[mtime_ns, size] of a composer.json, or None if it cannot be stat()ed"""
+    if st is None:
+        try:
+            st = os.stat(composer_path)
+        except OSError:
+            return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+class ScanIndex:
+    """Persistent index of directory mtimes and known project roots.
+
+    For every directory visited, the index keeps its mtime, whether it is a
+    Laravel project root, and the names of its subdirectories. A directory's
+    mtime changes whenever an entry is added, removed or renamed in it, so
+    a rescan only needs one stat per known directory: when the mtime still
+    matches, the cached subdirectories and project flag are reused and the
+    directory is neither listed nor its composer.json parsed again.
+
+    Rewriting a file in place leaves its directory's mtime alone, so for a
+    directory holding a composer.json the file's mtime and size are kept
+    too, and checked with one more stat before the entry is reused.
+    """
+
+    VERSION = 2
+
+    def __init__(self, path=None):
+        self.path = path
+        self.dirs = {}
+        self._seen = set()
+        self._started_ns = 0
+
+    @classmethod
+    def load(cls, path):
+        """Load the index from path, starting empty if it is missing or invalid"""
+        index = cls(path)
+        if not os.path.exists(path):
+            return index
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == cls.VERSION:
+                index.dirs = data.get('dirs', {})
+        except Exception as e:
+            print(f"Error loading scan index: {e}")
+        return index
+
+    def save(self):
+        """Write the index atomically next to its final location"""
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                # Copy first: workers of a cancelled scan may still be recording
+                dirs = dict(self.dirs)
+                json.dump({'version': self.VERSION, 'dirs': dirs}, f, separators=(',', ':'))
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"Error saving scan index: {e}")
+
+    def begin(self):
+        self._started_ns = time.time_ns()
+        self._seen = set()
+
+    def lookup(self, path, mtime_ns, counters=None):
+        """Return (is_project, subdir_names) if path is unchanged, else None.
+
+        `counters`, if given, is a dict whose 'composer_stats' counts the
+        composer.json stats made.
+        """
+        self._seen.add(path)
+        cached = self.dirs.get(path)
+        if cached is None or mtime_ns is None or cached[0] != mtime_ns:
+            return None
+        if cached[3] is not None:
+            if counters is not None:
+                counters['composer_stats'] = counters.get('composer_stats', 0) + 1
+            if composer_signature(os.path.join(path, 'composer.json')) != cached[3]:
+                return None
+        return bool(cached[1]), cached[2]
+
+    def record(self, path, mtime_ns, is_project, names, composer=None):
+        """Remember a listed directory; `composer` is the composer_signature() of its composer.json"""
+        racy = self._started_ns - RACY_WINDOW_NS
+        if mtime_ns is None or mtime_ns > racy or (composer is not None and composer[0] > racy):
+            mtime_ns = -1
+        self.dirs[path] = [mtime_ns, 1 if is_project else 0, names, composer]
+
+    def commit(self, root_dir, complete=True):
+        """Forget directories under root_dir that the last scan did not reach.
+
+        Only done after a complete scan; a partial one keeps the old entries.
+        """
+        if not complete:
+            return
+        prefix = os.path.join(root_dir, '')
+        stale = [
+            path for path in self.dirs
+            if (path == root_dir or path.startswith(prefix)) and path not in self._seen
+        ]
+        for path in stale:
+            del self.dirs[path]
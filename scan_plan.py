@@ -0,0 +1,106 @@
+import os
+import stat
+
+from detection import probe_composer
+from prune import NO_PRUNING
+
+
+def split_roots(text):
+    """Split a list of folders separated by os.pathsep (':' on POSIX, ';' on Windows)"""
+    return [part.strip() for part in text.split(os.pathsep) if part.strip()]
+
+
+def _is_project(path):
+    # Same test as the walker, which never descends into a Laravel project
+    return (os.path.isfile(os.path.join(path, 'artisan'))
+            and os.path.isfile(os.path.join(path, 'composer.json'))
+            and probe_composer(os.path.join(path, 'composer.json')))
+
+
+def _key(path):
+    # Compare paths the way the filesystem does
+    return os.path.normcase(path)
+
+
+class ScanPlan:
+    """The roots one scan walks, with duplicate and nested roots removed.
+
+    Two roots are the same folder if their (st_dev, st_ino) match, which
+    also catches symlinks and bind mounts. A root is nested if its real
+    path lies inside another root that the walk would actually reach it
+    from, given the prune rules and the Laravel projects on the way (the
+    walk does not descend into a project). Dropped roots are kept in
+    `dropped` as (root, reason) so the UI can say why.
+    """
+
+    def __init__(self, roots, prune=None):
+        self.prune = prune if prune is not None else NO_PRUNING
+        self.roots = []
+        self.dropped = []
+        # Roots that could not be scanned at all (also listed in dropped)
+        self.missing = []
+
+        candidates = []
+        for order, root in enumerate(roots):
+            path = os.path.abspath(os.path.expanduser(root))
+            try:
+                st = os.stat(path)
+            except OSError:
+                self.dropped.append((path, "not found"))
+                self.missing.append(path)
+                continue
+            if not stat.S_ISDIR(st.st_mode):
+                self.dropped.append((path, "not a directory"))
+                self.missing.append(path)
+                continue
+            candidates.append((_key(os.path.realpath(path)), order, path, (st.st_dev, st.st_ino)))
+
+        # Parents sort before the folders inside them
+        candidates.sort(key=lambda c: (c[0].count(os.sep), c[0]))
+        kept = []
+        identities = {}
+        for real, order, path, identity in candidates:
+            if identity in identities:
+                self.dropped.append((path, f"same folder as {identities[identity]}"))
+                continue
+            parent = next((p for r, _, p in kept if self._reaches(r, real)), None)
+            if parent is not None:
+                self.dropped.append((path, f"inside {parent}"))
+                continue
+            identities[identity] = path
+            kept.append((real, order, path))
+
+        self.roots = [path for _, _, path in sorted(kept, key=lambda k: k[1])]
+
+    def _reaches(self, parent_real, real):
+        """Whether walking parent_real would visit real"""
+        if real == parent_real:
+            return True
+        prefix = os.path.join(parent_real, '')
+        if not real.startswith(prefix):
+            return False
+        parts = real[len(prefix):].split(os.sep)
+        if self.prune.too_deep(len(parts)):
+            return False
+        for depth in range(1, len(parts) + 1):
+            rel_path = '/'.join(parts[:depth])
+            if self.prune.prunes(parts[depth - 1], rel_path):
+                return False
+        # The walk stops at the first Laravel project above real
+        for depth in range(len(parts)):
+            if _is_project(os.path.join(parent_real, *parts[:depth])):
+                return False
+        return True
+
+    def root_of(self, path):
+        """The root a found path was reached from"""
+        for root in self.roots:
+            if path == root or path.startswith(os.path.join(root, '')):
+                return root
+        return None
+
+    def summary(self):
+        text = f"{len(self.roots)} folder(s)"
+        if self.dropped:
+            text += f", {len(self.dropped)} skipped as duplicate, nested or missing"
+        return text
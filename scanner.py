@@ -1,5 +1,32 @@
 import os
 import json
+import time
+import queue
+import threading
+
+from checkpoint import CHECKPOINT_SECONDS, CHECKPOINT_WAIT_SECONDS, scan_options
+from detection import probe_composer
+from devices import DeviceQueue, MountTable
+from prune import PruneRules, estimate_entries
+from scan_index import composer_signature
+from scan_plan import ScanPlan
+from throttle import run_workers
+
+
+# Workers spend most of their time blocked in scandir/stat, so the pool is
+# sized for I/O rather than CPU, like ThreadPoolExecutor's default.
+DEFAULT_JOBS = min(32, (os.cpu_count() or 1) + 4)
+
+# How many directories a walker thread handles before publishing its counters
+STATS_FLUSH_EVERY = 64
+
+# How often a streaming consumer re-checks the token while waiting for results
+CANCEL_POLL_SECONDS = 0.05
+
+
+def composer_requires_laravel(composer_path, counters=None):
+    """Check whether a composer.json requires laravel/framework (or Lumen)"""
+    return probe_composer(composer_path, counters)
 
 
 def is_laravel_project(path):
@@ -12,22 +39,669 @@ def is_laravel_project(path):
     if not os.path.isfile(composer_path):
         return False
 
+    return composer_requires_laravel(composer_path)
+
+
+def _entry_is_file(entry):
     try:
-        with open(composer_path, 'r') as f:
-            composer = json.load(f)
-        dependencies = composer.get('require', {})
-        if 'laravel/framework' in dependencies:
-            return True
-    except Exception:
+        return entry.is_file()
+    except OSError:
         return False
 
-    return False
 
+def _entry_is_dir(entry, follow_symlinks=False):
+    # By default symlinked directories are listed but never descended into, like os.walk
+    try:
+        return entry.is_dir(follow_symlinks=follow_symlinks)
+    except OSError:
+        return False
+
+
+def scan_directory(path, counters=None, follow_symlinks=False):
+    """List a directory once and classify it.
+
+    Returns (is_project, subdirs, composer) where subdirs are the names of
+    the subdirectories, or None if the directory could not be listed, and
+    composer is the scandir entry of its composer.json, if any. The dirent type information
+    returned by scandir is used for the artisan/composer.json checks, so no
+    extra stat calls are made for regular directories. `counters` is passed
+    on to the composer.json probe. With follow_symlinks, symlinks to
+    directories are listed as subdirectories too.
+    """
+    try:
+        with os.scandir(path) as it:
+            entries = list(it)
+    except OSError:
+        return False, None, None
+
+    has_artisan = False
+    composer = None
+    subdirs = []
+    for entry in entries:
+        name = entry.name
+        if name == 'artisan' and _entry_is_file(entry):
+            has_artisan = True
+        elif name == 'composer.json' and _entry_is_file(entry):
+            composer = entry
+        elif _entry_is_dir(entry, follow_symlinks):
+            subdirs.append(name)
+
+    if has_artisan and composer is not None:
+        if composer_requires_laravel(composer.path, counters):
+            return True, [], composer
+
+    return False, subdirs, composer
+
+
+class ScanToken:
+    """Cooperative cancel/pause switch checked by every walker thread.
+
+    Workers check the token before each directory, so a cancel takes effect
+    as soon as the directories being listed right now are done.
+    """
+
+    def __init__(self):
+        self._cancelled = threading.Event()
+        self._running = threading.Event()
+        self._running.set()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    @property
+    def paused(self):
+        return not self._running.is_set()
+
+    def cancel(self):
+        self._cancelled.set()
+        # Wake up paused workers so they can see the cancellation
+        self._running.set()
+
+    def pause(self):
+        if not self.cancelled:
+            self._running.clear()
+
+    def resume(self):
+        self._running.set()
+
+    def wait_while_paused(self):
+        """Block while paused; return False if the scan was cancelled"""
+        self._running.wait()
+        return not self.cancelled
+
+
+class ScanStats:
+    """Counters filled in while a scan runs.
+
+    `metrics` (an instrumentation.Metrics) adds timing histograms and
+    per-root durations, `profiler` (an instrumentation.Profiler) profiles
+    the walker threads; both cost nothing when left out.
+    """
+
+    def __init__(self, metrics=None, profiler=None):
+        self._lock = threading.Lock()
+        self.metrics = metrics
+        self.profiler = profiler
+        self.dirs_visited = 0
+        self.dirs_cached = 0
+        self.dirs_skipped = 0
+        self.dirs_duplicate = 0
+        # Directories on another filesystem, left out by one_file_system
+        self.dirs_other_fs = 0
+        self.entries_saved = 0
+        self.projects_found = 0
+        # composer.json probes settled by the byte search / by a full parse
+        self.probes_fast = 0
+        self.probes_full = 0
+        self.probe_fast_ns = 0
+        self.probe_full_ns = 0
+        # File system calls: directory stats (index and dedupe) and composer.json reads
+        self.stat_calls = 0
+        self.files_read = 0
+        self.bytes_read = 0
+        self.started = time.monotonic()
+        self.finished = None
+        # Per-device counters of the running walk (DeviceQueue.devices), set by the walker
+        self.devices = None
+        # throttle.Throttle the walk ran under, set by the walker
+        self.throttle = None
+
+    def add(self, **counts):
+        with self._lock:
+            for name, value in counts.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def prune_summary(self):
+        return f"skipped {self.dirs_skipped} dirs / saved {self.entries_saved} entries"
+
+    def index_summary(self):
+        return f"reused {self.dirs_cached} of {self.dirs_visited} dirs from index"
+
+    def probe_summary(self):
+        probes = self.probes_fast + self.probes_full
+        if not probes:
+            return "no composer.json probed"
+
+        def average_us(total_ns, count):
+            return total_ns / count / 1000 if count else 0.0
+
+        return (f"{probes} composer.json probed: {self.probes_fast} by fast path "
+                f"({average_us(self.probe_fast_ns, self.probes_fast):.0f} us avg), "
+                f"{self.probes_full} full parses "
+                f"({average_us(self.probe_full_ns, self.probes_full):.0f} us avg)")
+
+    def elapsed(self):
+        end = self.finished if self.finished is not None else time.monotonic()
+        return end - self.started
+
+    def dirs_per_second(self):
+        elapsed = self.elapsed()
+        return self.dirs_visited / elapsed if elapsed > 0 else 0.0
+
+    def device_summary(self):
+        """Throughput and threads of each filesystem, e.g. "/: 5200 dirs/s x16" """
+        if self.devices is None:
+            return ""
+        return ", ".join(f"{row['device']}: {row['dirs_per_second']:.0f} dirs/s x{row['threads']}"
+                         for row in self.devices() if row['dirs'])
+
+    def progress_summary(self):
+        summary = (f"{self.dirs_visited} dirs visited / {self.projects_found} projects found / "
+                   f"{self.dirs_per_second():.0f} dirs/s")
+        devices = self.devices() if self.devices is not None else []
+        if len(devices) > 1:
+            summary += f" ({self.device_summary()})"
+        if self.throttle is not None and self.throttle.waits:
+            summary += f" / {self.throttle.summary()}"
+        return summary
+
+    def as_dict(self):
+        """Counters, metrics and profile of the scan as plain JSON-able values"""
+        with self._lock:
+            counters = {
+                'dirs_visited': self.dirs_visited,
+                'dirs_cached': self.dirs_cached,
+                'dirs_listed': self.dirs_visited - self.dirs_cached,
+                'dirs_skipped': self.dirs_skipped,
+                'dirs_duplicate': self.dirs_duplicate,
+                'dirs_other_fs': self.dirs_other_fs,
+                'entries_saved': self.entries_saved,
+                'projects_found': self.projects_found,
+                'probes_fast': self.probes_fast,
+                'probes_full': self.probes_full,
+                'probe_fast_ns': self.probe_fast_ns,
+                'probe_full_ns': self.probe_full_ns,
+                'stat_calls': self.stat_calls,
+                'files_read': self.files_read,
+                'bytes_read': self.bytes_read,
+            }
+        # One scandir per listed directory, open/read/close per composer.json read
+        counters['syscalls'] = counters['dirs_listed'] + self.stat_calls + 3 * self.files_read
+        result = {
+            'elapsed_s': round(self.elapsed(), 4),
+            'finished': self.finished is not None,
+            'dirs_per_second': round(self.dirs_per_second(), 1),
+            'counters': counters,
+        }
+        if self.devices is not None:
+            result['devices'] = self.devices()
+        if self.throttle is not None:
+            result['throttle'] = self.throttle.as_dict()
+        if self.metrics is not None:
+            result['metrics'] = self.metrics.as_dict()
+        if self.profiler is not None:
+            result['profile'] = self.profiler.as_dict()
+        return result
+
+    def export_json(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.as_dict(), f, indent=2)
+            f.write('\n')
+
+
+class Walker:
+    """Parallel scandir-based walker that collects Laravel project roots.
+
+    When several roots are walked or symlinks are followed, every directory
+    is claimed by its (st_dev, st_ino) before it is listed, so a folder
+    reached twice (overlapping roots, bind mounts, symlink loops) is only
+    visited once and its projects are only reported once.
+
+    Directories are queued per filesystem (see devices.DeviceQueue). The
+    device of a directory is its parent's unless it is a mount point in
+    the MountTable; without one (not Linux) it is taken from the stat the
+    walker makes anyway. With one_file_system, directories on another
+    filesystem than their root are not entered. A throttle.Throttle is
+    charged one operation per directory and the composer.json bytes read.
+
+    With a checkpoint.ScanCheckpoint, the queued directories and the
+    projects found are saved every CHECKPOINT_SECONDS. A checkpoint of the
+    same roots and options is resumed instead: its projects are emitted
+    first and only its pending directories are walked.
+    """
+
+    def __init__(self, jobs=None, prune=None, stats=None, index=None, token=None,
+                 follow_symlinks=False, one_file_system=False, mounts=None, throttle=None,
+                 checkpoint=None):
+        self.jobs = max(1, jobs or DEFAULT_JOBS)
+        self.prune = prune if prune is not None else PruneRules()
+        self.stats = stats if stats is not None else ScanStats()
+        # Cached listings do not say which entries were symlinks
+        self.index = index if not follow_symlinks else None
+        self.token = token if token is not None else ScanToken()
+        self.follow_symlinks = follow_symlinks
+        self.one_file_system = one_file_system
+        self.mounts = mounts if mounts is not None else MountTable()
+        self.throttle = throttle
+        self.checkpoint = checkpoint
+        # Projects emitted so far, kept for the checkpoint
+        self._found = []
+        self._seen = None
+        self._seen_lock = threading.Lock()
+        self._root_devices = {}
+
+    def _claim(self, path):
+        """Stat a directory and mark it visited; returns None if it already was"""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return False
+        identity = (st.st_dev, st.st_ino)
+        with self._seen_lock:
+            if identity in self._seen:
+                return None
+            self._seen.add(identity)
+        return st
+
+    def _visit(self, path, counters, st=None):
+        """Classify one directory, reusing the index when its mtime is unchanged"""
+        index = self.index
+        if index is None:
+            is_project, subdirs, _ = scan_directory(path, counters, self.follow_symlinks)
+            return is_project, subdirs or (), False
+
+        if st is None:
+            try:
+                st = os.stat(path)
+            except OSError:
+                st = False
+        mtime_ns = st.st_mtime_ns if st else None
+        cached = index.lookup(path, mtime_ns, counters)
+        if cached is not None:
+            is_project, subdirs = cached
+            return is_project, subdirs, True
+
+        is_project, subdirs, composer = scan_directory(path, counters, self.follow_symlinks)
+        if subdirs is None:
+            return is_project, (), False
+        signature = None
+        if composer is not None:
+            # A file rewritten in place leaves the directory mtime alone
+            counters['composer_stats'] = counters.get('composer_stats', 0) + 1
+            try:
+                signature = composer_signature(composer.path, composer.stat())
+            except OSError:
+                pass
+        index.record(path, mtime_ns, is_project, subdirs, signature)
+        return is_project, subdirs, False
+
+    def _children(self, root_dir, path, depth, subdirs, device):
+        """Apply the prune rules to the subdirectories of a visited directory.
+
+        Returns (children, skipped, saved entries, left on other filesystems).
+        """
+        prune = self.prune
+        prefix = os.path.join(path, '')
+        children = []
+        skipped = 0
+        saved = 0
+        other_fs = 0
+        if prune.too_deep(depth):
+            skipped = len(subdirs)
+            saved = sum(estimate_entries(prefix + name) for name in subdirs)
+            return children, skipped, saved, other_fs
+
+        mount_points = self.mounts.points
+        root_device = self._root_devices.get(root_dir)
+        for name in subdirs:
+            child = prefix + name
+            rel_path = ''
+            if prune.needs_rel_path:
+                rel_path = os.path.relpath(child, root_dir).replace(os.sep, '/')
+            if prune.prunes(name, rel_path):
+                skipped += 1
+                saved += estimate_entries(child)
+                continue
+            child_device = mount_points.get(child, device) if mount_points else device
+            if self.one_file_system and child_device != root_device:
+                other_fs += 1
+                continue
+            children.append((child, depth, root_dir, child_device))
+        return children, skipped, saved, other_fs
+
+    def _flush(self, probe_counts, visit_us, roots, **counts):
+        """Publish a worker's local counters and, when instrumented, its timings"""
+        probe_us = probe_counts.pop('probe_us', None)
+        counts['stat_calls'] += probe_counts.pop('composer_stats', 0)
+        self.stats.add(**counts, **probe_counts)
+        probe_counts.clear()
+        metrics = self.stats.metrics
+        if metrics is not None:
+            metrics.observe_many('visit_dir_us', visit_us)
+            metrics.observe_many('probe_composer_us', probe_us)
+            for root, (dirs, first, last) in roots.items():
+                metrics.add_root(root, dirs, first, last)
+            visit_us.clear()
+            roots.clear()
+            probe_us.clear()
+            probe_counts['probe_us'] = probe_us
+
+    def _work(self, work, worker, emit):
+        # Counters are kept locally and flushed in batches to keep the
+        # shared lock off the per-directory path
+        token = self.token
+        visited = cached_count = skipped = saved = found = duplicate = other_fs = 0
+        # Directories stat()ed for the index or the duplicate check
+        stats_each = self.index is not None or self._seen is not None
+        # Without a mount table, one_file_system needs the device of every directory
+        stat_device = self.one_file_system and not self.mounts
+        extra_stats = 0
+        probe_counts = {}
+        throttle = self.throttle
+        # Timings, only gathered when the scan is instrumented
+        timed = self.stats.metrics is not None
+        visit_us = []
+        roots = {}
+        if timed:
+            probe_counts['probe_us'] = []
+        try:
+            while True:
+                item = work.pop(worker)
+                if item is None:
+                    return
+                if token.paused:
+                    token.wait_while_paused()
+                if token.cancelled:
+                    work.close()
+                    return
+                path, depth, root_dir, device = item
+                children = ()
+                started = time.perf_counter()
+                ended = None
+                try:
+                    st = None
+                    if self._seen is not None:
+                        st = self._claim(path)
+                        if st is None:
+                            duplicate += 1
+                            continue
+                    elif stat_device:
+                        try:
+                            st = os.stat(path)
+                        except OSError:
+                            st = False
+                        extra_stats += 1
+                    if st and st.st_dev != device and not self.mounts:
+                        # A mount point the walker could not know of in advance
+                        if self.one_file_system and st.st_dev != self._root_devices.get(root_dir):
+                            other_fs += 1
+                            continue
+                        device = st.st_dev
+                    read_before = probe_counts.get('bytes_read', 0)
+                    is_project, subdirs, cached = self._visit(path, probe_counts, st)
+                    ended = time.perf_counter()
+                    if timed:
+                        visit_us.append((ended - started) * 1e6)
+                        entry = roots.get(root_dir)
+                        if entry is None:
+                            roots[root_dir] = [1, started, ended]
+                        else:
+                            entry[0] += 1
+                            entry[2] = ended
+                    visited += 1
+                    cached_count += cached
+                    if is_project:
+                        # Avoid scanning subdirs of this project
+                        emit(path)
+                        found += 1
+                    else:
+                        children, dir_skipped, dir_saved, dir_other_fs = self._children(
+                            root_dir, path, depth + 1, subdirs, device)
+                        skipped += dir_skipped
+                        saved += dir_saved
+                        other_fs += dir_other_fs
+                finally:
+                    work.complete(worker, children, item[3],
+                                  (ended or time.perf_counter()) - started)
+                if throttle is not None and ended is not None:
+                    throttle.spend(1, probe_counts.get('bytes_read', 0) - read_before)
+                if visited >= STATS_FLUSH_EVERY:
+                    self._flush(probe_counts, visit_us, roots,
+                                dirs_visited=visited, dirs_cached=cached_count,
+                                dirs_skipped=skipped, entries_saved=saved,
+                                projects_found=found, dirs_duplicate=duplicate,
+                                dirs_other_fs=other_fs,
+                                stat_calls=(visited + duplicate) * stats_each + extra_stats)
+                    visited = cached_count = skipped = saved = found = duplicate = 0
+                    other_fs = extra_stats = 0
+        finally:
+            self._flush(probe_counts, visit_us, roots,
+                        dirs_visited=visited, dirs_cached=cached_count,
+                        dirs_skipped=skipped, entries_saved=saved,
+                        projects_found=found, dirs_duplicate=duplicate,
+                        dirs_other_fs=other_fs,
+                        stat_calls=(visited + duplicate) * stats_each + extra_stats)
+
+    def _run_worker(self, work, worker, emit):
+        profiler = self.stats.profiler
+        if profiler is None:
+            self._work(work, worker, emit)
+        else:
+            profiler.run(self._work, work, worker, emit)
+
+    def walk(self, roots, emit):
+        """Walk one root or a ScanPlan, calling emit(path) from a worker thread for each project"""
+        plan = self.plan(roots)
+        work = DeviceQueue(self.jobs, self.mounts)
+        items = []
+        for root in plan.roots:
+            try:
+                device = os.stat(root).st_dev
+            except OSError:
+                device = 0
+            self._root_devices[root] = device
+            items.append((root, 0, root, device))
+
+        checkpoint = self.checkpoint
+        resumed = False
+        if checkpoint is not None:
+            resumed = checkpoint.resumable(plan.roots, self.prune, self.follow_symlinks,
+                                           self.one_file_system)
+            if resumed:
+                items = self._resume_items(checkpoint)
+                emit = self._resume_projects(checkpoint, emit)
+                visited_before = checkpoint.dirs_visited
+            else:
+                checkpoint.begin(plan.roots, scan_options(self.prune, self.follow_symlinks,
+                                                          self.one_file_system))
+                emit = self._recording(set(), [], emit)
+                visited_before = 0
+
+        work.push(0, items)
+        self.stats.devices = work.devices
+        self.stats.throttle = self.throttle
+        if len(plan.roots) > 1 or self.follow_symlinks:
+            self._seen = set()
+        self.stats.started = time.monotonic()
+        if self.index is not None:
+            self.index.begin()
+
+        saving = None
+        if checkpoint is not None:
+            saving = threading.Event()
+            threading.Thread(target=self._keep_checkpoint, args=(work, saving, visited_before),
+                             daemon=True).start()
+
+        profiler = self.stats.profiler
+        if profiler is not None:
+            profiler.start()
+        try:
+            run_workers(lambda i: self._run_worker(work, i, emit), self.jobs, self.throttle)
+        finally:
+            self.stats.finished = time.monotonic()
+            if profiler is not None:
+                profiler.stop()
+            if saving is not None:
+                saving.set()
+                if self.token.cancelled:
+                    # Stopped: keep where the walk got to, so it can be resumed
+                    self._save_checkpoint(work, visited_before)
+                else:
+                    checkpoint.clear()
+
+        if self.index is not None:
+            # A cancelled or resumed scan did not see everything; keep the old entries
+            for root in plan.roots:
+                self.index.commit(root, complete=not self.token.cancelled and not resumed)
+
+    def _recording(self, known, found, emit):
+        """Wrap emit to remember the projects for the checkpoint, skipping known ones"""
+        def record(path):
+            if path in known:
+                return
+            # list.append is atomic; the checkpoint thread only copies the list
+            found.append(path)
+            emit(path)
+
+        self._found = found
+        return record
+
+    def _resume_items(self, checkpoint):
+        """Work items of a checkpoint, with the devices of its roots brought up to date"""
+        items = []
+        for path, depth, root, device in checkpoint.frontier:
+            if device == checkpoint.root_devices.get(root):
+                device = self._root_devices.get(root, device)
+            items.append((path, depth, root, device))
+        return items
+
+    def _resume_projects(self, checkpoint, emit):
+        """Emit the projects of a checkpoint and return emit for the rest of the walk"""
+        projects = list(checkpoint.projects)
+        for path in projects:
+            emit(path)
+        self.stats.add(projects_found=len(projects))
+        # A directory being visited when the checkpoint was written is visited again
+        return self._recording(set(projects), projects, emit)
+
+    def _save_checkpoint(self, work, visited_before):
+        frontier = work.snapshot()
+        # Projects are emitted before their directory is completed, so every
+        # project of a directory missing from the frontier is in this copy
+        projects = list(self._found)
+        self.checkpoint.save(frontier, projects, dict(self._root_devices),
+                             visited_before + self.stats.dirs_visited)
+
+    def _keep_checkpoint(self, work, done, visited_before):
+        last_visited = None
+        while not done.wait(CHECKPOINT_SECONDS):
+            # Nothing to write while the scan is paused
+            if self.stats.dirs_visited != last_visited:
+                last_visited = self.stats.dirs_visited
+                self._save_checkpoint(work, visited_before)
+
+    def plan(self, roots):
+        """Turn a path, a list of paths or a ScanPlan into a ScanPlan"""
+        if isinstance(roots, ScanPlan):
+            return roots
+        if isinstance(roots, (str, os.PathLike)):
+            # A single root is walked as given, like os.walk
+            plan = ScanPlan([])
+            plan.roots = [os.fspath(roots)]
+            return plan
+        return ScanPlan(roots, self.prune)
+
+    def run(self, roots):
+        projects = []
+        self.walk(roots, projects.append)
+        projects.sort()
+        return projects
+
+    def iter(self, roots):
+        """Yield projects as soon as a worker finds them.
+
+        The generator returns at most CANCEL_POLL_SECONDS after the token is
+        cancelled, without waiting for workers stuck in a slow listing.
+        Closing the generator early cancels the scan; with a checkpoint it
+        first waits (up to CHECKPOINT_WAIT_SECONDS) for it to be written.
+        """
+        found = queue.Queue()
+        done = object()
+        token = self.token
+
+        def walk():
+            try:
+                self.walk(roots, found.put)
+            finally:
+                found.put(done)
+
+        walker = threading.Thread(target=walk, daemon=True)
+        walker.start()
+        finished = False
+        try:
+            while True:
+                try:
+                    project = found.get(timeout=CANCEL_POLL_SECONDS)
+                except queue.Empty:
+                    if token.cancelled:
+                        return
+                    continue
+                if project is done:
+                    finished = True
+                    return
+                yield project
+        finally:
+            # Only a walk left early is cancelled, so callers can tell it apart
+            if not finished:
+                token.cancel()
+                if self.checkpoint is not None:
+                    walker.join(CHECKPOINT_WAIT_SECONDS)
+
+
+def scan_for_laravel_projects(root_dir, jobs=None, prune=None, stats=None, index=None,
+                              token=None, follow_symlinks=False, one_file_system=False,
+                              throttle=None, checkpoint=None):
+    """Find Laravel project roots under root_dir.
+
+    `root_dir` is a folder, a list of folders or a ScanPlan; duplicate and
+    nested folders in a list are walked once. `prune` is a PruneRules
+    instance (node_modules and .git are skipped by default, pass
+    prune.NO_PRUNING to walk everything), `stats` an optional ScanStats
+    that receives the counters of this scan, `index` an optional ScanIndex
+    used for incremental rescans and `token` an optional ScanToken to
+    cancel or pause the scan from another thread. With follow_symlinks,
+    symlinked folders are walked too, with loops detected by
+    (st_dev, st_ino); the index is not used then. With one_file_system,
+    folders on another filesystem than their root are not entered.
+    `throttle` is an optional throttle.Throttle capping the walk's I/O and
+    `checkpoint` an optional checkpoint.ScanCheckpoint the walk is saved
+    to periodically (and resumed from, if it holds an unfinished scan of
+    the same roots and options). A cancelled scan returns the projects
+    found so far.
+    """
+    return Walker(jobs, prune, stats, index, token, follow_symlinks,
+                  one_file_system, throttle=throttle, checkpoint=checkpoint).run(root_dir)
+
+
+def iter_laravel_projects(root_dir, jobs=None, prune=None, stats=None, index=None,
+                          token=None, follow_symlinks=False, one_file_system=False,
+                          throttle=None, checkpoint=None):
+    """Like scan_for_laravel_projects, but yields each project as it is found.
 
-def scan_for_laravel_projects(root_dir):
-    laravel_projects = []
-    for dirpath, dirnames, filenames in os.walk(root_dir):
-        if is_laravel_project(dirpath):
-            laravel_projects.append(dirpath)
-            dirnames.clear()  # Avoid scanning subdirs of this project
-    return laravel_projects
+    Projects come in discovery order rather than sorted. The walk runs in
+    background threads, so the first results arrive long before the scan
+    is complete.
+    """
+    return Walker(jobs, prune, stats, index, token, follow_symlinks,
+                  one_file_system, throttle=throttle, checkpoint=checkpoint).iter(root_dir)
@@ -0,0 +1,121 @@
+"""Substring and fuzzy search over the paths of the project list.
+
+All paths are kept lowercased in one newline-joined string, so a rare
+term is found with a few str.find calls instead of a test per path. A
+query is split on whitespace and every term has to match (in any order).
+A term that matches no path as a substring is matched fuzzily instead:
+its characters in order within one folder name, so "lrvshop" finds
+".../laravel-shop". Typing a longer query narrows the rows of the
+previous one instead of searching all paths again.
+"""
+import re
+from bisect import bisect_right
+
+
+# Below this many occurrences in the joined text, str.find beats testing every path
+FIND_LIMIT = 2000
+# Characters a fuzzy match may not cross: folder separators and the path joiner
+_BOUNDARY = '/\\\\\n'
+
+
+def fuzzy_pattern(term):
+    """Regex matching the characters of term in order within one folder name.
+
+    Every gap only excludes the next character, so the regex never
+    backtracks: it is linear in the length of the text.
+    """
+    parts = [re.escape(term[0])]
+    for char in term[1:]:
+        parts.append(f"[^{re.escape(char)}{_BOUNDARY}]*{re.escape(char)}")
+    return re.compile(''.join(parts))
+
+
+class PathIndex:
+    """Search index over a fixed list of paths; rows are positions in that list"""
+
+    def __init__(self, paths):
+        self.paths = [path.lower() for path in paths]
+        self.text = '\n'.join(self.paths)
+        self.starts = []
+        position = 0
+        for path in self.paths:
+            self.starts.append(position)
+            position += len(path) + 1
+        self.fuzzy = False
+        self._query = None
+        self._rows = None
+        # term -> (fuzzy, rows) of the previous query, for narrowing
+        self._terms = {}
+
+    def __len__(self):
+        return len(self.paths)
+
+    def search(self, query):
+        """Rows matching every term of query, in ascending order; None for an empty query.
+
+        Sets self.fuzzy when at least one term only matched fuzzily.
+        """
+        terms = query.lower().split()
+        if not terms:
+            self.fuzzy = False
+            return None
+        if terms == self._query:
+            return self._rows
+
+        results = {}
+        for term in dict.fromkeys(terms):
+            results[term] = self._match(term)
+        self._terms = results
+        self._query = terms
+        self.fuzzy = any(fuzzy for fuzzy, _ in results.values())
+
+        sets = sorted((rows for _, rows in results.values()), key=len)
+        if len(sets) == 1:
+            self._rows = sets[0]
+        else:
+            common = set(sets[0]).intersection(*sets[1:])
+            self._rows = sorted(common)
+        return self._rows
+
+    def _match(self, term):
+        """(fuzzy, rows) for one term, narrowed from the previous query when possible"""
+        for previous, (fuzzy, rows) in self._terms.items():
+            if not fuzzy and previous in term:
+                found = [row for row in rows if term in self.paths[row]]
+                if found:
+                    return False, found
+                break
+        else:
+            found = self._substring(term)
+            if found:
+                return False, found
+
+        pattern = fuzzy_pattern(term)
+        for previous, (fuzzy, rows) in self._terms.items():
+            if fuzzy and term.startswith(previous):
+                return True, [row for row in rows if pattern.search(self.paths[row])]
+        return True, self._rows_at(match.start() for match in pattern.finditer(self.text))
+
+    def _substring(self, term):
+        text = self.text
+        count = text.count(term)
+        if not count:
+            return []
+        if count > FIND_LIMIT:
+            return [row for row, path in enumerate(self.paths) if term in path]
+        positions = []
+        position = text.find(term)
+        while position != -1:
+            positions.append(position)
+            position = text.find(term, position + 1)
+        return self._rows_at(positions)
+
+    def _rows_at(self, positions):
+        """Rows containing the given ascending text positions, without duplicates"""
+        rows = []
+        starts = self.starts
+        for position in positions:
+            row = bisect_right(starts, position) - 1
+            if not rows or rows[-1] != row:
+                rows.append(row)
+        return rows
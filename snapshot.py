@@ -0,0 +1,31 @@
+"""Compact snapshot of the project list, drawn at startup before anything is validated."""
+import os
+import json
+
+
+VERSION = 1
+
+
+def save_snapshot(path, columns):
+    """Write the columns of ProjectListModel.columns() atomically"""
+    tmp_path = f"{path}.tmp"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': VERSION, 'columns': columns}, f, separators=(',', ':'))
+        os.replace(tmp_path, path)
+    except Exception as e:
+        print(f"Error saving project snapshot: {e}")
+
+
+def load_snapshot(path):
+    """Columns saved by save_snapshot, or None if there is no usable snapshot"""
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') == VERSION:
+            return data['columns']
+    except Exception as e:
+        print(f"Error loading project snapshot: {e}")
+    return None
@@ -0,0 +1,314 @@
+import os
+import time
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+
+# Each entry upgrades the schema by one version (PRAGMA user_version)
+MIGRATIONS = [
+    """
+    CREATE TABLE projects (
+        path TEXT PRIMARY KEY,
+        root TEXT,
+        first_seen REAL NOT NULL,
+        last_seen REAL NOT NULL,
+        has_vendor INTEGER NOT NULL DEFAULT 0,
+        vendor_size INTEGER,
+        vendor_files INTEGER
+    );
+    CREATE INDEX projects_root ON projects(root);
+    CREATE INDEX projects_last_seen ON projects(last_seen);
+    CREATE TABLE meta (
+        key TEXT PRIMARY KEY,
+        value TEXT
+    );
+    """,
+    """
+    CREATE TABLE disk_usage (
+        path TEXT NOT NULL,
+        target TEXT NOT NULL,
+        stamp INTEGER,
+        apparent INTEGER NOT NULL,
+        disk INTEGER NOT NULL,
+        files INTEGER NOT NULL,
+        measured REAL NOT NULL,
+        PRIMARY KEY (path, target)
+    );
+    ALTER TABLE projects ADD COLUMN vendor_disk INTEGER;
+    ALTER TABLE projects ADD COLUMN extra_disk INTEGER;
+    """,
+    """
+    CREATE TABLE tombstones (
+        path TEXT PRIMARY KEY,
+        project TEXT NOT NULL,
+        created REAL NOT NULL
+    );
+    """,
+    """
+    ALTER TABLE projects ADD COLUMN laravel_version TEXT;
+    ALTER TABLE projects ADD COLUMN php_constraint TEXT;
+    ALTER TABLE projects ADD COLUMN package_count INTEGER;
+    ALTER TABLE projects ADD COLUMN lock_size INTEGER;
+    ALTER TABLE projects ADD COLUMN lock_mtime_ns INTEGER;
+    """,
+    """
+    ALTER TABLE projects ADD COLUMN last_modified REAL;
+    """,
+]
+
+
+def read_legacy_projects(filename):
+    """Read project paths from the old dolaravel_projects text file"""
+    projects = []
+
+    if not os.path.exists(filename):
+        return projects
+
+    try:
+        with open(filename, 'r', encoding='utf-8') as f:
+            lines = f.readlines()
+
+        # Find the separator line and get paths after it
+        separator_found = False
+        for line in lines:
+            line = line.strip()
+            if separator_found and line:  # After separator and not empty
+                # Check if it's a valid path (not a header line)
+                # A valid path should not be all equals signs and should look like a path
+                if line and not line.startswith("=") and (os.path.sep in line or (len(line) > 2 and line[1] == ':')):
+                    projects.append(line)
+            elif line and all(c == '=' for c in line) and len(line) >= 10:  # Separator line (all equals, at least 10 chars)
+                separator_found = True
+
+    except Exception as e:
+        print(f"Error reading file: {e}")
+
+    return projects
+
+
+class ProjectStore:
+    """SQLite-backed store of known Laravel projects.
+
+    Every thread gets its own connection. The database runs in WAL mode, so
+    the UI thread can read while a scan or validation thread writes.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+
+    def connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._ensure_schema(conn)
+        return conn
+
+    def _ensure_schema(self, conn):
+        with self._schema_lock:
+            if self._schema_ready:
+                return
+            # IMMEDIATE takes the write lock first, so concurrent processes
+            # opening the same database cannot both apply a migration
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                version = conn.execute("PRAGMA user_version").fetchone()[0]
+                for number, script in enumerate(MIGRATIONS[version:], start=version + 1):
+                    for statement in script.split(';'):
+                        if statement.strip():
+                            conn.execute(statement)
+                    conn.execute(f"PRAGMA user_version = {number}")
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            self._schema_ready = True
+
+    @contextmanager
+    def transaction(self):
+        """Run a batch of statements in one transaction"""
+        conn = self.connection()
+        with conn:
+            yield conn
+
+    def close(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    # Meta values
+
+    def get_meta(self, key, default=None):
+        row = self.connection().execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def set_meta(self, key, value):
+        with self.transaction() as conn:
+            conn.execute(
+                "INSERT INTO meta (key, value) VALUES (?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                (key, value))
+
+    # Projects
+
+    def upsert_projects(self, projects, root=None, vendor_flags=None):
+        """Insert or refresh projects in one transaction.
+
+        `vendor_flags` maps a path to whether it has a vendor directory;
+        projects missing from it keep their stored vendor status.
+        """
+        now = time.time()
+        vendor_flags = vendor_flags or {}
+        rows = [
+            {'path': path, 'root': root, 'now': now, 'has_vendor': vendor_flags.get(path)}
+            for path in projects
+        ]
+        with self.transaction() as conn:
+            conn.executemany(
+                "INSERT INTO projects (path, root, first_seen, last_seen, has_vendor) "
+                "VALUES (:path, :root, :now, :now, COALESCE(:has_vendor, 0)) "
+                "ON CONFLICT(path) DO UPDATE SET "
+                "root = COALESCE(excluded.root, projects.root), "
+                "last_seen = excluded.last_seen, "
+                "has_vendor = COALESCE(:has_vendor, projects.has_vendor)",
+                rows)
+
+    def remove_projects(self, paths):
+        rows = [(p,) for p in paths]
+        with self.transaction() as conn:
+            conn.executemany("DELETE FROM projects WHERE path = ?", rows)
+            conn.executemany("DELETE FROM disk_usage WHERE path = ?", rows)
+
+    def set_vendor_flags(self, vendor_flags):
+        """Update the vendor status of many projects in one transaction"""
+        with self.transaction() as conn:
+            conn.executemany(
+                "UPDATE projects SET has_vendor = ? WHERE path = ?",
+                [(1 if has_vendor else 0, path) for path, has_vendor in vendor_flags.items()])
+
+    def vendor_flags(self):
+        """Stored vendor status of every project, keyed by path"""
+        rows = self.connection().execute("SELECT path, has_vendor FROM projects ORDER BY path")
+        return {path: bool(has_vendor) for path, has_vendor in rows}
+
+    def set_last_modified(self, times):
+        """Store when projects were last worked on: {path: seconds since the epoch}"""
+        with self.transaction() as conn:
+            conn.executemany(
+                "UPDATE projects SET last_modified = ? WHERE path = ?",
+                [(modified, path) for path, modified in times.items()])
+
+    def last_modified(self):
+        """Stored last-modified times, keyed by path"""
+        rows = self.connection().execute(
+            "SELECT path, last_modified FROM projects WHERE last_modified IS NOT NULL")
+        return dict(rows.fetchall())
+
+    # Disk usage
+
+    def cached_usage(self, path):
+        """Measured sizes of a project: {target: (stamp, apparent, disk, files)}"""
+        rows = self.connection().execute(
+            "SELECT target, stamp, apparent, disk, files FROM disk_usage WHERE path = ?", (path,))
+        return {target: (stamp, apparent, disk, files) for target, stamp, apparent, disk, files in rows}
+
+    def save_usage(self, path, measurements):
+        """Store (target, stamp, usage) measurements and refresh the project's size columns"""
+        now = time.time()
+        with self.transaction() as conn:
+            conn.executemany(
+                "INSERT INTO disk_usage (path, target, stamp, apparent, disk, files, measured) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(path, target) DO UPDATE SET stamp = excluded.stamp, "
+                "apparent = excluded.apparent, disk = excluded.disk, files = excluded.files, "
+                "measured = excluded.measured",
+                [(path, target, stamp, usage[0], usage[1], usage[2], now)
+                 for target, stamp, usage in measurements])
+            conn.execute(
+                "UPDATE projects SET "
+                "vendor_size = (SELECT apparent FROM disk_usage WHERE path = ?1 AND target = 'vendor'), "
+                "vendor_disk = (SELECT disk FROM disk_usage WHERE path = ?1 AND target = 'vendor'), "
+                "vendor_files = (SELECT files FROM disk_usage WHERE path = ?1 AND target = 'vendor'), "
+                "extra_disk = (SELECT SUM(disk) FROM disk_usage WHERE path = ?1 AND target != 'vendor') "
+                "WHERE path = ?1",
+                (path,))
+
+    def project_sizes(self):
+        """Last measured sizes: {path: (vendor_disk, vendor_files, extra_disk)}"""
+        rows = self.connection().execute(
+            "SELECT path, vendor_disk, vendor_files, extra_disk FROM projects "
+            "WHERE vendor_disk IS NOT NULL OR extra_disk IS NOT NULL")
+        return {path: (vendor_disk, vendor_files, extra_disk)
+                for path, vendor_disk, vendor_files, extra_disk in rows}
+
+    # composer.lock metadata
+
+    def cached_metadata(self):
+        """Metadata read from composer.lock: {path: ((size, mtime_ns), (version, php, packages))}"""
+        rows = self.connection().execute(
+            "SELECT path, lock_size, lock_mtime_ns, laravel_version, php_constraint, package_count "
+            "FROM projects WHERE lock_size IS NOT NULL")
+        return {path: ((size, mtime_ns), (version, php, packages))
+                for path, size, mtime_ns, version, php, packages in rows}
+
+    def save_metadata(self, results):
+        """Store (path, stamp, metadata) results; a None stamp clears the metadata"""
+        rows = []
+        for path, stamp, metadata in results:
+            size, mtime_ns = stamp if stamp is not None else (None, None)
+            version, php, packages = metadata if metadata is not None else (None, None, None)
+            rows.append((size, mtime_ns, version, php, packages, path))
+        with self.transaction() as conn:
+            conn.executemany(
+                "UPDATE projects SET lock_size = ?, lock_mtime_ns = ?, laravel_version = ?, "
+                "php_constraint = ?, package_count = ? WHERE path = ?",
+                rows)
+
+    # Vendor directories renamed for deletion
+
+    def add_tombstone(self, path, project):
+        with self.transaction() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO tombstones (path, project, created) VALUES (?, ?, ?)",
+                (path, project, time.time()))
+
+    def remove_tombstones(self, paths):
+        with self.transaction() as conn:
+            conn.executemany("DELETE FROM tombstones WHERE path = ?", [(p,) for p in paths])
+
+    def tombstones(self):
+        """Tombstones not yet deleted: [(path, project)]"""
+        rows = self.connection().execute("SELECT path, project FROM tombstones ORDER BY created")
+        return [(path, project) for path, project in rows]
+
+    def roots(self):
+        """Folders that were scanned to find the stored projects"""
+        rows = self.connection().execute(
+            "SELECT DISTINCT root FROM projects WHERE root IS NOT NULL ORDER BY root")
+        return [row[0] for row in rows]
+
+    def project_paths(self):
+        rows = self.connection().execute("SELECT path FROM projects ORDER BY path")
+        return [row[0] for row in rows]
+
+    def count(self):
+        return self.connection().execute("SELECT COUNT(*) FROM projects").fetchone()[0]
+
+    # Migration from the text file
+
+    def migrate_legacy_file(self, filename):
+        """Import the old text file once; returns the number of projects imported"""
+        if self.get_meta('legacy_migrated'):
+            return 0
+        projects = read_legacy_projects(filename)
+        if projects:
+            self.upsert_projects(projects)
+        self.set_meta('legacy_migrated', time.strftime('%Y-%m-%d %H:%M:%S'))
+        return len(projects)
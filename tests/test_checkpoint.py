@@ -0,0 +1,69 @@
+import json
+import os
+
+from checkpoint import ScanCheckpoint
+from prune import PruneRules
+from scanner import ScanStats, ScanToken, iter_laravel_projects, scan_for_laravel_projects
+from throttle import Throttle
+
+
+def make_tree(root, count=40):
+    for i in range(count):
+        project = os.path.join(root, f'client{i % 5}', f'area{i % 3}', f'app{i}')
+        os.makedirs(os.path.join(project, 'vendor', 'pkg'))
+        with open(os.path.join(project, 'artisan'), 'w') as f:
+            f.write('#!/usr/bin/env php')
+        with open(os.path.join(project, 'composer.json'), 'w') as f:
+            json.dump({'require': {'laravel/framework': '^11.0'}}, f)
+        os.makedirs(os.path.join(root, f'client{i % 5}', f'docs{i}', 'old'))
+
+
+def test_resumed_scan_finds_what_a_full_scan_finds(tmp_path):
+    root = str(tmp_path / 'tree')
+    make_tree(root)
+    prune = PruneRules()
+    full_stats = ScanStats()
+    full = scan_for_laravel_projects(root, jobs=1, prune=prune, stats=full_stats)
+    assert len(full) == 40
+
+    path = str(tmp_path / 'checkpoint.json')
+    # Slow enough that the walk is still running when it is stopped
+    projects = iter_laravel_projects(root, jobs=1, prune=prune, stats=ScanStats(),
+                                     token=ScanToken(), throttle=Throttle(ops_per_second=100),
+                                     checkpoint=ScanCheckpoint(path))
+    first = [next(projects) for _ in range(5)]
+    # Stopping early saves where the walk got to
+    projects.close()
+
+    saved = ScanCheckpoint.load(path)
+    assert saved.resumable([root], prune)
+    assert set(first) <= set(saved.projects)
+
+    second_stats = ScanStats()
+    second = scan_for_laravel_projects(root, jobs=1, prune=prune, stats=second_stats,
+                                       checkpoint=saved)
+    assert second == full
+    assert saved.dirs_visited + second_stats.dirs_visited >= full_stats.dirs_visited
+    # A finished scan removes its checkpoint
+    assert not os.path.exists(path)
+
+
+def test_checkpoint_for_other_options_is_not_resumed(tmp_path):
+    root = str(tmp_path / 'tree')
+    make_tree(root, count=5)
+    path = str(tmp_path / 'checkpoint.json')
+    checkpoint = ScanCheckpoint(path)
+    checkpoint.begin([root], {'prune': [], 'max_depth': None,
+                              'follow_symlinks': False, 'one_file_system': False})
+    checkpoint.save([(root, 0, root, os.stat(root).st_dev)], ['/elsewhere/app'], {}, 1)
+
+    found = scan_for_laravel_projects(root, jobs=2, prune=PruneRules(),
+                                      checkpoint=ScanCheckpoint.load(path))
+    assert len(found) == 5 and '/elsewhere/app' not in found
+
+
+def test_invalid_checkpoint_is_ignored(tmp_path, capsys):
+    path = tmp_path / 'checkpoint.json'
+    path.write_text('{"version": 1, "roots": [')
+    checkpoint = ScanCheckpoint.load(str(path))
+    assert checkpoint.frontier == [] and not checkpoint.resumable(['/x'], PruneRules())
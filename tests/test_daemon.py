@@ -0,0 +1,161 @@
+import json
+import os
+import threading
+import time
+
+import pytest
+
+from daemon import DaemonError, ScanDaemon
+from store import ProjectStore
+from throttle import Throttle
+
+
+@pytest.fixture
+def daemon(tmp_path, monkeypatch):
+    monkeypatch.setenv('HOME', str(tmp_path / 'home'))
+    daemon = ScanDaemon(ProjectStore(str(tmp_path / 'projects.db')))
+    yield daemon
+    daemon.stop_scan()
+    daemon.stop_watcher()
+
+
+def make_tree(root, count=20):
+    for i in range(count):
+        project = os.path.join(root, f'group{i % 4}', f'app{i}')
+        os.makedirs(project)
+        with open(os.path.join(project, 'artisan'), 'w') as f:
+            f.write('#!/usr/bin/env php')
+        with open(os.path.join(project, 'composer.json'), 'w') as f:
+            json.dump({'require': {'laravel/framework': '^11.0'}}, f)
+
+
+class Recorder:
+    def __init__(self):
+        self.events = []
+
+    def send(self, message):
+        self.events.append(message)
+
+
+def test_only_one_of_concurrent_scans_starts(daemon, tmp_path):
+    make_tree(str(tmp_path / 'tree'))
+    started, refused = [], []
+    barrier = threading.Barrier(8)
+
+    def start():
+        barrier.wait()
+        try:
+            # Slow enough to still be running when the other requests come in
+            started.append(daemon.scan([str(tmp_path / 'tree')],
+                                       throttle=Throttle(ops_per_second=50)))
+        except DaemonError:
+            refused.append(True)
+
+    threads = [threading.Thread(target=start) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    daemon.stop_scan()
+
+    assert len(started) == 1 and len(refused) == 7
+    assert daemon.running_scan() is None
+
+
+def test_finished_scan_is_published(daemon, tmp_path):
+    make_tree(str(tmp_path / 'tree'), count=3)
+    subscriber = Recorder()
+    daemon.subscribe(subscriber)
+    daemon.scan([str(tmp_path / 'tree')])
+    daemon.scan_thread.join()
+
+    finished = [e for e in subscriber.events if e.get('event') == 'scan' and e['state'] == 'finished']
+    assert len(finished) == 1 and finished[0]['text'].startswith("Found 3 projects")
+    assert len(daemon.handle({'op': 'query'}, None)) == 3
+    assert daemon.handle({'op': 'status'}, None)['subscribers'] == 1
+
+
+def test_second_vendor_removal_is_refused(daemon, tmp_path):
+    project = tmp_path / 'app'
+    (project / 'vendor').mkdir(parents=True)
+    daemon.rows[str(project)] = {'path': str(project), 'has_vendor': True, 'unreachable': False}
+    daemon.purging = True
+    with pytest.raises(DaemonError):
+        daemon.remove_vendor([str(project)])
+
+
+def test_interrupted_vendor_removal_is_resumed(daemon, tmp_path):
+    project = tmp_path / 'app'
+    tombstone = project / '.vendor.deleting-1'
+    (tombstone / 'laravel').mkdir(parents=True)
+    (tombstone / 'laravel' / 'helpers.php').write_text('<?php')
+    daemon.store.add_tombstone(str(tombstone), str(project))
+    recorder = Recorder()
+    daemon.subscribers.add(recorder)
+
+    daemon.resume_vendor_removal()
+
+    assert not tombstone.exists()
+    assert daemon.store.tombstones() == []
+    assert not daemon.purging
+    assert recorder.events[-1]['event'] == 'purge'
+
+
+def test_closed_subscriber_is_dropped(daemon):
+    class Closed:
+        def send(self, message):
+            raise ValueError("I/O operation on closed file.")
+
+    closed = Closed()
+    daemon.subscribers.add(closed)
+    daemon.publish({'event': 'status', 'text': 'idle'})
+    assert closed not in daemon.subscribers
+
+
+def test_subscribe_answer_comes_before_any_event(daemon):
+    stop = threading.Event()
+
+    def publish():
+        while not stop.is_set():
+            daemon.publish({'event': 'status', 'text': 'busy'})
+
+    publisher = threading.Thread(target=publish)
+    publisher.start()
+    try:
+        subscribers = [Recorder() for _ in range(50)]
+        for i, subscriber in enumerate(subscribers):
+            daemon.subscribe(subscriber, i)
+    finally:
+        stop.set()
+        publisher.join()
+    for i, subscriber in enumerate(subscribers):
+        assert subscriber.events[0] == {'id': i, 'ok': True, 'result': True}
+
+
+def test_client_subscription_over_the_socket(daemon, tmp_path):
+    from daemon import DaemonClient
+
+    path = str(tmp_path / 'd.sock')
+    server = threading.Thread(target=daemon.serve, args=(path,), daemon=True)
+    server.start()
+    client = DaemonClient(path)
+    for _ in range(100):
+        try:
+            client.request('ping')
+            break
+        except DaemonError:
+            time.sleep(0.05)
+    events = []
+    received = threading.Event()
+
+    def on_event(event):
+        events.append(event)
+        received.set()
+
+    close = client.subscribe(on_event)
+    daemon.set_status("hello")
+    assert received.wait(5)
+    close()
+    assert {'event': 'status', 'text': 'hello'} in events
+    daemon.shutdown()
+    server.join(5)
@@ -0,0 +1,64 @@
+import json
+
+import pytest
+
+from detection import PROBE_BYTES, probe_composer
+
+
+def write(tmp_path, text):
+    path = tmp_path / 'composer.json'
+    path.write_text(text)
+    return str(path)
+
+
+@pytest.mark.parametrize('section', ['require', 'require-dev'])
+@pytest.mark.parametrize('package', ['laravel/framework', 'laravel/lumen-framework'])
+def test_required_framework_is_detected(tmp_path, section, package):
+    path = write(tmp_path, json.dumps({'name': 'acme/shop', section: {package: '^10.0'}}))
+    assert probe_composer(path)
+
+
+@pytest.mark.parametrize('text', [
+    # Truncated: the package name is there but the file does not parse
+    '{"require": {"laravel/framework": "^10.0"',
+    '{"require": {"laravel/framework": "^10.0",}}',
+    '"laravel/framework":',
+    '{"require": {"laravel/framework": "^10.0"}} trailing',
+])
+def test_malformed_json_is_rejected(tmp_path, text):
+    counters = {}
+    assert not probe_composer(write(tmp_path, text), counters)
+    assert counters['probes_full'] == 1
+
+
+@pytest.mark.parametrize('document', [
+    {'replace': {'laravel/framework': 'self.version'}},
+    {'suggest': {'laravel/framework': 'For the Laravel bridge'}},
+    {'require': {'php': '^8.2'}, 'description': '"laravel/framework": is not required'},
+    {'require': ['laravel/framework']},
+])
+def test_framework_outside_require_is_rejected(tmp_path, document):
+    assert not probe_composer(write(tmp_path, json.dumps(document)))
+
+
+def test_unrelated_file_takes_the_fast_path(tmp_path):
+    counters = {}
+    path = write(tmp_path, json.dumps({'require': {'symfony/console': '^7.0'}}))
+    assert not probe_composer(path, counters)
+    assert counters['probes_fast'] == 1 and 'probes_full' not in counters
+
+
+def test_large_file_is_decoded_in_full(tmp_path):
+    document = {'description': 'x' * PROBE_BYTES, 'require': {'laravel/framework': '^11.0'}}
+    counters = {}
+    assert probe_composer(write(tmp_path, json.dumps(document)), counters)
+    assert counters['files_read'] == 2
+
+
+def test_escaped_name_is_detected(tmp_path):
+    path = write(tmp_path, '{"require": {"laravel\\/framework": "^10.0"}}')
+    assert probe_composer(path)
+
+
+def test_missing_file(tmp_path):
+    assert not probe_composer(str(tmp_path / 'composer.json'))
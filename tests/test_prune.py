@@ -0,0 +1,31 @@
+import json
+import os
+
+from prune import PruneRules
+from scanner import scan_for_laravel_projects
+
+
+def make_project(path):
+    os.makedirs(path)
+    with open(os.path.join(path, 'artisan'), 'w') as f:
+        f.write('#!/usr/bin/env php')
+    with open(os.path.join(path, 'composer.json'), 'w') as f:
+        json.dump({'require': {'laravel/framework': '^11.0'}}, f)
+
+
+def test_projects_under_common_folder_names_are_found(tmp_path):
+    kept = [str(tmp_path / name / 'app') for name in ('storage', 'vendor', 'venv', '.cache')]
+    for path in kept:
+        make_project(path)
+    make_project(str(tmp_path / 'node_modules' / 'app'))
+    make_project(str(tmp_path / 'site' / '.git' / 'app'))
+
+    assert scan_for_laravel_projects(str(tmp_path), prune=PruneRules()) == sorted(kept)
+
+
+def test_exclude_patterns_add_to_the_defaults(tmp_path):
+    make_project(str(tmp_path / 'vendor' / 'app'))
+    make_project(str(tmp_path / 'work' / 'app'))
+    prune = PruneRules(['vendor'])
+    assert prune.prunes('node_modules', 'node_modules')
+    assert scan_for_laravel_projects(str(tmp_path), prune=prune) == [str(tmp_path / 'work' / 'app')]
@@ -0,0 +1,77 @@
+import os
+
+from purge import TOMBSTONE_PREFIX, VendorPurger
+from store import ProjectStore
+
+
+def make_files(directory, count=3):
+    os.makedirs(os.path.join(directory, 'pkg'), exist_ok=True)
+    for i in range(count):
+        with open(os.path.join(directory, 'pkg', f'file{i}.php'), 'w') as f:
+            f.write('<?php')
+
+
+def test_purge_deletes_vendor_directory(tmp_path):
+    project = tmp_path / 'shop'
+    make_files(str(project / 'vendor'))
+
+    results = VendorPurger(jobs=2).purge([str(project)])
+
+    assert not os.path.lexists(project / 'vendor')
+    assert results[str(project)][0] == 3
+    assert results[str(project)][2] is None
+    assert not [name for name in os.listdir(project) if name.startswith(TOMBSTONE_PREFIX)]
+
+
+def test_symlinked_vendor_only_loses_the_link(tmp_path):
+    shared = tmp_path / 'shared-vendor'
+    make_files(str(shared))
+    project = tmp_path / 'shop'
+    project.mkdir()
+    os.symlink(shared, project / 'vendor')
+    tombstoned = []
+
+    results = VendorPurger(jobs=2).purge(
+        [str(project)], on_tombstoned=lambda path, error: tombstoned.append((path, error)))
+
+    assert not os.path.lexists(project / 'vendor')
+    assert sorted(os.listdir(shared / 'pkg')) == ['file0.php', 'file1.php', 'file2.php']
+    assert results == {str(project): (0, 0, None)}
+    assert tombstoned == [(str(project), None)]
+
+
+def test_symlinked_tombstone_is_not_followed(tmp_path):
+    shared = tmp_path / 'shared-vendor'
+    make_files(str(shared))
+    project = tmp_path / 'shop'
+    project.mkdir()
+    tombstone = project / f'{TOMBSTONE_PREFIX}1'
+    os.symlink(shared, tombstone)
+
+    VendorPurger(jobs=2).delete_tombstones([(str(project), str(tombstone))])
+
+    assert not os.path.lexists(tombstone)
+    assert len(os.listdir(shared / 'pkg')) == 3
+
+
+def test_failed_deletion_keeps_tombstone_record(tmp_path, monkeypatch):
+    store = ProjectStore(str(tmp_path / 'projects.db'))
+    project = tmp_path / 'shop'
+    make_files(str(project / 'vendor'))
+    real_rmdir = os.rmdir
+
+    def failing_rmdir(path):
+        if os.path.basename(path) == 'pkg':
+            raise PermissionError(13, 'Permission denied', path)
+        real_rmdir(path)
+
+    monkeypatch.setattr(os, 'rmdir', failing_rmdir)
+    results = VendorPurger(store, jobs=2).purge([str(project)])
+    assert results[str(project)][2] is not None
+    assert len(store.tombstones()) == 1
+
+    # The next start retries and then forgets the tombstone
+    monkeypatch.setattr(os, 'rmdir', real_rmdir)
+    VendorPurger(store, jobs=2).resume_leftovers()
+    assert store.tombstones() == []
+    assert not [name for name in os.listdir(project) if name.startswith(TOMBSTONE_PREFIX)]
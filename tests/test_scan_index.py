@@ -0,0 +1,85 @@
+import json
+import os
+import time
+
+from scan_index import ScanIndex
+from scanner import ScanStats, scan_for_laravel_projects
+
+# Well outside the index's racy window
+OLD = time.time() - 3600
+
+
+def write_composer(project, require):
+    with open(os.path.join(project, 'composer.json'), 'w') as f:
+        json.dump({'require': require}, f)
+
+
+def make_old_tree(root):
+    """A project and a plain folder, all dated an hour ago so the index keeps them"""
+    project = os.path.join(root, 'sites', 'app')
+    os.makedirs(project)
+    os.makedirs(os.path.join(root, 'sites', 'notes'))
+    with open(os.path.join(project, 'artisan'), 'w') as f:
+        f.write('#!/usr/bin/env php')
+    write_composer(project, {'laravel/framework': '^11.0'})
+    backdate(root)
+    return project
+
+
+def backdate(root):
+    for path, dirs, files in os.walk(root):
+        for name in files:
+            os.utime(os.path.join(path, name), (OLD, OLD))
+        os.utime(path, (OLD, OLD))
+
+
+def scan(root, index):
+    stats = ScanStats()
+    projects = scan_for_laravel_projects(str(root), jobs=1, index=index, stats=stats)
+    return projects, stats
+
+
+def test_unchanged_tree_is_reused(tmp_path):
+    project = make_old_tree(str(tmp_path))
+    index = ScanIndex()
+    assert scan(tmp_path, index)[0] == [project]
+
+    projects, stats = scan(tmp_path, index)
+    assert projects == [project]
+    assert stats.dirs_cached == stats.dirs_visited
+
+
+def test_composer_json_rewritten_in_place_is_noticed(tmp_path):
+    project = make_old_tree(str(tmp_path))
+    index = ScanIndex()
+    assert scan(tmp_path, index)[0] == [project]
+
+    # Rewriting the file leaves the project folder's mtime alone
+    folder_mtime = os.stat(project).st_mtime_ns
+    write_composer(project, {})
+    assert os.stat(project).st_mtime_ns == folder_mtime
+
+    assert scan(tmp_path, index)[0] == []
+
+
+def test_composer_json_of_another_size_is_noticed_with_the_same_mtime(tmp_path):
+    project = make_old_tree(str(tmp_path))
+    index = ScanIndex()
+    assert scan(tmp_path, index)[0] == [project]
+
+    write_composer(project, {})
+    backdate(str(tmp_path))
+
+    assert scan(tmp_path, index)[0] == []
+
+
+def test_index_saves_and_loads_signatures(tmp_path):
+    root = tmp_path / 'tree'
+    project = make_old_tree(str(root))
+    path = str(tmp_path / 'index.json')
+    index = ScanIndex(path)
+    scan(root, index)
+    index.save()
+
+    write_composer(project, {})
+    assert scan(root, ScanIndex.load(path))[0] == []
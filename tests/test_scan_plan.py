@@ -0,0 +1,47 @@
+import json
+import os
+
+from prune import PruneRules
+from scan_plan import ScanPlan
+from scanner import scan_for_laravel_projects
+
+
+def make_project(path):
+    os.makedirs(path, exist_ok=True)
+    with open(os.path.join(path, 'artisan'), 'w') as f:
+        f.write('#!/usr/bin/env php')
+    with open(os.path.join(path, 'composer.json'), 'w') as f:
+        json.dump({'require': {'laravel/framework': '^11.0'}}, f)
+
+
+def test_nested_root_is_dropped(tmp_path):
+    (tmp_path / 'work' / 'clients').mkdir(parents=True)
+    plan = ScanPlan([str(tmp_path / 'work'), str(tmp_path / 'work' / 'clients')])
+    assert plan.roots == [str(tmp_path / 'work')]
+    assert plan.dropped == [(str(tmp_path / 'work' / 'clients'), f"inside {tmp_path / 'work'}")]
+
+
+def test_duplicate_root_is_dropped(tmp_path):
+    os.symlink(tmp_path, tmp_path.parent / f'{tmp_path.name}-link')
+    plan = ScanPlan([str(tmp_path), str(tmp_path.parent / f'{tmp_path.name}-link')])
+    assert plan.roots == [str(tmp_path)]
+
+
+def test_root_inside_pruned_folder_is_kept(tmp_path):
+    (tmp_path / 'node_modules' / 'app').mkdir(parents=True)
+    prune = PruneRules(['node_modules'])
+    plan = ScanPlan([str(tmp_path), str(tmp_path / 'node_modules' / 'app')], prune)
+    assert len(plan.roots) == 2
+
+
+def test_root_inside_a_project_is_kept(tmp_path):
+    make_project(str(tmp_path / 'monolith'))
+    make_project(str(tmp_path / 'monolith' / 'packages' / 'admin'))
+    roots = [str(tmp_path), str(tmp_path / 'monolith' / 'packages')]
+
+    plan = ScanPlan(roots)
+    assert plan.roots == roots
+
+    found = scan_for_laravel_projects(roots)
+    assert sorted(found) == [str(tmp_path / 'monolith'),
+                             str(tmp_path / 'monolith' / 'packages' / 'admin')]
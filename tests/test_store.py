@@ -0,0 +1,59 @@
+import sqlite3
+
+from store import MIGRATIONS, ProjectStore, read_legacy_projects
+
+LEGACY_FILE = """Laravel Projects Scan Results
+Scan Date: 2024-03-01 10:15:00
+Total Projects Found: 3
+================================================================================
+
+/home/dev/sites/shop
+/home/dev/sites/blog
+/home/dev/clients/acme api
+
+not a path
+"""
+
+
+def write_legacy(tmp_path):
+    path = tmp_path / 'dolaravel_projects'
+    path.write_text(LEGACY_FILE, encoding='utf-8')
+    return str(path)
+
+
+def test_read_legacy_projects(tmp_path):
+    assert read_legacy_projects(write_legacy(tmp_path)) == [
+        '/home/dev/sites/shop', '/home/dev/sites/blog', '/home/dev/clients/acme api']
+    assert read_legacy_projects(str(tmp_path / 'missing')) == []
+
+
+def test_legacy_file_is_imported_once(tmp_path):
+    legacy = write_legacy(tmp_path)
+    store = ProjectStore(str(tmp_path / 'doprojects.db'))
+
+    assert store.migrate_legacy_file(legacy) == 3
+    assert store.project_paths() == [
+        '/home/dev/clients/acme api', '/home/dev/sites/blog', '/home/dev/sites/shop']
+    assert store.vendor_flags() == dict.fromkeys(store.project_paths(), False)
+
+    # Projects removed afterwards do not come back on the next start
+    store.remove_projects(['/home/dev/sites/blog'])
+    assert ProjectStore(store.path).migrate_legacy_file(legacy) == 0
+    assert len(store.project_paths()) == 2
+
+
+def test_old_database_is_upgraded_in_place(tmp_path):
+    path = str(tmp_path / 'doprojects.db')
+    conn = sqlite3.connect(path)
+    conn.executescript(MIGRATIONS[0])
+    conn.execute("INSERT INTO projects (path, first_seen, last_seen, has_vendor) "
+                 "VALUES ('/srv/app', 1, 1, 1)")
+    conn.execute("PRAGMA user_version = 1")
+    conn.commit()
+    conn.close()
+
+    store = ProjectStore(path)
+    assert store.vendor_flags() == {'/srv/app': True}
+    assert store.last_modified() == {}
+    version = store.connection().execute("PRAGMA user_version").fetchone()[0]
+    assert version == len(MIGRATIONS)
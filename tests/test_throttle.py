@@ -0,0 +1,51 @@
+import os
+import sys
+import threading
+
+import pytest
+
+from throttle import Throttle, parse_rate, run_workers
+
+
+def test_parse_rate():
+    assert parse_rate('20M') == 20 * 1024 ** 2
+    assert parse_rate('512KiB') == 512 * 1024
+    assert parse_rate('0') is None and parse_rate('') is None
+    with pytest.raises(ValueError):
+        parse_rate('-1K')
+
+
+def test_single_worker_runs_inline_without_idle_priority():
+    threads = []
+    run_workers(lambda index: threads.append(threading.get_ident()), 1, Throttle(ops_per_second=100))
+    assert threads == [threading.get_ident()]
+
+
+def test_idle_priority_never_applies_to_the_callers_thread():
+    threads = []
+    run_workers(lambda index: threads.append(threading.get_ident()), 1, Throttle(idle=True))
+    assert threads and threading.get_ident() not in threads
+
+
+@pytest.mark.skipif(not sys.platform.startswith('linux'), reason="per-thread niceness")
+def test_idle_scan_leaves_caller_niceness_alone(tmp_path):
+    from scanner import scan_for_laravel_projects
+
+    (tmp_path / 'a' / 'b').mkdir(parents=True)
+    niceness = []
+
+    def worker(index):
+        niceness.append(os.getpriority(os.PRIO_PROCESS, 0))
+
+    before = os.getpriority(os.PRIO_PROCESS, 0)
+    run_workers(worker, 2, Throttle(idle=True))
+    scan_for_laravel_projects(str(tmp_path), jobs=1, throttle=Throttle(idle=True))
+    assert os.getpriority(os.PRIO_PROCESS, 0) == before
+    assert all(value > before for value in niceness) or before >= 19
+
+
+def test_spend_counts_work():
+    throttle = Throttle()
+    throttle.spend(3, 100)
+    assert throttle.as_dict()['ops'] == 3 and throttle.as_dict()['bytes'] == 100
+    assert throttle.summary() == ""
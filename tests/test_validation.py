@@ -0,0 +1,108 @@
+import os
+import threading
+
+import validation
+from devices import MountTable
+from validation import DELETED, OK, UNREACHABLE, Validator
+
+
+class FakeMounts(MountTable):
+    def __init__(self, points):
+        self.points = {point: i for i, point in enumerate(points)}
+        self.devices = {}
+
+
+def test_hung_mount_does_not_mark_other_mounts_unreachable(tmp_path, monkeypatch):
+    release = threading.Event()
+    real_check = validation.check_project
+
+    def check_project(path):
+        if path.startswith('/mnt/nas/'):
+            release.wait()
+        return real_check(path)
+
+    monkeypatch.setattr(validation, 'check_project', check_project)
+    local = []
+    for i in range(20):
+        project = tmp_path / f'p{i}'
+        (project / 'vendor').mkdir(parents=True)
+        local.append(str(project))
+    hung = [f'/mnt/nas/p{i}' for i in range(20)]
+    # Put the hung paths first so they occupy every worker
+    paths = hung + local
+    results = {}
+
+    validator = Validator(jobs=2, timeout=0.2, mounts=FakeMounts(['/', '/mnt/nas']))
+    try:
+        validator.run(paths, lambda path, status, *rest: results.setdefault(path, status))
+    finally:
+        release.set()
+
+    assert len(results) == len(paths)
+    assert all(results[path] == UNREACHABLE for path in hung)
+    assert all(results[path] == OK for path in local)
+
+
+def test_missing_project_is_deleted(tmp_path):
+    results = []
+    Validator(jobs=2).run([str(tmp_path / 'gone')], lambda *result: results.append(result))
+    assert results == [(str(tmp_path / 'gone'), DELETED, None, None)]
+
+
+def test_mount_point_lookup():
+    mounts = FakeMounts(['/', '/mnt/nas'])
+    assert mounts.mount_point('/mnt/nas/a/b') == '/mnt/nas'
+    assert mounts.mount_point('/mnt/nasty') == '/'
+    assert Validator(mounts=mounts).mount_of(os.path.join('/mnt', 'nas', 'x')) == '/mnt/nas'
+
+
+def test_last_modified_is_read_after_the_check(tmp_path, monkeypatch):
+    project = tmp_path / 'shop'
+    project.mkdir()
+    (project / 'composer.lock').write_text('{}')
+    os.utime(project, (1000, 1000))
+    os.utime(project / 'composer.lock', (5000, 5000))
+    stats = []
+    real_stat = os.stat
+
+    def counting_stat(path, *args, **kwargs):
+        stats.append(str(path))
+        return real_stat(path, *args, **kwargs)
+
+    monkeypatch.setattr(os, 'stat', counting_stat)
+    assert validation.check_project(str(project)) == (OK, False)
+    # The folder and its vendor/ only
+    assert len(stats) == 2
+
+    results = []
+    Validator(jobs=1).run([str(project)], lambda *result: results.append(result))
+    assert results == [(str(project), OK, False, 5000)]
+
+
+def test_hang_while_reading_activity_files_does_not_block(tmp_path, monkeypatch):
+    release = threading.Event()
+    real_last_modified = validation.last_modified
+
+    def last_modified(path, st=None):
+        if path.endswith('slow'):
+            release.wait()
+        return real_last_modified(path, st)
+
+    monkeypatch.setattr(validation, 'last_modified', last_modified)
+    slow = tmp_path / 'slow'
+    (slow / 'vendor').mkdir(parents=True)
+    fast = tmp_path / 'fast'
+    fast.mkdir()
+    results = {}
+
+    validator = Validator(jobs=1, timeout=0.2, mounts=FakeMounts(['/']))
+    done = threading.Thread(target=validator.run, args=(
+        [str(slow), str(fast)], lambda path, *result: results.setdefault(path, result)))
+    done.start()
+    done.join(5)
+    release.set()
+
+    assert not done.is_alive()
+    assert results[str(slow)] == (OK, True, None)
+    # The mount is considered hung from then on
+    assert results[str(fast)] == (UNREACHABLE, None, None)
@@ -0,0 +1,64 @@
+import json
+import os
+import time
+
+import watcher
+from prune import PruneRules
+from watcher import ADDED, ProjectWatcher
+
+
+def make_project(path):
+    os.makedirs(path)
+    with open(os.path.join(path, 'artisan'), 'w') as f:
+        f.write('#!/usr/bin/env php')
+    with open(os.path.join(path, 'composer.json'), 'w') as f:
+        json.dump({'require': {'laravel/framework': '^11.0'}}, f)
+
+
+def wait_for(condition, seconds=5.0):
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def test_anchored_patterns_apply_to_watched_dirs(tmp_path):
+    for path in ('build/x', 'src/build/y', 'src/app'):
+        (tmp_path / path).mkdir(parents=True)
+    project_watcher = ProjectWatcher(lambda changes: None, prune=PruneRules(['/build']))
+    project_watcher.start([str(tmp_path)], [])
+    try:
+        assert wait_for(lambda: str(tmp_path / 'src' / 'app') in project_watcher.watched)
+        assert wait_for(lambda: str(tmp_path / 'src' / 'build' / 'y') in project_watcher.watched)
+        assert str(tmp_path / 'build') not in project_watcher.watched
+    finally:
+        project_watcher.stop()
+
+
+def test_new_directories_are_walked_in_one_batch(tmp_path, monkeypatch):
+    walks = []
+    real_walker = watcher.Walker
+
+    class CountingWalker(real_walker):
+        def run(self, roots):
+            walks.append((self.jobs, list(roots)))
+            return super().run(roots)
+
+    monkeypatch.setattr(watcher, 'Walker', CountingWalker)
+    changes = []
+    project_watcher = ProjectWatcher(changes.extend, coalesce=0.5)
+    project_watcher.start([str(tmp_path)], [])
+    try:
+        time.sleep(0.3)
+        for i in range(50):
+            (tmp_path / f'pkg{i}' / 'src').mkdir(parents=True)
+        make_project(str(tmp_path / 'clients' / 'shop'))
+        assert wait_for(lambda: changes)
+    finally:
+        project_watcher.stop()
+
+    assert changes == [(ADDED, str(tmp_path / 'clients' / 'shop'), False)]
+    assert walks and all(jobs == 1 for jobs, _ in walks)
+    assert len(walks) <= 3
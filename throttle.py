@@ -0,0 +1,245 @@
+"""I/O budget shared by the walker, vendor sizing, vendor removal and de-duplication.
+
+On a shared build host a full scan or a mass vendor removal can take all
+of a disk's I/O. A Throttle caps the filesystem operations (directory
+listings, stats, unlinks) and the bytes read per second with token
+buckets shared by every worker thread of a job, and can move those
+threads to the idle I/O class and a lower CPU priority. It keeps count
+of how long the workers were held back.
+"""
+import os
+import sys
+import time
+import ctypes
+import ctypes.util
+import platform
+import threading
+from contextlib import contextmanager, nullcontext
+
+
+# A bucket holds this many seconds of its rate, so short bursts are not delayed
+BURST_SECONDS = 0.25
+
+# Niceness added to throttled worker threads with idle priority
+IDLE_NICENESS = 10
+
+# ioprio_set/ioprio_get syscall numbers by machine (Linux)
+IOPRIO_SYSCALLS = {
+    'x86_64': (251, 252),
+    'i386': (289, 290),
+    'i686': (289, 290),
+    'aarch64': (30, 31),
+    'riscv64': (30, 31),
+    'armv7l': (314, 315),
+    'ppc64le': (273, 274),
+    's390x': (282, 283),
+}
+IOPRIO_WHO_PROCESS = 1
+IOPRIO_CLASS_SHIFT = 13
+IOPRIO_CLASS_IDLE = 3
+
+_SUFFIXES = {'': 1, 'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+
+_libc = None
+
+
+def parse_rate(text):
+    """Bytes per second from text like "50M", "512K" or "1048576"; None for empty or 0"""
+    text = str(text).strip().upper().rstrip('B').rstrip('I')
+    if not text:
+        return None
+    suffix = text[-1] if text[-1] in _SUFFIXES else ''
+    value = float(text[:-1] if suffix else text) * _SUFFIXES[suffix]
+    if value < 0:
+        raise ValueError(f"negative rate: {text}")
+    return int(value) or None
+
+
+def _ioprio_syscall(index, *args):
+    """Call ioprio_set (index 0) or ioprio_get (index 1); None where unsupported"""
+    global _libc
+    numbers = IOPRIO_SYSCALLS.get(platform.machine())
+    if not sys.platform.startswith('linux') or numbers is None:
+        return None
+    if _libc is None:
+        _libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+    result = _libc.syscall(numbers[index], *args)
+    return None if result < 0 else result
+
+
+def lower_thread_priority():
+    """Put the calling thread in the idle I/O class and raise its niceness.
+
+    On Linux both apply to the calling thread only; elsewhere niceness is
+    per process, so it is left alone. Returns what restore_thread_priority
+    needs to undo it.
+    """
+    io_priority = _ioprio_syscall(1, IOPRIO_WHO_PROCESS, 0)
+    if io_priority is not None:
+        _ioprio_syscall(0, IOPRIO_WHO_PROCESS, 0, IOPRIO_CLASS_IDLE << IOPRIO_CLASS_SHIFT)
+    niceness = None
+    if sys.platform.startswith('linux'):
+        try:
+            niceness = os.getpriority(os.PRIO_PROCESS, 0)
+            os.setpriority(os.PRIO_PROCESS, 0, min(19, niceness + IDLE_NICENESS))
+        except OSError:
+            niceness = None
+    return io_priority, niceness
+
+
+def restore_thread_priority(previous):
+    io_priority, niceness = previous
+    if io_priority is not None:
+        _ioprio_syscall(0, IOPRIO_WHO_PROCESS, 0, io_priority)
+    if niceness is not None:
+        try:
+            os.setpriority(os.PRIO_PROCESS, 0, niceness)
+        except OSError:
+            # Lowering niceness again needs privileges (or RLIMIT_NICE)
+            pass
+
+
+class TokenBucket:
+    """Token bucket shared by several threads.
+
+    take() never blocks itself: it takes the tokens, going into debt when
+    there are not enough, and returns how long the caller has to wait for
+    the debt to be paid back. Later callers inherit the debt, so all
+    threads together stay at the rate.
+    """
+
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.capacity = burst if burst is not None else max(1.0, self.rate * BURST_SECONDS)
+        self.tokens = self.capacity
+        self.stamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self, amount):
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.stamp) * self.rate)
+            self.stamp = now
+            self.tokens -= amount
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+
+class Throttle:
+    """Caps on operations and bytes per second, and optional idle priority.
+
+    Workers call spend() after each unit of work and run inside worker()
+    to get the idle priority. A Throttle with no limits and no idle
+    priority only counts.
+    """
+
+    def __init__(self, ops_per_second=None, bytes_per_second=None, idle=False):
+        self.ops_per_second = ops_per_second or None
+        self.bytes_per_second = bytes_per_second or None
+        self.idle = idle
+        self._ops = TokenBucket(ops_per_second) if ops_per_second else None
+        self._bytes = TokenBucket(bytes_per_second) if bytes_per_second else None
+        self._lock = threading.Lock()
+        self.ops = 0
+        self.bytes = 0
+        # Sum over all worker threads of the time they slept for the caps
+        self.throttled_seconds = 0.0
+        self.waits = 0
+
+    @classmethod
+    def from_options(cls, max_ops=None, max_bytes=None, idle=False):
+        """Throttle from user options (max_bytes may be text like "20M"), or None if unlimited"""
+        ops = int(max_ops) if max_ops else None
+        rate = parse_rate(max_bytes) if max_bytes else None
+        if not ops and not rate and not idle:
+            return None
+        return cls(ops, rate, idle)
+
+    def spend(self, ops=1, nbytes=0):
+        """Count work that was done, sleeping while the job is over its caps"""
+        wait = 0.0
+        if ops and self._ops is not None:
+            wait = self._ops.take(ops)
+        if nbytes and self._bytes is not None:
+            wait = max(wait, self._bytes.take(nbytes))
+        with self._lock:
+            self.ops += ops
+            self.bytes += nbytes
+            if wait > 0:
+                self.throttled_seconds += wait
+                self.waits += 1
+        if wait > 0:
+            time.sleep(wait)
+
+    @contextmanager
+    def worker(self):
+        """Run the body at idle I/O and CPU priority if the throttle asks for it.
+
+        Only for threads the job started itself (see run_workers): niceness
+        cannot be lowered again without privileges, so a caller's thread and
+        every thread it starts later would stay niced.
+        """
+        if not self.idle:
+            yield
+            return
+        previous = lower_thread_priority()
+        try:
+            yield
+        finally:
+            restore_thread_priority(previous)
+
+    def summary(self):
+        """e.g. "held back 12.5s" (summed over worker threads); empty if never held back"""
+        if not self.waits:
+            return ""
+        return f"held back {self.throttled_seconds:.1f}s"
+
+    def as_dict(self):
+        with self._lock:
+            return {
+                'ops_per_second': self.ops_per_second,
+                'bytes_per_second': self.bytes_per_second,
+                'idle': self.idle,
+                'ops': self.ops,
+                'bytes': self.bytes,
+                'throttled_s': round(self.throttled_seconds, 3),
+                'waits': self.waits,
+            }
+
+
+def run_workers(worker, jobs, throttle=None):
+    """Call worker(index) for every index in range(jobs) and wait for all of them.
+
+    Every worker gets a thread of its own, inside throttle.worker(). A single
+    worker without idle priority runs in the calling thread instead.
+    """
+    idle = throttle is not None and throttle.idle
+    if jobs == 1 and not idle:
+        worker(0)
+        return
+
+    def run(index):
+        with throttle.worker() if throttle is not None else nullcontext():
+            worker(index)
+
+    threads = [threading.Thread(target=run, args=(i,), daemon=True) for i in range(jobs)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def add_throttle_arguments(parser):
+    """Add --max-ops, --max-bytes and --idle to an argparse parser"""
+    parser.add_argument('--max-ops', type=int, default=None, metavar='N',
+                        help="at most N filesystem operations per second")
+    parser.add_argument('--max-bytes', type=parse_rate, default=None, metavar='RATE',
+                        help="at most RATE bytes read per second, e.g. 20M")
+    parser.add_argument('--idle', action='store_true',
+                        help="run the workers at idle I/O priority and lower CPU priority")
+
+
+def throttle_from_args(args):
+    """Throttle for the options added by add_throttle_arguments, or None"""
+    return Throttle.from_options(args.max_ops, args.max_bytes, args.idle)
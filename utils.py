@@ -2,7 +2,6 @@ import os
 import platform
 import subprocess
 import shutil
-import webbrowser
 
 
 def open_folder(path):
@@ -55,6 +54,8 @@ def open_in_vscode(path):
 
 def open_url(url):
     """Open a URL in the default web browser"""
+    # Imported on first use to keep it out of the startup path
+    import webbrowser
     try:
         webbrowser.open(url)
     except Exception as e:
@@ -87,4 +88,14 @@ def get_persistent_data_dir():
 def get_data_file_path(filename):
     """Get full path for a data file in the persistent directory"""
     data_dir = get_persistent_data_dir()
-    return os.path.join(data_dir, filename)
\ No newline at end of file
+    return os.path.join(data_dir, filename)
+
+
+def format_size(num_bytes):
+    """Format a byte count for display, e.g. 1.5 GB"""
+    size = float(num_bytes)
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(size) < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TB"
@@ -0,0 +1,179 @@
+import os
+import stat
+import time
+import queue
+import threading
+
+from devices import MountTable
+
+
+OK = 'ok'
+DELETED = 'deleted'
+UNREACHABLE = 'unreachable'
+
+DEFAULT_JOBS = 16
+
+# A stat that takes longer than this is treated as a sleeping or dead mount
+DEFAULT_TIMEOUT = 3.0
+
+# Besides the folder itself, files whose mtime tells when a project was last worked on
+ACTIVITY_FILES = ('composer.json', 'composer.lock', os.path.join('.git', 'index'))
+
+
+def last_modified(path, st=None):
+    """Latest mtime (seconds) of a project folder and its ACTIVITY_FILES, or None"""
+    times = []
+    if st is None:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+    times.append(st.st_mtime)
+    for name in ACTIVITY_FILES:
+        try:
+            times.append(os.stat(os.path.join(path, name)).st_mtime)
+        except OSError:
+            pass
+    return max(times)
+
+
+def check_project(path):
+    """Stat a saved project once; returns (status, has_vendor).
+
+    has_vendor is None unless the project is reachable.
+    """
+    try:
+        st = os.stat(path)
+    except (FileNotFoundError, NotADirectoryError):
+        return DELETED, None
+    except OSError:
+        # EIO, ESTALE, EACCES, ...: the path may well still exist
+        return UNREACHABLE, None
+    if not stat.S_ISDIR(st.st_mode):
+        return DELETED, None
+
+    try:
+        has_vendor = stat.S_ISDIR(os.stat(os.path.join(path, 'vendor')).st_mode)
+    except OSError:
+        has_vendor = False
+    return OK, has_vendor
+
+
+class Validator:
+    """Check saved projects on a bounded pool of daemon threads.
+
+    A stat on a hung network mount cannot be interrupted, so a path that
+    takes longer than `timeout` is reported as unreachable and its worker
+    is abandoned and replaced. The mount it lives on is then considered
+    hung: its remaining paths are reported unreachable without a stat,
+    while paths on other mounts keep being checked. Workers are daemon
+    threads, so a stuck one never keeps the application from exiting.
+    """
+
+    def __init__(self, jobs=DEFAULT_JOBS, timeout=DEFAULT_TIMEOUT, mounts=None):
+        self.jobs = max(1, jobs)
+        self.timeout = timeout
+        self.mounts = mounts if mounts is not None else MountTable()
+
+    def mount_of(self, path):
+        """Key of the mount a path is on; without a mount table, its first two components"""
+        point = self.mounts.mount_point(path) if self.mounts else None
+        if point is not None:
+            return point
+        parts = os.path.abspath(path).split(os.sep)
+        return os.sep.join(parts[:3])
+
+    def run(self, paths, on_result):
+        """Validate paths, calling on_result(path, status, has_vendor, last_modified) as each finishes.
+
+        Runs in the calling thread until every path has been reported.
+        check_project and the last_modified read of a reachable project are
+        timed as two separate steps; when only the second one hangs, the
+        project is reported with its status and a last_modified of None.
+        """
+        pending = queue.Queue()
+        for path in paths:
+            pending.put(path)
+        results = queue.Queue()
+        in_flight = {}
+        lock = threading.Lock()
+        reported = set()
+        stuck = set()
+        hung = set()
+        threads = []
+
+        def work():
+            me = threading.get_ident()
+            while True:
+                try:
+                    path = pending.get_nowait()
+                except queue.Empty:
+                    return
+                mount = self.mount_of(path)
+                with lock:
+                    if mount in hung:
+                        results.put((path, UNREACHABLE, None, None))
+                        continue
+                    in_flight[me] = (path, mount, time.monotonic(), None)
+                status, has_vendor = check_project(path)
+                modified = None
+                if status == OK:
+                    with lock:
+                        if me in stuck:
+                            # Already reported as unreachable; let a fresh worker take over
+                            stuck.discard(me)
+                            return
+                        # A fresh timeout for the activity files of a project that answered
+                        in_flight[me] = (path, mount, time.monotonic(), (status, has_vendor))
+                    modified = last_modified(path)
+                with lock:
+                    in_flight.pop(me, None)
+                    if me in stuck:
+                        stuck.discard(me)
+                        return
+                results.put((path, status, has_vendor, modified))
+
+        def spawn():
+            thread = threading.Thread(target=work, daemon=True)
+            threads.append(thread)
+            thread.start()
+
+        total = len(set(paths))
+        for _ in range(min(self.jobs, total)):
+            spawn()
+
+        while len(reported) < total:
+            try:
+                path, status, has_vendor, modified = results.get(timeout=min(0.1, self.timeout))
+                if path not in reported:
+                    reported.add(path)
+                    on_result(path, status, has_vendor, modified)
+            except queue.Empty:
+                pass
+
+            now = time.monotonic()
+            with lock:
+                overdue = [
+                    (ident, path, mount, checked)
+                    for ident, (path, mount, started, checked) in in_flight.items()
+                    if now - started > self.timeout
+                ]
+                for ident, path, mount, checked in overdue:
+                    del in_flight[ident]
+                    stuck.add(ident)
+                    hung.add(mount)
+                live = sum(1 for thread in threads if thread.is_alive()) - len(stuck)
+
+            for ident, path, mount, checked in overdue:
+                if path not in reported:
+                    reported.add(path)
+                    if checked is None:
+                        on_result(path, UNREACHABLE, None, None)
+                    else:
+                        on_result(path, *checked, None)
+
+            # Replace stuck workers while there is work left; a stuck worker
+            # holds one stat on a hung mount, and a hung mount gets no more
+            while live < self.jobs and not pending.empty():
+                spawn()
+                live += 1
@@ -0,0 +1,462 @@
+import os
+import time
+import select
+import struct
+import threading
+from collections import deque
+
+from devices import MountTable
+from prune import PruneRules
+from scanner import Walker, is_laravel_project
+
+
+# Watches are shared with every other program of the user (editors, IDEs,
+# sync clients), so only a slice of the system limit is used by default
+DEFAULT_MAX_WATCHES = 8192
+
+# Events arriving within this window are merged into one batch of changes
+COALESCE_SECONDS = 0.5
+
+# How often the polling fallback re-checks the watched directories
+POLL_SECONDS = 5.0
+
+# Unified event kinds delivered by the backends
+CREATED = 'created'
+DELETED = 'deleted'
+MODIFIED = 'modified'
+GONE = 'gone'
+OVERFLOW = 'overflow'
+
+# Changes delivered to the on_changes callback
+ADDED = 'added'
+REMOVED = 'removed'
+VENDOR = 'vendor'
+METADATA = 'metadata'
+
+# Files whose appearance or removal can change whether a directory is a project
+PROJECT_MARKERS = ('artisan', 'composer.json')
+
+
+def system_watch_limit():
+    """fs.inotify.max_user_watches, or None where it cannot be read"""
+    try:
+        with open('/proc/sys/fs/inotify/max_user_watches', 'r') as f:
+            return int(f.read().strip())
+    except (OSError, ValueError):
+        return None
+
+
+class _InotifyBackend:
+    """Directory watches through the Linux inotify API, called via ctypes"""
+
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CLOSE_WRITE = 0x00000008
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_DELETE_SELF = 0x00000400
+    IN_MOVE_SELF = 0x00000800
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ONLYDIR = 0x01000000
+    IN_DONT_FOLLOW = 0x02000000
+    IN_EXCL_UNLINK = 0x04000000
+    IN_ISDIR = 0x40000000
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+
+    WATCH_MASK = (IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO | IN_CLOSE_WRITE
+                  | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR | IN_DONT_FOLLOW | IN_EXCL_UNLINK)
+
+    _EVENT = struct.Struct('iIII')
+
+    def __init__(self):
+        import ctypes
+        import ctypes.util
+
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self._rm_watch = libc.inotify_rm_watch
+        self._rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+        self.fd = libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._paths = {}
+        self._wds = {}
+
+    def add(self, path):
+        wd = self._add_watch(self.fd, os.fsencode(path), self.WATCH_MASK)
+        if wd < 0:
+            # ENOSPC: the system watch limit is reached; ENOENT: already gone
+            return False
+        self._paths[wd] = path
+        self._wds[path] = wd
+        return True
+
+    def remove(self, path):
+        wd = self._wds.pop(path, None)
+        if wd is not None:
+            self._paths.pop(wd, None)
+            self._rm_watch(self.fd, wd)
+
+    def read(self, timeout):
+        """Wait up to timeout seconds; returns [(dir_path, name, kind, is_dir)]"""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+
+        events = []
+        offset = 0
+        size = self._EVENT.size
+        while offset + size <= len(data):
+            wd, mask, _, length = self._EVENT.unpack_from(data, offset)
+            raw_name = data[offset + size:offset + size + length].rstrip(b'\0')
+            offset += size + length
+
+            if mask & self.IN_Q_OVERFLOW:
+                events.append((None, '', OVERFLOW, False))
+                continue
+            path = self._paths.get(wd)
+            if path is None:
+                continue
+            name = os.fsdecode(raw_name)
+            is_dir = bool(mask & self.IN_ISDIR)
+            if mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                events.append((path, name, CREATED, is_dir))
+            elif mask & (self.IN_DELETE | self.IN_MOVED_FROM):
+                events.append((path, name, DELETED, is_dir))
+            elif mask & self.IN_CLOSE_WRITE:
+                events.append((path, name, MODIFIED, False))
+            elif mask & (self.IN_DELETE_SELF | self.IN_MOVE_SELF | self.IN_IGNORED):
+                if mask & self.IN_IGNORED:
+                    # The kernel dropped the watch; forget it
+                    self._paths.pop(wd, None)
+                    if self._wds.get(path) == wd:
+                        del self._wds[path]
+                events.append((path, '', GONE, True))
+        return events
+
+    def close(self):
+        os.close(self.fd)
+
+
+class _PollingBackend:
+    """Fallback that re-lists watched directories whose mtime changed.
+
+    A file rewritten in place does not touch its directory's mtime, so
+    composer.lock is stat'ed on its own in directories that have one.
+    """
+
+    def __init__(self, interval=POLL_SECONDS):
+        self.interval = interval
+        self._snapshots = {}
+        self._next_poll = time.monotonic() + interval
+
+    @staticmethod
+    def _snapshot(path):
+        st = os.stat(path)
+        names = {}
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    names[entry.name] = entry.is_dir(follow_symlinks=False)
+                except OSError:
+                    names[entry.name] = False
+        lock_mtime = None
+        if 'composer.lock' in names:
+            try:
+                lock_mtime = os.stat(os.path.join(path, 'composer.lock')).st_mtime_ns
+            except OSError:
+                pass
+        return st.st_mtime_ns, names, lock_mtime
+
+    def add(self, path):
+        try:
+            self._snapshots[path] = self._snapshot(path)
+        except OSError:
+            return False
+        return True
+
+    def remove(self, path):
+        self._snapshots.pop(path, None)
+
+    def read(self, timeout):
+        wait = self._next_poll - time.monotonic()
+        if wait > timeout:
+            time.sleep(timeout)
+            return []
+        time.sleep(max(0.0, wait))
+        self._next_poll = time.monotonic() + self.interval
+
+        events = []
+        for path, (mtime_ns, names, lock_mtime) in list(self._snapshots.items()):
+            try:
+                st = os.stat(path)
+            except OSError:
+                del self._snapshots[path]
+                events.append((path, '', GONE, True))
+                continue
+            if st.st_mtime_ns != mtime_ns:
+                try:
+                    snapshot = self._snapshot(path)
+                except OSError:
+                    continue
+                self._snapshots[path] = snapshot
+                new_names = snapshot[1]
+                for name in new_names.keys() - names.keys():
+                    events.append((path, name, CREATED, new_names[name]))
+                for name in names.keys() - new_names.keys():
+                    events.append((path, name, DELETED, names[name]))
+                if snapshot[2] != lock_mtime and 'composer.lock' in new_names:
+                    events.append((path, 'composer.lock', MODIFIED, False))
+            elif lock_mtime is not None:
+                try:
+                    current = os.stat(os.path.join(path, 'composer.lock')).st_mtime_ns
+                except OSError:
+                    continue
+                if current != lock_mtime:
+                    self._snapshots[path] = (mtime_ns, names, current)
+                    events.append((path, 'composer.lock', MODIFIED, False))
+        return events
+
+    def close(self):
+        self._snapshots.clear()
+
+
+def create_backend(poll_interval=POLL_SECONDS):
+    """inotify where available, polling everywhere else"""
+    try:
+        return _InotifyBackend()
+    except Exception:
+        return _PollingBackend(poll_interval)
+
+
+class ProjectWatcher:
+    """Keep a set of known projects in sync with the filesystem.
+
+    Known project directories are watched first, then the scanned roots and
+    their subdirectories breadth-first until the watch budget is used up
+    (pruned directories and the inside of projects are never watched).
+    Events are merged over a short window and turned into a list of
+    changes passed to on_changes from the watcher thread:
+
+        (ADDED, path, has_vendor)   a new project appeared under a root
+        (REMOVED, path, None)       a project was deleted or is no longer one
+        (VENDOR, path, has_vendor)  vendor/ was created or removed
+        (METADATA, path, None)      composer.lock was written
+    """
+
+    def __init__(self, on_changes, max_watches=DEFAULT_MAX_WATCHES, prune=None,
+                 coalesce=COALESCE_SECONDS, poll_interval=POLL_SECONDS):
+        limit = system_watch_limit()
+        if limit:
+            max_watches = min(max_watches, max(1, limit // 2))
+        self.on_changes = on_changes
+        self.max_watches = max_watches
+        self.prune = prune if prune is not None else PruneRules()
+        self.coalesce = coalesce
+        self.poll_interval = poll_interval
+        self.backend = None
+        # Read once and shared by the walks of new directories
+        self.mounts = None
+        self.projects = set()
+        self.roots = []
+        self.watched = set()
+        self.unwatched = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def backend_name(self):
+        return 'inotify' if isinstance(self.backend, _InotifyBackend) else 'polling'
+
+    def watch_summary(self):
+        summary = f"watching {len(self.watched)} dirs via {self.backend_name}"
+        if self.unwatched:
+            summary += f" (budget of {self.max_watches} reached, {self.unwatched}+ dirs not watched)"
+        return summary
+
+    # Control, callable from any thread
+
+    def start(self, roots, projects):
+        self.roots = list(roots)
+        self.projects = set(projects)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    # Watch management, on the watcher thread
+
+    def _watch(self, path):
+        if path in self.watched:
+            return True
+        if len(self.watched) >= self.max_watches:
+            self.unwatched += 1
+            return False
+        if not self.backend.add(path):
+            return False
+        self.watched.add(path)
+        return True
+
+    def _unwatch(self, path):
+        if path in self.watched:
+            self.watched.discard(path)
+            self.backend.remove(path)
+
+    def _watch_tree(self, root, depth=0):
+        """Watch root and its subdirectories breadth-first, within the budget"""
+        pending = deque([(root, depth)])
+        while pending and not self._stop.is_set():
+            path, depth = pending.popleft()
+            if not self._watch(path):
+                if len(self.watched) >= self.max_watches:
+                    # Count what is left as unwatched and stop walking
+                    self.unwatched += len(pending)
+                    return
+                continue
+            if path in self.projects or self.prune.too_deep(depth + 1):
+                continue
+            try:
+                with os.scandir(path) as it:
+                    subdirs = [entry for entry in it if entry.is_dir(follow_symlinks=False)]
+            except OSError:
+                continue
+            for entry in subdirs:
+                if not self.prune.prunes(entry.name, self._rel_path(entry.path)):
+                    pending.append((entry.path, depth + 1))
+
+    def _rel_path(self, path):
+        """path relative to the root it is under, as the walker passes it to the prune rules"""
+        if not self.prune.needs_rel_path:
+            return ''
+        for root in self.roots:
+            if path.startswith(os.path.join(root, '')):
+                return os.path.relpath(path, root).replace(os.sep, '/')
+        return ''
+
+    def _root_depth(self, path):
+        for root in self.roots:
+            if path == root:
+                return 0
+            if path.startswith(os.path.join(root, '')):
+                return os.path.relpath(path, root).count(os.sep) + 1
+        return 0
+
+    def _in_project(self, path):
+        prefix = path
+        while True:
+            if prefix in self.projects:
+                return prefix
+            parent = os.path.dirname(prefix)
+            if parent == prefix:
+                return None
+            prefix = parent
+
+    # Event handling
+
+    def _run(self):
+        try:
+            self.backend = create_backend(self.poll_interval)
+            self.mounts = MountTable()
+            for project in sorted(self.projects):
+                self._watch(project)
+            for root in self.roots:
+                self._watch_tree(root)
+        except Exception as e:
+            print(f"Error starting folder watcher: {e}")
+            return
+
+        pending = {'check': set(), 'vendor': set(), 'lock': set(), 'scan': set()}
+        first_event = None
+        try:
+            while not self._stop.is_set():
+                timeout = 0.2 if first_event is None else max(
+                    0.0, first_event + self.coalesce - time.monotonic())
+                for event in self.backend.read(timeout):
+                    self._classify(event, pending)
+                    if first_event is None:
+                        first_event = time.monotonic()
+                if first_event is not None and time.monotonic() - first_event >= self.coalesce:
+                    changes = self._resolve(pending)
+                    for kind in pending:
+                        pending[kind] = set()
+                    first_event = None
+                    if changes:
+                        self.on_changes(changes)
+        except Exception as e:
+            print(f"Error in folder watcher: {e}")
+        finally:
+            self.backend.close()
+
+    def _classify(self, event, pending):
+        path, name, kind, is_dir = event
+        if kind == OVERFLOW:
+            # Events were lost: re-check everything we know about
+            pending['check'].update(self.projects)
+            pending['vendor'].update(self.projects)
+            return
+        if kind == GONE:
+            self._unwatch(path)
+            if path in self.projects:
+                pending['check'].add(path)
+            return
+
+        if path in self.projects:
+            if name == 'vendor':
+                pending['vendor'].add(path)
+            elif name == 'composer.lock' and kind != DELETED:
+                pending['lock'].add(path)
+            elif name in PROJECT_MARKERS:
+                pending['check'].add(path)
+            return
+
+        child = os.path.join(path, name)
+        if kind == CREATED and is_dir:
+            if not self.prune.prunes(name, self._rel_path(child)):
+                pending['scan'].add(child)
+        elif kind == DELETED and is_dir:
+            self._unwatch(child)
+        elif name in PROJECT_MARKERS and kind != DELETED:
+            pending['scan'].add(path)
+
+    def _resolve(self, pending):
+        changes = []
+        for path in sorted(pending['check']):
+            if not is_laravel_project(path):
+                self.projects.discard(path)
+                self._unwatch(path)
+                changes.append((REMOVED, path, None))
+                pending['vendor'].discard(path)
+                pending['lock'].discard(path)
+
+        for path in sorted(pending['vendor']):
+            changes.append((VENDOR, path, os.path.isdir(os.path.join(path, 'vendor'))))
+        for path in sorted(pending['lock']):
+            changes.append((METADATA, path, None))
+
+        new_dirs = []
+        for path in sorted(pending['scan']):
+            if self._in_project(path) or not os.path.isdir(path):
+                continue
+            # Watch the new directory first so files created while it is
+            # being scanned (a clone in progress) are not missed
+            self._watch_tree(path, self._root_depth(path))
+            new_dirs.append(path)
+        if new_dirs:
+            # One walk on this thread for everything created in this window; an
+            # npm install or a clone creates thousands of directories at once
+            found = Walker(1, self.prune, mounts=self.mounts).run(new_dirs)
+            for project in found:
+                if project in self.projects:
+                    continue
+                self.projects.add(project)
+                self._watch(project)
+                changes.append((ADDED, project, os.path.isdir(os.path.join(project, 'vendor'))))
+        return changes
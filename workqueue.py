@@ -0,0 +1,60 @@
+import threading
+from collections import deque
+
+
+class WorkQueue:
+    """Work-stealing queue of directories shared by a pool of worker threads.
+
+    Used by disk usage measurement, vendor removal and de-duplication (the
+    scan itself schedules per filesystem with devices.DeviceQueue). Each
+    worker owns a deque: it pushes and pops its own work at the tail (depth
+    first, good locality) and steals from the head of the other workers'
+    deques when it runs dry. The work is finished once no directory is
+    queued or being processed.
+    """
+
+    def __init__(self, workers):
+        self._deques = [deque() for _ in range(workers)]
+        self._pending = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+    def push(self, worker, paths):
+        with self._cond:
+            self._deques[worker].extend(paths)
+            self._pending += len(paths)
+            self._cond.notify(len(paths))
+
+    def complete(self, worker, paths):
+        """Mark one directory as processed and queue its children"""
+        with self._cond:
+            if paths:
+                self._deques[worker].extend(paths)
+                self._cond.notify(len(paths))
+            self._pending += len(paths) - 1
+            if self._pending == 0:
+                self._cond.notify_all()
+
+    def pop(self, worker):
+        """Return the next directory for this worker, or None when done"""
+        own = self._deques[worker]
+        count = len(self._deques)
+        with self._cond:
+            while True:
+                if self._closed:
+                    return None
+                if own:
+                    return own.pop()
+                for offset in range(1, count):
+                    victim = self._deques[(worker + offset) % count]
+                    if victim:
+                        return victim.popleft()
+                if self._pending == 0:
+                    return None
+                self._cond.wait()
+
+    def close(self):
+        """Stop handing out work and wake up all idle workers"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()